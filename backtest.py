@@ -0,0 +1,235 @@
+# leave-one-season-out backtest of the whole pipeline on every season in the store (season_store.py)
+# for each held out season the models are fit on the other seasons only, then every team's draft is
+# simulated and optimized pick by pick (like run_the_model) and scored against what actually happened:
+#   - hit rate: selections that are the player who actually went at that pick
+#   - pick gap: how far from the pick a selection actually went, mean |his actual pick - pick|
+#   - bonus error: mean absolute error (share of the max bonus) of the bonus model at every held out player's
+#     actual pick, plus its out of sample r^2 like Code/MARS.R reports
+#   - c-index: concordance of the CoxPH model's expected draft slot with the actual one
+# only 2024 has a pick order csv, so every season is drafted with the 2024 ownership (which team holds which
+# pick, first 136) and the 2024 spending / high school settings as a template. the actual draft still decides
+# who was on the board at each of those picks and who the hit is
+# the bonus model is the MARS.R fit redone as least squares on its pick hinges (the knots bonus_surface.py finds
+# in signing_bonus_df.csv): piecewise linear in the pick, slopes that depend on hs / fv / risk (its degree 2
+# terms) and a shift per position, so no R is needed
+# season fits are one task each, and a season's 30 team tasks go out to the same process pool as soon as
+# its fit is back. every (season, team) has its own seed, so the result doesn't depend on the worker count
+#
+# usage (from the repo root): python backtest.py [--seasons 2021 2022 2023 2024] [--scenarios 50] [--seed 0]
+#     [--workers N] [--solver exact]
+
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from adaptive_sampling import rank_votes
+from bonus_surface import hinge_basis
+from cox_scoring import design_matrix, fit_model
+from draft_store import MLB_TEAMS
+from optimization import DraftProblem, pick_model_class, team_settings
+from season_store import SEASON, available_seasons, drafted_boards, load_season
+from simulation import TeamInputs, simulate_team
+from survival_tensor import COVARIATES, LAST_MODELED_PICK, NUM_PICKS
+from sweep import plan_team
+
+SEASONS_FILE = Path("Optimization_CSVs") / "backtest_seasons.csv"
+PICKS_FILE = Path("Optimization_CSVs") / "backtest_picks.parquet"
+
+# season whose pick order and team settings every backtested season is drafted with
+TEMPLATE_SEASON = SEASON
+DEFAULT_SCENARIOS = 50
+
+# where the MARS fit puts its pick hinges (bonus_surface.find_knots on signing_bonus_df.csv)
+BONUS_KNOTS = np.array([8, 25, 36, 46, 102, 210], dtype=np.float64)
+# covariates whose effect on the bonus changes with the pick
+BONUS_SLOPE_TERMS = ['hs', 'fv', 'risk']
+POSITION_COVARIATES = [c for c in COVARIATES if c.startswith('position_')]
+
+
+class BonusModel:
+    """Share of the max bonus for a player at a pick: pick hinges times (1, hs, fv, risk) plus position shifts"""
+
+    def __init__(self, coefficients, knots=BONUS_KNOTS):
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        self.knots = np.asarray(knots, dtype=np.float64)
+
+    @staticmethod
+    def features(players, picks, knots=BONUS_KNOTS):
+        """players x picks x features, picks is one row of pick numbers per player (or one shared row)"""
+        picks = np.broadcast_to(np.asarray(picks, dtype=np.float64), (len(players), np.shape(picks)[-1]))
+        slopes = np.column_stack([np.ones(len(players)), players[BONUS_SLOPE_TERMS].to_numpy(dtype=np.float64)])
+        hinges = hinge_basis(picks, knots)
+        interactions = (hinges[:, :, :, None] * slopes[:, None, None, :]).reshape(picks.shape + (-1,))
+        positions = np.broadcast_to(design_matrix(players, POSITION_COVARIATES)[:, None, :],
+                                    picks.shape + (len(POSITION_COVARIATES),))
+        return np.concatenate([interactions, positions], axis=-1)
+
+    @classmethod
+    def fit(cls, training, knots=BONUS_KNOTS):
+        """Least squares on drafted board players (season_store.drafted_boards) at their actual pick"""
+        x = cls.features(training, training['number'].to_numpy()[:, None], knots)[:, 0, :]
+        coefficients = np.linalg.lstsq(x, training['pct_max_bonus'].to_numpy(dtype=np.float64), rcond=None)[0]
+        return cls(coefficients, knots)
+
+    def predict(self, players, picks):
+        """players x picks bonus shares (never below 0)"""
+        return np.maximum(self.features(players, picks, self.knots) @ self.coefficients, 0.0)
+
+
+class HeldOutSeason:
+    """One held out season: its drafted board players with the models fit without it, and their scores"""
+
+    def __init__(self, season, train_seasons, players, survival, bonus_model, template_picks, pick_names):
+        self.season = season
+        self.train_seasons = list(train_seasons)
+        self.players = players
+        self.survival = survival
+        self.bonus_model = bonus_model
+        self.template_picks = template_picks
+        self.pick_names = pick_names
+
+    @property
+    def actual_picks(self):
+        return self.players['number'].to_numpy()
+
+    def c_index(self):
+        """Concordance of the expected draft slot (sum of the survival curve) with the actual pick"""
+        from lifelines.utils import concordance_index
+
+        return float(concordance_index(self.actual_picks, self.survival.sum(axis=1)))
+
+    def bonus_errors(self, training_mean):
+        """(mean absolute error, out of sample r^2) of the bonus model at every player's actual pick"""
+        predicted = self.bonus_model.predict(self.players, self.actual_picks[:, None])[:, 0]
+        actual = self.players['pct_max_bonus'].to_numpy(dtype=np.float64)
+        # the naive prediction is the training mean, like MARS.R
+        r2 = 1 - ((actual - predicted) ** 2).sum() / ((actual - training_mean) ** 2).sum()
+        return float(np.abs(actual - predicted).mean()), float(r2)
+
+    def problem(self, team):
+        """DraftProblem for a team's template picks, availability from the actual draft"""
+        pick_numbers = self.template_picks[team]
+        names = self.players['name'].astype(str).to_numpy()
+        probs = self.survival[:, pick_numbers - 1].astype(np.float64)
+        # a player is on the board at a pick if he went at it or later
+        real = self.actual_picks[:, None] >= pick_numbers[None, :]
+        bonus = self.bonus_model.predict(self.players, pick_numbers)
+        inputs = TeamInputs(team, names, probs, real, bonus, pick_numbers)
+        return DraftProblem(inputs, self.players[['name', 'position', 'hs', 'fv', 'risk']])
+
+
+def fit_season(season, seasons):
+    """Fit survival and bonus on every other season and score the held out one: (HeldOutSeason, metrics)"""
+    start = time.perf_counter()
+    train_seasons = [s for s in seasons if s != season]
+    training = drafted_boards(train_seasons)
+    players = load_season(season).drafted_board()
+    survival = fit_model(training).score_board(players, np.arange(1, NUM_PICKS + 1)).matrix
+
+    draft = load_season(season).draft
+    template = load_season(TEMPLATE_SEASON).picks_by_team(LAST_MODELED_PICK)
+    held_out = HeldOutSeason(season, train_seasons, players, survival, BonusModel.fit(training), template,
+                             dict(zip(draft['pick'].tolist(), draft['name'].astype(str))))
+    bonus_mae, bonus_r2 = held_out.bonus_errors(training['pct_max_bonus'].mean())
+    metrics = {'season': season, 'train_seasons': ' '.join(map(str, train_seasons)), 'players': len(players),
+               'c_index': held_out.c_index(), 'bonus_mae': bonus_mae, 'bonus_r2': bonus_r2,
+               'fit_seconds': time.perf_counter() - start}
+    return held_out, metrics
+
+
+def team_rng(seed, season, team_abbrev):
+    """Reproducible generator for one (season, team) task"""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(season, list(MLB_TEAMS).index(team_abbrev))))
+
+
+def backtest_team(held_out, team_abbrev, n_scenarios=DEFAULT_SCENARIOS, seed=0, solver="exact"):
+    """One team's optimized draft in a held out season, one row per selection"""
+    problem = held_out.problem(team_abbrev)
+    model = pick_model_class(solver)(problem, *team_settings(team_abbrev))
+    rng = team_rng(seed, held_out.season, team_abbrev)
+    scenarios = [simulate_team(problem, pick, n_scenarios, rng) for pick in range(1, problem.num_picks + 1)]
+
+    actual_pick = dict(zip(problem.names, held_out.actual_picks[problem.rows]))
+    rows = []
+    for k, (votes, value) in enumerate(plan_team(problem, model, scenarios)):
+        name, count = rank_votes(votes)[0]
+        pick_number = int(problem.pick_numbers[k])
+        rows.append({
+            'season': held_out.season, 'team': team_abbrev, 'selection': k + 1, 'pick_number': pick_number,
+            'name': name, 'votes': count, 'value': value,
+            'bonus': float(problem.bonus[problem.name_to_row[name], k]),
+            'actual_name': held_out.pick_names.get(pick_number, ""),
+            'actual_pick': int(actual_pick[name]),
+        })
+    return rows
+
+
+def season_table(metrics, picks):
+    """Per season metrics: the model fits plus how the optimized drafts scored"""
+    table = pd.DataFrame(metrics).set_index('season').sort_index()
+    picks = picks.assign(hit=picks['name'] == picks['actual_name'],
+                         pick_gap=(picks['actual_pick'] - picks['pick_number']).abs())
+    scored = picks.groupby('season').agg(teams=('team', 'nunique'), selections=('name', 'size'),
+                                         hit_rate=('hit', 'mean'), pick_gap=('pick_gap', 'mean'))
+    columns = ['train_seasons', 'players', 'teams', 'selections', 'hit_rate', 'pick_gap', 'bonus_mae', 'bonus_r2',
+               'c_index', 'fit_seconds']
+    return table.join(scored)[columns].reset_index()
+
+
+def run_backtest(seasons=None, teams=None, n_scenarios=DEFAULT_SCENARIOS, seed=0, workers=None, solver="exact"):
+    """(per season metrics, per selection picks) for every held out season"""
+    seasons = list(seasons or available_seasons())
+    teams = list(teams or MLB_TEAMS)
+    workers = workers or os.cpu_count() or 1
+    metrics = []
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(fit_season, season, available_seasons()) for season in seasons}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for job in done:
+                result = job.result()
+                if isinstance(result, list):
+                    rows.extend(result)
+                    continue
+                # a season's fit is back, its teams can start while other seasons are still fitting
+                held_out, season_metrics = result
+                metrics.append(season_metrics)
+                pending |= {executor.submit(backtest_team, held_out, team, n_scenarios, seed, solver) for team in teams}
+
+    picks = pd.DataFrame(rows).sort_values(['season', 'team', 'selection']).reset_index(drop=True)
+    return season_table(metrics, picks), picks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="leave-one-season-out backtest of the draft pipeline")
+    parser.add_argument("--seasons", type=int, nargs="*", default=None, help="seasons to hold out (default: every one)")
+    parser.add_argument("--teams", nargs="*", help="team abbreviations (default: all 30)")
+    parser.add_argument("--scenarios", type=int, default=DEFAULT_SCENARIOS, help="simulated drafts per pick")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--solver", choices=["mip", "exact"], default="exact")
+    parser.add_argument("--output", default=str(SEASONS_FILE))
+    parser.add_argument("--picks-output", default=str(PICKS_FILE))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table, picks = run_backtest(args.seasons, args.teams, args.scenarios, args.seed, args.workers, args.solver)
+    elapsed = time.perf_counter() - start
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(args.output, index=False)
+    picks.to_parquet(args.picks_output, index=False)
+    pd.set_option('display.width', 160)
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print(f"\n{len(table)} seasons, {len(picks)} selections in {elapsed:.1f}s, wrote {args.output} and "
+          f"{args.picks_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+# scaling benchmark on synthetic drafts (synthetic_draft.py): every stage from reading the team csvs to the
+# dashboard joins, timed with its throughput and peak memory, at a few draft sizes
+# each stage runs once for time and once more under tracemalloc for its peak (tracemalloc slows python code
+# down too much to do both in one pass). the solver runs in a child process, so one that blows up at a size
+# shows up as a timeout instead of a hang (and one that raises as an error, with its message)
+#
+# usage (from the repo root): python benchmarks/bench_scale.py [--scales 156x4 1000x10 3000x20] [--teams 30]
+#     [--scenarios 100] [--solves 3] [--solver mip] [--timeout 60]
+#     [--output bench_scale.jsonl] [--baseline bench_scale.jsonl] [--tolerance 1.5]
+
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import draft_store  # noqa: E402
+import streamlit_app as app  # noqa: E402
+import takeaways  # noqa: E402
+from bonus_surface import fit_surface, read_bonus_grid  # noqa: E402
+from comparison import pick_alignment  # noqa: E402
+from name_index import NameIndex, enrich_predictions  # noqa: E402
+from optimization import (  # noqa: E402
+    PENALTY_RISK, TEAM_SETTINGS, load_player_data, load_problem, pick_model_class, team_settings)
+from simulation import load_team_inputs, simulate_team  # noqa: E402
+from synthetic_draft import generate_draft, write_draft  # noqa: E402
+
+# stages faster than this are all noise, they're never flagged against the baseline
+MIN_COMPARE_SECONDS = 0.05
+
+
+class Bench:
+    """One synthetic draft on disk plus whatever the stages have loaded from it so far"""
+
+    def __init__(self, n_players, n_rounds, n_teams, root, args):
+        self.n_players = n_players
+        self.n_rounds = n_rounds
+        self.n_teams = n_teams
+        self.root = Path(root)
+        self.args = args
+        self.draft = None
+        self.player_data = None
+        self.problems = {}
+        self.enhanced = {}
+
+    @property
+    def scale(self):
+        return f"{self.n_players}x{self.n_rounds}"
+
+    @property
+    def inputs_directory(self):
+        return self.root / "Intermediary_CSVs"
+
+    @property
+    def data_directory(self):
+        return self.root / "Optimization_CSVs"
+
+    @property
+    def store_teams(self):
+        """Teams the dashboard's store knows about (the real clubs)"""
+        return [team for team in self.draft.teams if team in draft_store.MLB_TEAMS]
+
+
+def stage_generate(bench):
+    bench.draft = generate_draft(bench.n_players, bench.n_rounds, bench.n_teams, bench.args.seed)
+    write_draft(bench.draft, bench.root)
+    return bench.n_players
+
+
+def stage_load_inputs(bench):
+    for team in bench.draft.teams:
+        load_team_inputs(team, bench.inputs_directory)
+    return len(bench.draft.teams)
+
+
+def stage_load_problems(bench):
+    bench.player_data = load_player_data(bench.root / "Original_CSVs" / f"data_fg - {bench.draft.season}.csv")
+    bench.problems = {team: load_problem(team, bench.player_data, bench.inputs_directory, season=None)
+                      for team in bench.draft.teams}
+    return len(bench.problems)
+
+
+def stage_simulate(bench):
+    for team_idx, problem in enumerate(bench.problems.values()):
+        simulate_team(problem, 1, bench.args.scenarios, np.random.default_rng([bench.args.seed, team_idx]))
+    return len(bench.problems) * bench.args.scenarios
+
+
+def stage_solve(bench):
+    # the league's first team, with the slot money for its picks as the budget. with more than 30 teams it can
+    # be a synthetic one (T31, ...), those have no settings of their own and get the defaults, no hs penalty
+    team = bench.draft.teams[0]
+    problem = bench.problems[team]
+    spending = bench.draft.bonus_pool(team)
+    if team in TEAM_SETTINGS:
+        settings = team_settings(team, spending=spending)
+    else:
+        settings = (PENALTY_RISK, 0.0, spending)
+    model = pick_model_class(bench.args.solver)(problem, *settings)
+    scenarios = simulate_team(problem, 1, bench.args.solves, np.random.default_rng(bench.args.seed))
+    for available in scenarios:
+        model.solve(available)
+    return bench.args.solves
+
+
+def stage_bonus_surface(bench):
+    names, grid, picks = read_bonus_grid(bench.root / "Original_CSVs" / "signing_bonus_df.csv")
+    fit_surface(names, grid, picks)
+    return len(names)
+
+
+def stage_store_build(bench):
+    draft_store.build_store(bench.data_directory)
+    return len(bench.store_teams)
+
+
+def stage_store_load(bench):
+    # cold process: nothing in memory, the parquet written by store.build is fresh
+    draft_store._STORE_CACHE.clear()
+    store = draft_store.load_store(bench.data_directory)
+    return len(store.predictions) + len(store.results)
+
+
+def stage_load_team_predictions(bench):
+    for team in bench.store_teams:
+        app.load_team_predictions(team, bench.data_directory)
+    return len(bench.store_teams)
+
+
+def stage_name_index(bench):
+    results = draft_store.load_store(bench.data_directory).results
+    NameIndex.from_frame(results)
+    return len(results)
+
+
+def stage_enrich(bench):
+    store = draft_store.load_store(bench.data_directory)
+    name_index = NameIndex.from_frame(store.results)
+    rows = 0
+    for team in bench.store_teams:
+        predictions = store.team_predictions(team)
+        bench.enhanced[team] = enrich_predictions(predictions, store.results, name_index)
+        rows += len(predictions)
+    return rows
+
+
+def stage_alignment(bench):
+    results = draft_store.load_store(bench.data_directory).results
+    for team, enhanced in bench.enhanced.items():
+        pick_alignment(enhanced, results[results['Team_Abbrev'] == team])
+    return len(bench.enhanced)
+
+
+def stage_takeaways(bench):
+    takeaways._SUMMARY_CACHE.clear()
+    takeaways._TAKEAWAYS_CACHE.clear()
+    takeaways.league_takeaways(bench.data_directory)
+    return len(bench.store_teams)
+
+
+# (name, function, what the item count is, runs in a child process)
+STAGES = [
+    ('generate', stage_generate, 'players', False),
+    ('load_inputs', stage_load_inputs, 'teams', False),
+    ('load_problems', stage_load_problems, 'teams', False),
+    ('simulate', stage_simulate, 'scenarios', False),
+    ('solve', stage_solve, 'solves', True),
+    ('bonus_surface', stage_bonus_surface, 'players', False),
+    ('store.build', stage_store_build, 'teams', False),
+    ('store.load', stage_store_load, 'rows', False),
+    ('load_team_predictions', stage_load_team_predictions, 'teams', False),
+    ('name_index', stage_name_index, 'rows', False),
+    ('enrich', stage_enrich, 'rows', False),
+    ('alignment', stage_alignment, 'teams', False),
+    ('takeaways', stage_takeaways, 'teams', False),
+]
+
+
+def measure(func, bench, trace):
+    """(items, seconds, peak bytes or None) for one run of a stage"""
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        items = func(bench)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace else None
+    finally:
+        if trace:
+            tracemalloc.stop()
+    return items, seconds, peak
+
+
+def measure_in_child(func, bench, trace, timeout):
+    """measure() in a forked child (it sees everything loaded so far): ('ok', measure() result),
+    ('timeout', None) if it ran past the timeout, or ('error', message) if it raised or died"""
+    context = multiprocessing.get_context("fork")
+    receive, send = context.Pipe(duplex=False)
+
+    def target():
+        try:
+            send.send(('ok', measure(func, bench, trace)))
+        except Exception as e:  # reported by the parent instead of waiting out the timeout
+            send.send(('error', f"{type(e).__name__}: {e}"))
+
+    child = context.Process(target=target)
+    child.start()
+    # only the child writes, so a child that dies without sending shows up as EOF right away
+    send.close()
+    if receive.poll(timeout):
+        try:
+            outcome = receive.recv()
+        except EOFError:
+            child.join()
+            outcome = ('error', f"child exited with code {child.exitcode}")
+    else:
+        child.terminate()
+        outcome = ('timeout', None)
+    child.join()
+    return outcome
+
+
+def run_scale(n_players, n_rounds, args):
+    """One row per stage for one draft size"""
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="synthetic_draft_") as root:
+        bench = Bench(n_players, n_rounds, args.teams, root, args)
+        for name, func, unit, isolated in STAGES:
+            error = None
+            if isolated:
+                status, timed_run = measure_in_child(func, bench, False, args.timeout)
+                traced_run = None
+                if status == 'ok':
+                    traced_status, traced_run = measure_in_child(func, bench, True, args.timeout)
+                    traced_run = traced_run if traced_status == 'ok' else None
+                else:
+                    error, timed_run = timed_run, None
+            else:
+                status = 'ok'
+                timed_run = measure(func, bench, False)
+                traced_run = measure(func, bench, True)
+
+            row = {'scale': bench.scale, 'players': n_players, 'rounds': n_rounds, 'teams': args.teams,
+                   'stage': name, 'unit': unit, 'items': None, 'seconds': None, 'per_second': None,
+                   'peak_mb': None, 'status': status, 'error': error}
+            if timed_run is not None:
+                items, seconds, _ = timed_run
+                row.update(items=items, seconds=seconds, per_second=items / seconds if seconds > 0 else None)
+            if traced_run is not None:
+                row['peak_mb'] = traced_run[2] / 2 ** 20
+            rows.append(row)
+            print(f"  {bench.scale:>10} {name:<22} {row['status']}{f' ({error})' if error else ''}", file=sys.stderr)
+    return rows
+
+
+def parse_scale(text):
+    players, rounds = text.lower().split('x')
+    return int(players), int(rounds)
+
+
+def read_baseline(file_path):
+    """Latest seconds per (scale, teams, stage) from an earlier --output file"""
+    baseline = {}
+    with open(file_path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('status') == 'ok':
+                baseline[(record['scale'], record['teams'], record['stage'])] = record['seconds']
+    return baseline
+
+
+def compare(results, baseline, tolerance):
+    """Stages that got slower than tolerance x the baseline (or stopped finishing)"""
+    regressions = []
+    for row in results.itertuples():
+        before = baseline.get((row.scale, row.teams, row.stage))
+        if before is None:
+            continue
+        if row.status != 'ok':
+            regressions.append((row.scale, row.stage, before, row.status))
+        elif max(row.seconds, before) >= MIN_COMPARE_SECONDS and row.seconds > tolerance * before:
+            regressions.append((row.scale, row.stage, before, row.seconds))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="stage by stage scaling benchmark on synthetic drafts")
+    parser.add_argument("--scales", nargs="*", default=["156x4", "1000x10", "3000x20"],
+                        help="PLAYERSxROUNDS draft sizes")
+    parser.add_argument("--teams", type=int, default=30)
+    parser.add_argument("--scenarios", type=int, default=100, help="scenarios per team for the simulate stage")
+    parser.add_argument("--solves", type=int, default=3, help="scenarios solved in the solve stage")
+    parser.add_argument("--solver", default="mip", choices=["mip", "exact"])
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds before the solve stage is cut off")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="append the results to this json lines file")
+    parser.add_argument("--baseline", default=None, help="earlier --output file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="slowdown vs the baseline that fails the run")
+    args = parser.parse_args()
+
+    rows = []
+    for text in args.scales:
+        rows.extend(run_scale(*parse_scale(text), args))
+    results = pd.DataFrame(rows)
+    results['items'] = results['items'].astype('Int64')
+    results['ts'] = time.time()
+
+    pd.set_option('display.width', 140)
+    for scale, table in results.groupby('scale', sort=False):
+        print(f"\n{scale} ({table['teams'].iloc[0]} teams)")
+        print(table[['stage', 'items', 'unit', 'seconds', 'per_second', 'peak_mb', 'status']]
+              .to_string(index=False, float_format=lambda v: f"{v:,.3f}"))
+    # ru_maxrss is kilobytes on linux
+    print(f"\nprocess peak rss: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")
+
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            for record in results.to_dict('records'):
+                f.write(json.dumps(record) + "\n")
+
+    if args.baseline:
+        regressions = compare(results, read_baseline(args.baseline), args.tolerance)
+        for scale, stage, before, after in regressions:
+            now = after if isinstance(after, str) else f"{after:.3f}s"
+            print(f"REGRESSION {scale} {stage}: {before:.3f}s -> {now}")
+        if regressions:
+            sys.exit(1)
+        print(f"no stage slower than {args.tolerance}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
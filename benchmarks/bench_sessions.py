@@ -0,0 +1,67 @@
+# resident memory of the dashboard with 1, 10 and 100 sessions open in one process
+# every session is a streamlit AppTest run of streamlit_app.py with its own team selected, kept alive the way
+# the server keeps a connected viewer's session (its session_state and last rendered page), so the growth
+# per session is what each extra viewer costs on top of the data every session shares
+#
+# usage (from the repo root): python benchmarks/bench_sessions.py [--sessions 1 10 100]
+
+import argparse
+import gc
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+
+def rss_mb():
+    """Resident set size of this process right now (linux)"""
+    with open("/proc/self/status", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("no VmRSS in /proc/self/status")
+
+
+def open_session(index):
+    """One viewer: a fresh session that picks a team (round robin) and renders the page"""
+    session = AppTest.from_file(str(ROOT / "streamlit_app.py"), default_timeout=300)
+    session.run()
+    teams = session.selectbox[0].options
+    session.selectbox[0].select(teams[index % len(teams)])
+    session.run()
+    if session.exception:
+        raise RuntimeError(session.exception[0].value)
+    return session
+
+
+def main():
+    parser = argparse.ArgumentParser(description="dashboard memory per concurrent session")
+    parser.add_argument("--sessions", type=int, nargs="*", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    gc.collect()
+    before = rss_mb()
+    sessions = []
+    rows = []
+    for target in sorted(args.sessions):
+        while len(sessions) < target:
+            sessions.append(open_session(len(sessions)))
+        gc.collect()
+        rows.append((target, rss_mb()))
+
+    print(f"process before any session: {before:.0f} MB")
+    for target, rss in rows:
+        print(f"{target:>4} sessions: {rss:.0f} MB resident")
+    (first, first_rss), (last, last_rss) = rows[0], rows[-1]
+    if last > first:
+        print(f"~{(last_rss - first_rss) / (last - first):.2f} MB per extra session "
+              f"({time.perf_counter() - start:.0f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# MIP (HiGHS) vs exact branch and bound on every team's real inputs
+# both solvers see the exact same scenarios, and every optimal value has to match
+#
+# usage (from the repo root): python benchmarks/bench_solvers.py [--scenarios 20] [--seed 0]
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from draft_store import MLB_TEAMS  # noqa: E402
+from exact_solver import ExactPickModel  # noqa: E402
+from optimization import PickModel, load_player_data, load_problem, team_settings  # noqa: E402
+from simulation import simulate_team  # noqa: E402
+
+
+def time_solves(model, scenarios):
+    """(objective values, seconds per solve)"""
+    values = []
+    start = time.perf_counter()
+    for available in scenarios:
+        assignment = model.solve(available)
+        values.append(np.nan if assignment is None else model.objective(assignment))
+    return np.array(values), (time.perf_counter() - start) / len(scenarios)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MIP vs exact solver benchmark")
+    parser.add_argument("--scenarios", type=int, default=20, help="scenarios per (team, pick)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    player_data = load_player_data()
+    rows = []
+    for team_idx, team in enumerate(MLB_TEAMS):
+        problem = load_problem(team, player_data)
+        penalty_risk, penalty_hs, spending = team_settings(team)
+
+        selected = []
+        for pick in range(1, problem.num_picks + 1):
+            rng = np.random.default_rng([args.seed, team_idx, pick])
+            scenarios = simulate_team(problem, pick, args.scenarios, rng)
+            mip = PickModel(problem, penalty_risk, penalty_hs, spending, selected)
+            exact = ExactPickModel(problem, penalty_risk, penalty_hs, spending, selected)
+
+            mip_values, mip_time = time_solves(mip, scenarios)
+            exact_values, exact_time = time_solves(exact, scenarios)
+            same = np.allclose(mip_values, exact_values, atol=1e-6, equal_nan=True)
+            rows.append({
+                'team': team, 'pick': pick, 'mip_ms': mip_time * 1000, 'exact_ms': exact_time * 1000,
+                'speedup': mip_time / exact_time, 'same_optimum': same,
+            })
+
+            # carry a selection forward so the forced-selection path gets exercised too
+            assignment = exact.solve(scenarios[0])
+            if assignment is None:
+                break
+            selected.append(problem.names[assignment[pick - 1]])
+
+    results = pd.DataFrame(rows)
+    pd.set_option('display.width', 120)
+    print(results.groupby('team')[['mip_ms', 'exact_ms', 'speedup']].mean().round(2).to_string())
+    print()
+    print(f"solves per solver: {len(results) * args.scenarios}")
+    print(f"mean ms/solve  mip: {results['mip_ms'].mean():.2f}  exact: {results['exact_ms'].mean():.2f}")
+    print(f"all optima match: {results['same_optimum'].all()}")
+    if not results['same_optimum'].all():
+        print(results[~results['same_optimum']].to_string(index=False))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
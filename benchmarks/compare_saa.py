@@ -0,0 +1,82 @@
+# vote-based selection (N solves + majority vote) vs one SAA solve per pick, on the 2024 inputs
+# both methods see the same scenarios; each first-stage choice is then scored on a separate,
+# larger set of scenarios so the comparison isn't biased towards the sample SAA optimized over
+#
+# usage (from the repo root): python benchmarks/compare_saa.py [--teams BOS ARI] [--scenarios 20]
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from draft_store import MLB_TEAMS  # noqa: E402
+from optimization import load_player_data, load_problem, team_settings  # noqa: E402
+from saa import evaluate_first_stage, solve_saa, vote_choice  # noqa: E402
+from simulation import simulate_team  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SAA vs majority vote comparison")
+    parser.add_argument("--teams", nargs="*", default=list(MLB_TEAMS))
+    parser.add_argument("--scenarios", type=int, default=20, help="scenarios both methods optimize over")
+    parser.add_argument("--eval-scenarios", type=int, default=200, help="held-out scenarios for scoring")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    player_data = load_player_data()
+    rows = []
+    for team in args.teams:
+        team_idx = list(MLB_TEAMS).index(team)
+        problem = load_problem(team, player_data)
+        settings = team_settings(team)
+
+        # follow the vote-based path pick by pick (that is what the dashboard shows)
+        selected = []
+        for pick in range(1, problem.num_picks + 1):
+            scenarios = simulate_team(problem, pick, args.scenarios, np.random.default_rng([args.seed, team_idx, pick]))
+            held_out = simulate_team(problem, pick, args.eval_scenarios,
+                                     np.random.default_rng([args.seed + 1, team_idx, pick]))
+
+            start = time.perf_counter()
+            vote = vote_choice(problem, pick, scenarios, *settings, selected)
+            vote_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = solve_saa(problem, pick, scenarios, *settings, selected)
+            saa_time = time.perf_counter() - start
+            if vote is None or result is None:
+                break
+
+            rows.append({
+                'team': team,
+                'pick': pick,
+                'vote': vote,
+                'saa': result.player,
+                'agree': vote == result.player,
+                'vote_value': evaluate_first_stage(problem, pick, held_out, vote, *settings, selected),
+                'saa_value': evaluate_first_stage(problem, pick, held_out, result.player, *settings, selected),
+                'saa_in_sample': result.value,
+                'vote_solves': len(scenarios),
+                'saa_solves': 1,
+                'vote_s': vote_time,
+                'saa_s': saa_time,
+            })
+            selected.append(vote)
+
+    results = pd.DataFrame(rows)
+    pd.set_option('display.width', 160)
+    print(results.round(3).to_string(index=False))
+    print()
+    print(f"first-stage agreement: {results['agree'].mean():.1%}")
+    print(f"mean held-out value  vote: {results['vote_value'].mean():.3f}  saa: {results['saa_value'].mean():.3f}")
+    print(f"solver calls  vote: {results['vote_solves'].sum()}  saa: {results['saa_solves'].sum()}")
+    print(f"total time    vote: {results['vote_s'].sum():.1f}s  saa: {results['saa_s'].sum():.1f}s")
+
+
+if __name__ == "__main__":
+    main()
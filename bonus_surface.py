@@ -0,0 +1,117 @@
+# compact signing bonus surface
+# signing_bonus_df.csv is the MARS model (Code/MARS.R) evaluated at every pick for every player, so every
+# row is piecewise linear in the pick number with the same few knots. we keep the knots once and
+# 2 + len(knots) coefficients per player:
+#   bonus fraction = a + b * pick + sum_k c_k * max(0, pick - knot_k)
+# which reproduces the grid to float precision and works for picks past 295 too
+#
+# usage (from the repo root): python bonus_surface.py
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from simulation import INPUT_DIRECTORY
+
+BONUS_GRID_FILE = Path("Original_CSVs") / "signing_bonus_df.csv"
+SURFACE_FILE = Path(INPUT_DIRECTORY) / "bonus_surface.csv"
+
+# slope changes smaller than this are numerical noise, not a hinge
+KNOT_TOLERANCE = 1e-9
+
+
+def find_knots(grid, picks, tol=KNOT_TOLERANCE):
+    """Picks where any player's slope changes (grid is players x consecutive picks)"""
+    second_difference = np.diff(grid, n=2, axis=1)
+    return picks[1:-1][(np.abs(second_difference) > tol).any(axis=0)]
+
+
+def hinge_basis(picks, knots):
+    """(len(picks) x (2 + len(knots))) matrix of [1, pick, max(0, pick - knot)...]"""
+    picks = np.asarray(picks, dtype=np.float64)
+    return np.concatenate([
+        np.ones(picks.shape + (1,)),
+        picks[..., None],
+        np.maximum(0.0, picks[..., None] - np.asarray(knots, dtype=np.float64)),
+    ], axis=-1)
+
+
+class BonusSurface:
+    """Per-player hinge coefficients on a shared set of knots"""
+
+    def __init__(self, names, knots, coefficients):
+        self.names = np.asarray(names)
+        self.knots = np.asarray(knots, dtype=np.float64)
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        self.name_to_row = {}
+        for i, name in enumerate(self.names):
+            self.name_to_row.setdefault(name, i)
+
+    @property
+    def num_players(self):
+        return len(self.names)
+
+    def rows(self, names):
+        """Row of each name"""
+        return np.array([self.name_to_row[name] for name in names], dtype=np.intp)
+
+    def evaluate(self, players, picks):
+        """Bonus fraction for broadcastable arrays of player rows and pick numbers, in one call"""
+        players, picks = np.broadcast_arrays(np.asarray(players), np.asarray(picks))
+        return np.einsum('...k,...k->...', self.coefficients[players], hinge_basis(picks, self.knots))
+
+    def grid(self, picks, players=None):
+        """players x picks matrix (every player by default), same layout as the bonus csvs"""
+        coefficients = self.coefficients if players is None else self.coefficients[np.asarray(players)]
+        return coefficients @ hinge_basis(picks, self.knots).T
+
+    def team_bonus(self, pick_numbers):
+        """players x team picks, same layout as <TEAM>_bonus.csv"""
+        return self.grid(pick_numbers)
+
+
+def read_bonus_grid(file_path=BONUS_GRID_FILE):
+    """(names, players x picks grid, pick numbers) from signing_bonus_df.csv"""
+    df = pd.read_csv(file_path)
+    picks = np.array([int(str(c).split('_')[-1]) for c in df.columns[1:]])
+    return df.iloc[:, 0].astype(str).to_numpy(), df.iloc[:, 1:].to_numpy(dtype=np.float64), picks
+
+
+def fit_surface(names, grid, picks, knots=None):
+    """Least squares fit of every player's coefficients at once, returns (BonusSurface, max abs error)"""
+    if knots is None:
+        knots = find_knots(grid, picks)
+    basis = hinge_basis(picks, knots)
+    coefficients, *_ = np.linalg.lstsq(basis, grid.T, rcond=None)
+    surface = BonusSurface(names, knots, coefficients.T)
+    return surface, float(np.abs(surface.grid(picks) - grid).max())
+
+
+def save_surface(surface, file_path=SURFACE_FILE):
+    """One row per player: name, intercept, slope, then one column per knot (hinge_<pick>)"""
+    columns = ['intercept', 'slope'] + [f"hinge_{knot:g}" for knot in surface.knots]
+    df = pd.DataFrame(surface.coefficients, columns=columns)
+    df.insert(0, 'name', surface.names)
+    df.to_csv(file_path, index=False, float_format='%.17g')
+
+
+def load_surface(file_path=SURFACE_FILE):
+    """BonusSurface from a saved coefficients csv"""
+    df = pd.read_csv(file_path)
+    hinge_columns = [c for c in df.columns if c.startswith('hinge_')]
+    knots = [float(c.split('_', 1)[1]) for c in hinge_columns]
+    coefficients = df[['intercept', 'slope'] + hinge_columns].to_numpy(dtype=np.float64)
+    return BonusSurface(df['name'].astype(str).to_numpy(), knots, coefficients)
+
+
+def main():
+    names, grid, picks = read_bonus_grid()
+    surface, error = fit_surface(names, grid, picks)
+    save_surface(surface)
+    print(f"{len(names)} players, knots at {surface.knots.astype(int).tolist()}, max error {error:.2e}")
+    print(f"wrote {SURFACE_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# pick by pick alignment of the model's selections with a team's real draft, as one DataFrame
+# the s-th model selection lines up with the team's s-th actual pick (same as the old card layout)
+
+import numpy as np
+import pandas as pd
+
+from optimization import MAX_BONUS
+
+ALIGNMENT_COLUMNS = [
+    'Round', 'Pick', 'Model_Player', 'Model_Drafted', 'Model_Drafted_At', 'Model_Drafted_By', 'Model_Position',
+    'Predicted_Bonus', 'Model_Actual_Bonus', 'Optimization_Value', 'Actual_Player', 'Actual_Position',
+    'Actual_Bonus', 'Signed', 'Actual_Predicted',
+]
+
+
+def pick_alignment(enhanced_predictions, actual_team_df):
+    """One row per actual pick with the model's pick next to it (enhanced_predictions from enrich_predictions)"""
+    if actual_team_df is None or len(actual_team_df) == 0:
+        return pd.DataFrame(columns=ALIGNMENT_COLUMNS)
+
+    actual = actual_team_df.copy()
+    actual['Pick'] = pd.to_numeric(actual['Pick'], errors='coerce')
+    actual = actual.sort_values('Pick', kind='stable').reset_index(drop=True)
+
+    # model rows past the last actual pick have nothing to line up with, missing ones become NaN
+    model = enhanced_predictions.reset_index(drop=True).reindex(range(len(actual)))
+    drafted = model['Actually_Drafted'].eq(True)
+
+    drafted_at = ("Round " + model['Draft_Round'].astype(str) + ", Pick " + model['Draft_Pick'].astype(str))
+    table = pd.DataFrame({
+        'Round': actual['Round'].to_numpy(),
+        'Pick': actual['Pick'].to_numpy(),
+        'Model_Player': model['Name'].to_numpy(dtype=object),
+        'Model_Drafted': drafted.to_numpy(),
+        'Model_Drafted_At': np.where(drafted, drafted_at, ""),
+        'Model_Drafted_By': np.where(drafted, model['Team'].astype(str), ""),
+        'Model_Position': np.where(drafted, model['Position'].astype(str), ""),
+        'Predicted_Bonus': model['Optimization_Value'].to_numpy(dtype=np.float64) * MAX_BONUS,
+        'Model_Actual_Bonus': np.where(drafted, model['Actual_Bonus'].astype(str), ""),
+        'Optimization_Value': model['Optimization_Value'].to_numpy(dtype=np.float64),
+        'Actual_Player': actual['Name'].to_numpy(),
+        'Actual_Position': actual['Position'].to_numpy(),
+        'Actual_Bonus': actual['Bonus'].to_numpy(dtype=np.float64),
+        'Signed': actual['Signed'].eq('Y').to_numpy(),
+        'Actual_Predicted': actual['Name'].isin(enhanced_predictions['Name']).to_numpy(),
+    })
+    return table[ALIGNMENT_COLUMNS]
+
+
+def page(table, page_number, page_size):
+    """Rows of one (1-based) page"""
+    start = (page_number - 1) * page_size
+    return table.iloc[start:start + page_size]
+
+
+def num_pages(table, page_size):
+    return max(1, -(-len(table) // page_size))
+
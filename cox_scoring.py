@@ -0,0 +1,132 @@
+# CoxPH survival scoring straight from the fitted coefficients
+# the model in CoxPH.ipynb is S(pick | x) = S0(pick) ^ exp(beta . (x - mean)), so once beta, the training
+# means and the baseline curve S0 are known, every player at every pick is one broadcasted power -- no
+# per-player loop, no refit. the fit is exported to json so a new board (any data_fg file) can be scored
+# without lifelines or the notebook
+#
+# usage (from the repo root): python cox_scoring.py [--refit]
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from season_store import SEASON, available_seasons, drafted_boards, load_season, training_seasons
+from simulation import INPUT_DIRECTORY
+from survival_tensor import COVARIATES, NUM_PICKS, SURVIVAL_FILE, SurvivalTensor, load_survival
+
+MODEL_FILE = Path(INPUT_DIRECTORY) / "cox_model.json"
+
+
+class CoxModel:
+    """Fitted coefficients, training means and the baseline survival curve (at the means)"""
+
+    def __init__(self, covariates, coefficients, means, baseline_times, baseline_survival):
+        self.covariates = list(covariates)
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.baseline_times = np.asarray(baseline_times, dtype=np.float64)
+        self.baseline_survival = np.asarray(baseline_survival, dtype=np.float64)
+
+    def baseline(self, picks):
+        """S0 at each pick (a step function: a pick with no event keeps the value from the one before it)"""
+        position = np.searchsorted(self.baseline_times, np.asarray(picks, dtype=np.float64), side='right') - 1
+        return np.where(position >= 0, self.baseline_survival[np.maximum(position, 0)], 1.0)
+
+    def partial_hazard(self, x):
+        """exp(beta . (x - mean)) for every row of a players x covariates matrix"""
+        return np.exp((np.asarray(x, dtype=np.float64) - self.means) @ self.coefficients)
+
+    def survival(self, x, picks):
+        """players x picks S(pick | player) in one broadcast"""
+        return self.baseline(picks)[None, :] ** self.partial_hazard(x)[:, None]
+
+    def score_board(self, board, picks=None, dtype=np.float32):
+        """SurvivalTensor for a board (data_fg layout, or a frame that already has the dummies)"""
+        picks = np.arange(1, NUM_PICKS + 1) if picks is None else np.asarray(picks)
+        matrix = self.survival(design_matrix(board, self.covariates), picks).astype(dtype)
+        return SurvivalTensor(matrix, board['name'].astype(str).to_numpy(), picks)
+
+
+def design_matrix(board, covariates=COVARIATES):
+    """players x covariates, position dummies made from the position column when they aren't there yet"""
+    columns = {}
+    for covariate in covariates:
+        if covariate in board:
+            columns[covariate] = board[covariate].to_numpy(dtype=np.float64)
+        elif covariate.startswith('position_'):
+            columns[covariate] = (board['position'].astype(str) == covariate[len('position_'):]).to_numpy(np.float64)
+        else:
+            raise KeyError(f"board has no {covariate} column")
+    return np.column_stack([columns[c] for c in covariates])
+
+
+def fit_model(training=None):
+    """Fit the CoxPH model like CoxPH.ipynb (every player is an event at his pick number)
+
+    training is drafted board players (season_store.drafted_boards), every season before SEASON by default
+    """
+    from lifelines import CoxPHFitter
+
+    training_data = drafted_boards(training_seasons(SEASON)) if training is None else training
+    x = pd.DataFrame(design_matrix(training_data), columns=COVARIATES)
+    x['number'] = training_data['number'].to_numpy(dtype=np.float64)
+    x['event'] = True  # nobody is censored
+    cph = CoxPHFitter()
+    cph.fit(x, duration_col='number', event_col='event')
+
+    # lifelines centers the covariates on their training means before fitting, the baseline is the survival
+    # of that "mean" player
+    baseline = cph.baseline_survival_.iloc[:, 0]
+    return CoxModel(COVARIATES, cph.params_[COVARIATES].to_numpy(), x[COVARIATES].mean().to_numpy(),
+                    baseline.index.to_numpy(), baseline.to_numpy())
+
+
+def save_model(model, file_path=MODEL_FILE):
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump({
+            'covariates': model.covariates,
+            'coefficients': model.coefficients.tolist(),
+            'means': model.means.tolist(),
+            'baseline_times': model.baseline_times.tolist(),
+            'baseline_survival': model.baseline_survival.tolist(),
+        }, f, indent=1)
+
+
+def load_model(file_path=MODEL_FILE):
+    with open(file_path, encoding="utf-8") as f:
+        model = json.load(f)
+    return CoxModel(model['covariates'], model['coefficients'], model['means'], model['baseline_times'],
+                    model['baseline_survival'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="score draft boards with the exported CoxPH model")
+    parser.add_argument("--refit", action="store_true", help="refit on the seasons before 2024 and rewrite the json")
+    args = parser.parse_args()
+
+    if args.refit or not MODEL_FILE.exists():
+        model = fit_model()
+        save_model(model)
+        print(f"wrote {MODEL_FILE}")
+    model = load_model()
+
+    # survival.npy was built from lifelines' predict_survival_function on the 2024 players
+    players = load_season(SEASON).drafted_board()
+    reference = load_survival(mmap=False)
+    ours = model.score_board(players, reference.picks, dtype=np.float64).matrix
+    print(f"max abs difference vs {SURVIVAL_FILE}: {np.abs(ours - reference.matrix).max():.2e}")
+
+    for season in available_seasons():
+        board = load_season(season).board
+        start = time.perf_counter()
+        tensor = model.score_board(board)
+        print(f"{season}: {tensor.shape[0]} players x {tensor.shape[1]} picks in "
+              f"{(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+# one-shot ingest of the optimization outputs + real draft results
+# everything gets normalized into one typed parquet file (draft_store.parquet) so the
+# dashboard doesn't have to regex parse the julia dumps on every rerun
+# the loaded DraftStore is cached per process and shared read-only by every session: per team slices and
+# anything derived from it (comparisons, takeaways) are built once, team / position / school are categoricals
+# the parquet carries the (file, mtime) signature of the csvs it was built from, so adding, changing or deleting
+# any of them makes it stale, and it is written to a temporary file and renamed into place, so sessions and
+# report workers rebuilding it at the same time never read half a file
+
+import json
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from name_index import NameIndex
+from perf import cache_event, timed
+
+STORE_FILE = "draft_store.parquet"
+RESULTS_FILE = "data_ba-results.csv"
+# written by league_runner.py, when it is there it takes over from the julia dumps
+LEAGUE_RESULTS_FILE = "league_results.parquet"
+
+#MLB team abbreviatoins
+MLB_TEAMS = {
+    'ARI': 'Arizona Diamondbacks',
+    'ATL': 'Atlanta Braves',
+    'BAL': 'Baltimore Orioles',
+    'BOS': 'Boston Red Sox',
+    'CHC': 'Chicago Cubs',
+    'CHW': 'Chicago White Sox',
+    'CIN': 'Cincinnati Reds',
+    'CLE': 'Cleveland Guardians',
+    'COL': 'Colorado Rockies',
+    'DET': 'Detroit Tigers',
+    'HOU': 'Houston Astros',
+    'KCR': 'Kansas City Royals',
+    'LAA': 'Los Angeles Angels',
+    'LAD': 'Los Angeles Dodgers',
+    'MIA': 'Miami Marlins',
+    'MIL': 'Milwaukee Brewers',
+    'MIN': 'Minnesota Twins',
+    'NYM': 'New York Mets',
+    'NYY': 'New York Yankees',
+    'ATH': 'Athletics',
+    'PHI': 'Philadelphia Phillies',
+    'PIT': 'Pittsburgh Pirates',
+    'SDP': 'San Diego Padres',
+    'SFG': 'San Francisco Giants',
+    'SEA': 'Seattle Mariners',
+    'STL': 'St. Louis Cardinals',
+    'TBR': 'Tampa Bay Rays',
+    'TEX': 'Texas Rangers',
+    'TOR': 'Toronto Blue Jays',
+    'WSN': 'Washington Nationals'
+}
+
+# name mappings in ou rdata
+TEAM_NAME_MAPPING = {name: abbrev for abbrev, name in MLB_TEAMS.items()}
+
+PREDICTION_COLUMNS = ['Team_Abbrev', 'Selection', 'Name', 'Optimization_Value']
+RESULT_COLUMNS = ['Round', 'Pick', 'Team', 'Name', 'Position', 'School', 'Signed', 'Bonus', 'Team_Abbrev']
+# a few dozen distinct values over thousands of rows, stored once each as categories
+CATEGORY_COLUMNS = ['Team_Abbrev', 'Team', 'Position', 'School']
+
+# parquet metadata key of the source signature the store was built from
+SIGNATURE_KEY = b'draft_store.signature'
+
+# in-process cache, data_directory -> DraftStore
+_STORE_CACHE = {}
+
+
+def team_file_name(team_abbrev):
+    """Output file name for a team (Athletics are ATH sometimes and OAK other times...)"""
+    if team_abbrev == 'ATH':
+        return "output_OAK.csv"
+    return f"output_{team_abbrev}.csv"
+
+
+def categorize(df):
+    """The low cardinality string columns as categoricals (whichever of CATEGORY_COLUMNS df has)"""
+    columns = [col for col in CATEGORY_COLUMNS if col in df.columns]
+    return df.astype({col: 'category' for col in columns})
+
+
+@timed()
+def parse_team_output(file_path):
+    """Parse one optimization output file into a Name/Optimization_Value frame"""
+    df = pd.read_csv(file_path)
+
+    # necessary b/c of julia style dataframe outputs...
+    if df.shape == (1, 1):
+        # raw string data
+        raw_data = str(df.iloc[0, 0])
+
+        # number │ name number
+        pattern = r'(\d+)\s*│\s*([^│]+?)\s+([\d.]+)'
+        players = []
+        bonuses = []
+        for row_num, name, bonus in re.findall(pattern, raw_data):
+            try:
+                bonuses.append(float(bonus))
+                players.append(name.strip())
+            except ValueError:
+                continue
+
+        if not players:
+            return None
+        df = pd.DataFrame({'Name': players, 'Optimization_Value': bonuses})
+
+    # more standard csv format
+    elif len(df) > 0 and str(df.iloc[0, 0]).strip() in ['Any', 'String', 'Float64', 'Int64']:
+        df = df.iloc[1:].reset_index(drop=True)
+
+    # standard colnames
+    if df.shape[1] >= 2:
+        if 'Name' not in df.columns or ('Bonus' not in df.columns and 'Optimization_Value' not in df.columns):
+            df.columns = ['Name', 'Optimization_Value'] + list(df.columns[2:])
+
+    if 'Bonus' in df.columns and 'Optimization_Value' not in df.columns:
+        df = df.rename(columns={'Bonus': 'Optimization_Value'})
+    if 'Name' not in df.columns or 'Optimization_Value' not in df.columns:
+        return None
+
+    df = df.dropna(subset=['Name'])
+    df['Name'] = df['Name'].astype(str)
+    df['Optimization_Value'] = pd.to_numeric(df['Optimization_Value'], errors='coerce')
+    return df[['Name', 'Optimization_Value']].reset_index(drop=True)
+
+
+@timed()
+def parse_results(file_path):
+    """Read data_ba-results.csv with proper types (bonus as a number, team abbreviation added)"""
+    df = pd.read_csv(file_path, dtype={'Round': str})
+    df['Pick'] = pd.to_numeric(df['Pick'], errors='coerce').astype('Int64')
+    df['Bonus'] = pd.to_numeric(df['Bonus'].astype(str).str.replace(r'[$,]', '', regex=True), errors='coerce')
+
+    # add abbreviations to make filtering more user friendly
+    df['Team_Abbrev'] = df['Team'].map(TEAM_NAME_MAPPING)
+    return categorize(df[RESULT_COLUMNS])
+
+
+def source_files(data_directory="Optimization_CSVs"):
+    """All csv files the store is built from"""
+    data_directory = Path(data_directory)
+    files = [data_directory / team_file_name(abbrev) for abbrev in MLB_TEAMS]
+    files.append(data_directory / RESULTS_FILE)
+    files.append(data_directory / LEAGUE_RESULTS_FILE)
+    return [f for f in files if f.exists()]
+
+
+@timed()
+def source_signature(data_directory="Optimization_CSVs"):
+    """(file, mtime) pairs, used to tell when the store is stale"""
+    return tuple((f.name, f.stat().st_mtime_ns) for f in source_files(data_directory))
+
+
+def read_league_results(file_path):
+    """Predictions from a league_runner.py results table (already typed, no parsing needed)"""
+    table = pd.read_parquet(file_path)
+    return table[PREDICTION_COLUMNS]
+
+
+@timed()
+def ingest(data_directory="Optimization_CSVs"):
+    """Parse every team output and the results file into (predictions, results) frames"""
+    data_directory = Path(data_directory)
+
+    frames = []
+    league_teams = set()
+    league_path = data_directory / LEAGUE_RESULTS_FILE
+    if league_path.exists():
+        league = read_league_results(league_path)
+        league_teams = set(league['Team_Abbrev'])
+        frames.append(league)
+
+    for abbrev in MLB_TEAMS:
+        if abbrev in league_teams:
+            continue
+        file_path = data_directory / team_file_name(abbrev)
+        if not file_path.exists():
+            continue
+        team_df = parse_team_output(file_path)
+        if team_df is None:
+            continue
+        team_df.insert(0, 'Selection', range(1, len(team_df) + 1))
+        team_df.insert(0, 'Team_Abbrev', abbrev)
+        frames.append(team_df)
+
+    if frames:
+        predictions = pd.concat(frames, ignore_index=True).sort_values(['Team_Abbrev', 'Selection'], kind='stable')
+        predictions = predictions.reset_index(drop=True)
+    else:
+        predictions = pd.DataFrame(columns=PREDICTION_COLUMNS)
+    predictions = predictions.astype({'Team_Abbrev': str, 'Selection': 'int64', 'Name': str, 'Optimization_Value': 'float64'})
+
+    results_path = data_directory / RESULTS_FILE
+    results = parse_results(results_path) if results_path.exists() else None
+
+    return categorize(predictions[PREDICTION_COLUMNS]), results
+
+
+@timed()
+def write_store(predictions, results, store_path, signature=()):
+    """Write both tables into a single parquet file (a Source column tells them apart), with the source
+    signature in its metadata"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    model = predictions.assign(Source='model')
+    parts = [model]
+    if results is not None:
+        parts.append(results.assign(Source='actual'))
+    combined = pd.concat(parts, ignore_index=True)
+    combined['Source'] = combined['Source'].astype('category')
+    table = pa.Table.from_pandas(combined, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SIGNATURE_KEY] = json.dumps(list(signature)).encode()
+
+    store_path = Path(store_path)
+    with tempfile.NamedTemporaryFile(dir=store_path.parent, suffix=".parquet", delete=False) as f:
+        pq.write_table(table.replace_schema_metadata(metadata), f)
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, store_path)
+
+
+@timed()
+def read_store(store_path):
+    """Split the parquet file back into (predictions, results, source signature it was built from)"""
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(store_path)
+    signature = json.loads((table.schema.metadata or {}).get(SIGNATURE_KEY, b'null'))
+    signature = tuple(tuple(entry) for entry in signature) if signature is not None else None
+    combined = table.to_pandas()
+    predictions = combined[combined['Source'] == 'model'][PREDICTION_COLUMNS].reset_index(drop=True)
+    predictions['Selection'] = predictions['Selection'].astype('int64')
+
+    actual = combined[combined['Source'] == 'actual']
+    results = categorize(actual[RESULT_COLUMNS].reset_index(drop=True)) if len(actual) > 0 else None
+    return categorize(predictions), results, signature
+
+
+class DraftStore:
+    """Parsed predictions + results, with each team's predictions and results pre-sliced
+
+    one store per process is shared by every dashboard session, so nothing here is modified after it is
+    built (copy-on-write means a caller that changes a frame it got from here changes its own copy)
+    """
+
+    def __init__(self, predictions, results, signature=()):
+        self.predictions = predictions
+        self.results = results
+        self.signature = signature
+        self._name_index = None
+        self._derived = {}
+        self._lock = threading.Lock()
+        self.by_team = {
+            abbrev: team_df.drop(columns=['Team_Abbrev', 'Selection']).reset_index(drop=True)
+            for abbrev, team_df in predictions.groupby('Team_Abbrev', sort=False, observed=True)
+        }
+        self.results_by_team = {}
+        if results is not None:
+            self.results_by_team = {
+                abbrev: team_df for abbrev, team_df in results.groupby('Team_Abbrev', sort=False, observed=True)
+            }
+
+    def team_predictions(self, team_abbrev):
+        """Predictions for one team, in selection order (None if the team has no output)"""
+        return self.by_team.get(team_abbrev)
+
+    def team_results(self, team_abbrev):
+        """One team's rows of the real draft results (None without a results file)"""
+        if self.results is None:
+            return None
+        return self.results_by_team.get(team_abbrev, self.results.iloc[:0])
+
+    def derived(self, key, build):
+        """Something computed from this store (a team's comparison, the takeaways), built once and shared
+
+        it goes away with the store, so a change to the source files rebuilds it too
+        """
+        with self._lock:
+            value = self._derived.get(key)
+        cache_event(f'store.{key[0] if isinstance(key, tuple) else key}', value is not None)
+        if value is None:
+            value = build()
+            with self._lock:
+                value = self._derived.setdefault(key, value)
+        return value
+
+    @property
+    def name_index(self):
+        """Name index over the results, built the first time it is needed"""
+        if self.results is not None:
+            cache_event('name_index', self._name_index is not None)
+        if self._name_index is None and self.results is not None:
+            self._name_index = NameIndex.from_frame(self.results)
+        return self._name_index
+
+
+@timed()
+def build_store(data_directory="Optimization_CSVs", store_path=None):
+    """Re-ingest the csvs and (re)write the parquet store"""
+    store_path = Path(store_path) if store_path else Path(data_directory) / STORE_FILE
+    signature = source_signature(data_directory)
+    predictions, results = ingest(data_directory)
+    try:
+        write_store(predictions, results, store_path, signature)
+    except (ImportError, OSError):
+        # no pyarrow or read-only folder, we just keep it in memory
+        pass
+    return DraftStore(predictions, results, signature)
+
+
+def load_store(data_directory="Optimization_CSVs"):
+    """Cached store: memory first, then the parquet file, then a fresh ingest if anything changed"""
+    key = str(Path(data_directory).resolve())
+    signature = source_signature(data_directory)
+
+    cached = _STORE_CACHE.get(key)
+    cache_event('store.memory', cached is not None and cached.signature == signature)
+    if cached is not None and cached.signature == signature:
+        return cached
+
+    store_path = Path(data_directory) / STORE_FILE
+    store = None
+    if store_path.exists():
+        try:
+            predictions, results, stored_signature = read_store(store_path)
+            if stored_signature == signature:
+                store = DraftStore(predictions, results, signature)
+        except (ImportError, OSError, ValueError, KeyError):
+            store = None
+    cache_event('store.parquet', store is not None)
+    if store is None:
+        store = build_store(data_directory, store_path)
+
+    _STORE_CACHE[key] = store
+    return store
+
+
+if __name__ == "__main__":
+    store = build_store()
+    print(f"{len(store.predictions)} model selections for {len(store.by_team)} teams, "
+          f"{0 if store.results is None else len(store.results)} actual picks")
@@ -0,0 +1,232 @@
+# exact solver for the per-scenario draft problem, without a general MIP solver
+# a team only makes a handful of picks, so we branch pick by pick (depth first) over the available
+# players in order of FV - lambda_1 * Risk - lambda_2 * HS, and prune with
+#   - value bound: current value + best available score at every remaining pick
+#   - budget bound: current spend + cheapest available bonus at every remaining pick
+#   - position caps (at most 2 per capped position)
+# it returns the same optimal value as PickModel (the assignment can differ when there are ties)
+
+import numpy as np
+
+from optimization import MAX_BONUS, position_caps
+from presolve import Presolver, PresolveStats
+
+# same idea as the MIP solver's feasibility tolerance, so both agree on budget-tight solutions
+BUDGET_TOLERANCE = 1e-6
+
+
+def is_feasible(assignment, bonus, available, budget, position_codes, caps, forced=None, filled_rounds=()):
+    """Whether a per-round assignment fits the availability, budget, position caps and forced picks"""
+    assignment = np.asarray(assignment)
+    rounds = np.arange(len(assignment))
+    # -1 marks a round filled by a player who isn't on the board, and only those rounds may have it
+    on_board = assignment >= 0
+    if on_board[list(filled_rounds)].any() or not on_board[np.setdiff1d(rounds, filled_rounds)].all():
+        return False
+    if forced is not None:
+        forced_rounds = np.flatnonzero(forced.any(axis=0))
+        if not forced[assignment[forced_rounds], forced_rounds].all():
+            return False
+    assignment, rounds = assignment[on_board], rounds[on_board]
+    if len(set(assignment.tolist())) != len(assignment) or not available[assignment, rounds].all():
+        return False
+    if bonus[assignment, rounds].sum() > budget + BUDGET_TOLERANCE:
+        return False
+    counts = np.bincount(np.asarray(position_codes)[assignment], minlength=len(caps))
+    return bool((counts <= np.asarray(caps)).all())
+
+
+def budget_multiplier(candidates, limit, grid=np.concatenate([[0.0], np.geomspace(1e-2, 1e4, 49)])):
+    """mu >= 0 minimizing the priced bound sum over picks of max(score - mu * bonus) + mu * limit at the root
+
+    0 when the budget doesn't bind, then the bound is the plain best score per pick
+    """
+    # the bound is convex in mu, and it doesn't go down from 0 if the best player at every pick fits
+    if sum(bonuses[0] for rows, scores, bonuses in candidates) <= limit:
+        return 0.0
+    bound = grid * limit
+    for rows, scores, bonuses in candidates:
+        bound += (np.asarray(scores)[None, :] - grid[:, None] * np.asarray(bonuses)[None, :]).max(axis=1)
+    return float(grid[np.argmin(bound)])
+
+
+def distinct_best(pool, score, position_codes, caps, k):
+    """Most the k best distinct players in pool can be worth within the position caps"""
+    counts = [0] * len(caps)
+    total, taken = 0.0, 0
+    for i in sorted(pool, key=lambda i: -score[i]):
+        if taken == k:
+            break
+        code = position_codes[i]
+        if counts[code] < caps[code]:
+            counts[code] += 1
+            total += score[i]
+            taken += 1
+    return total
+
+
+def solve_assignment(score, bonus, available, budget, position_codes, caps, forced=None, incumbent=None,
+                     filled_rounds=()):
+    """Best player per round (array of player rows) or None if no feasible selection exists
+
+    a feasible incumbent (e.g. the previous solution) seeds the search, so branches that can't beat it
+    are cut straight away. filled_rounds were used on players we have no data for, they come back as -1
+    """
+    available = np.asarray(available, dtype=bool)
+    num_players, num_rounds = available.shape
+
+    # forced (player, round) pairs: that round only has that player, and he can't go anywhere else
+    forced_rounds = {}
+    if forced is not None:
+        for i, r in zip(*np.nonzero(forced)):
+            forced_rounds[int(r)] = int(i)
+    forced_players = set(forced_rounds.values())
+
+    candidates = []
+    for r in range(num_rounds):
+        if r in filled_rounds:
+            candidates.append(([-1], [0.0], [0.0]))
+            continue
+        if r in forced_rounds:
+            rows = np.array([forced_rounds[r]])
+        else:
+            rows = np.flatnonzero(available[:, r])
+            if forced_players:
+                rows = rows[~np.isin(rows, list(forced_players))]
+            # best score first, cheaper first among equal scores
+            rows = rows[np.lexsort((bonus[rows, r], -score[rows]))]
+        if len(rows) == 0:
+            return None
+        candidates.append((rows.tolist(), score[rows].tolist(), bonus[rows, r].tolist()))
+
+    # branch on the most constrained picks first
+    order = sorted(range(num_rounds), key=lambda r: len(candidates[r][0]))
+
+    # optimistic bounds for the rounds after each depth (ignoring who is already taken). a score doesn't
+    # depend on the pick, so the rest is also worth at most its best distinct players within the position
+    # caps (greedy is exact for that), which is much tighter when one player is the best at several picks
+    best_rest = [0.0] * (num_rounds + 1)
+    cheapest_rest = [0.0] * (num_rounds + 1)
+    pool = set()
+    for depth in range(num_rounds - 1, -1, -1):
+        rows, scores, bonuses = candidates[order[depth]]
+        pool.update(i for i in rows if i >= 0)
+        cheapest_rest[depth] = cheapest_rest[depth + 1] + min(bonuses)
+        best_rest[depth] = min(best_rest[depth + 1] + scores[0],
+                               distinct_best(pool, score, position_codes, caps, num_rounds - depth))
+
+    limit = budget + BUDGET_TOLERANCE
+
+    # budget aware bound for when the budget binds: for any mu >= 0 the rest of the draft is worth at most
+    # sum over picks of max(score - mu * bonus) + mu * (budget left), mu picked to make it tightest at the root
+    mu = budget_multiplier(candidates, limit)
+    priced_rest = [0.0] * (num_rounds + 1)
+    for depth in range(num_rounds - 1, -1, -1):
+        rows, scores, bonuses = candidates[order[depth]]
+        priced_rest[depth] = priced_rest[depth + 1] + max(s - mu * b for s, b in zip(scores, bonuses))
+    counts = [0] * len(caps)
+    used = set()
+    chosen = [0] * num_rounds
+    best = {'value': -np.inf, 'assignment': None}
+    if incumbent is not None and is_feasible(incumbent, bonus, available, budget, position_codes, caps, forced,
+                                                 filled_rounds):
+        incumbent = np.asarray(incumbent)
+        best['value'] = float(np.sum(score[incumbent[incumbent >= 0]]))
+        best['assignment'] = list(incumbent)
+
+    def branch(depth, value, spend):
+        if depth == num_rounds:
+            if value > best['value']:
+                best['value'] = value
+                best['assignment'] = list(chosen)
+            return
+
+        rows, scores, bonuses = candidates[order[depth]]
+        rest_value = best_rest[depth + 1]
+        rest_spend = spend + cheapest_rest[depth + 1]
+        priced = priced_rest[depth + 1] + mu * (limit - spend)
+        for i, s, b in zip(rows, scores, bonuses):
+            # sorted by score, so nothing further down this list can beat the incumbent
+            if value + s + rest_value <= best['value'] + 1e-9:
+                break
+            if i < 0:
+                chosen[order[depth]] = i
+                branch(depth + 1, value, spend)
+                continue
+            if i in used or rest_spend + b > limit:
+                continue
+            if mu and value + s - mu * b + priced <= best['value'] + 1e-9:
+                continue
+            code = position_codes[i]
+            if counts[code] >= caps[code]:
+                continue
+
+            used.add(i)
+            counts[code] += 1
+            chosen[order[depth]] = i
+            branch(depth + 1, value + s, spend + b)
+            counts[code] -= 1
+            used.discard(i)
+
+    branch(0, 0.0, 0.0)
+    if best['assignment'] is None:
+        return None
+    return np.array(best['assignment'])
+
+
+class ExactPickModel:
+    """Drop-in for optimization.PickModel that uses the branch and bound above"""
+
+    def __init__(self, problem, penalty_risk, penalty_hs, spending, selected_players=(), presolve=True):
+        self.problem = problem
+        self.num_players = problem.num_players
+        self.num_rounds = problem.num_picks
+        self.score = problem.scores(penalty_risk, penalty_hs)
+        self.budget = spending / MAX_BONUS
+        self.position_codes, self.caps = position_caps(problem.position)
+        self.position_codes = self.position_codes.tolist()
+        self.forced = np.zeros((self.num_players, self.num_rounds), dtype=bool)
+        self.filled_rounds = ()
+        # presolve can also be a Presolver built for the same scores, shared between models (live_draft.Board)
+        if isinstance(presolve, Presolver):
+            self.presolver = presolve
+        else:
+            self.presolver = Presolver(self.score, problem.bonus, self.position_codes, self.caps) if presolve else None
+        self.stats = PresolveStats()
+        self.set_selected_players(selected_players)
+
+    def set_selected_players(self, selected_players, fill_unknown=False):
+        """Force the s-th already selected player into round s
+
+        with fill_unknown, a selection that isn't in the data still uses up its round (live drafts)
+        """
+        self.forced[:] = False
+        filled = []
+        for s, name in enumerate(selected_players[:self.num_rounds]):
+            i = self.problem.name_to_row.get(name)
+            if i is not None:
+                self.forced[i, s] = True
+            elif fill_unknown:
+                filled.append(s)
+        self.filled_rounds = tuple(filled)
+
+    def solve(self, available, incumbent=None):
+        """Solve for one (players x picks) availability matrix, returns the player row per round (or None)"""
+        available = np.asarray(available, dtype=bool) | self.forced
+        if self.presolver is not None:
+            # branching only ever sees the players presolve keeps
+            presolved = self.presolver(available, self.forced, self.filled_rounds)
+            self.stats.add(presolved.stats)
+            # a warm start keeps its own variables, presolve may have dropped one of its tied players
+            if incumbent is not None and is_feasible(incumbent, self.problem.bonus, available, self.budget,
+                                                     self.position_codes, self.caps, self.forced, self.filled_rounds):
+                rounds = np.flatnonzero(np.asarray(incumbent) >= 0)
+                presolved.keep[np.asarray(incumbent)[rounds], rounds] = True
+            available = presolved.keep
+        return solve_assignment(self.score, self.problem.bonus, available, self.budget,
+                                self.position_codes, self.caps, self.forced, incumbent, self.filled_rounds)
+
+    def objective(self, assignment):
+        """Objective value of a per-round assignment"""
+        assignment = np.asarray(assignment)
+        return float(self.score[assignment[assignment >= 0]].sum())
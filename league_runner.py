@@ -0,0 +1,208 @@
+# runs the whole league (all 30 run_the_model calls) on a process pool
+# every (team, pick, scenario batch) is its own task with its own seed, so the result doesn't depend
+# on how many workers there are or what order tasks finish in
+# with --joint every team's scenarios come from one shared bank of whole-league drafts (league_simulation.py,
+# kept on disk by scenario_bank.py), batch b of every (team, pick) uses the same bank scenarios, so all teams
+# see the same simulated drafts
+# output is one typed table (league_results.parquet) that the dashboard reads through draft_store.py
+
+import argparse
+import logging
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from adaptive_sampling import PickStats, log_pick, log_team_summary, rank_votes, should_stop
+from draft_store import LEAGUE_RESULTS_FILE as LEAGUE_RESULTS_NAME, MLB_TEAMS
+from optimization import load_player_data, load_problem, pick_model_class, team_settings
+from simulation import simulate_team
+
+LEAGUE_RESULTS_FILE = Path("Optimization_CSVs") / LEAGUE_RESULTS_NAME
+
+RESULT_COLUMNS = ['Team_Abbrev', 'Selection', 'Pick_Number', 'Name', 'Votes', 'Runner_Up', 'Runner_Up_Votes',
+                  'Scenarios', 'Optimization_Value']
+
+# per-process cache so each worker only reads a team's csvs once
+_PROBLEMS = {}
+
+
+def get_problem(team_abbrev):
+    """DraftProblem for a team, loaded once per process"""
+    if team_abbrev not in _PROBLEMS:
+        if 'player_data' not in _PROBLEMS:
+            _PROBLEMS['player_data'] = load_player_data()
+        _PROBLEMS[team_abbrev] = load_problem(team_abbrev, _PROBLEMS['player_data'])
+    return _PROBLEMS[team_abbrev]
+
+
+def task_rng(seed, team_abbrev, pick, batch):
+    """Reproducible generator for one (team, pick, batch) task"""
+    team_idx = list(MLB_TEAMS).index(team_abbrev)
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(team_idx, pick, batch)))
+
+
+def run_batch(team_abbrev, pick, batch, n_scenarios, selected_players, settings, seed, solver="mip", bank=None):
+    """Simulate (or take from the shared bank) + solve one batch of scenarios, returns {player: votes}"""
+    problem = get_problem(team_abbrev)
+    penalty_risk, penalty_hs, spending = settings
+    if bank is not None:
+        scenarios = bank.team_scenarios(problem, pick)
+    else:
+        scenarios = simulate_team(problem, pick, n_scenarios, task_rng(seed, team_abbrev, pick, batch))
+    model = pick_model_class(solver)(problem, penalty_risk, penalty_hs, spending, selected_players)
+
+    votes = Counter()
+    for available in scenarios:
+        assignment = model.solve(available)
+        if assignment is not None:
+            votes[problem.names[assignment[pick - 1]]] += 1
+    return dict(votes)
+
+
+def batch_sizes(iterations, batch_size):
+    """Split iterations into batches of at most batch_size"""
+    return [min(batch_size, iterations - lo) for lo in range(0, iterations, batch_size)]
+
+
+def run_league(teams=None, iterations=100, batch_size=25, workers=None, seed=0, settings=None, solver="mip",
+               confidence=None, min_scenarios=None, joint=False):
+    """Run every team pick by pick, with all teams' batches for a pick going out to the pool together
+
+    With a confidence level, each team's pick only gets more batches until the leader is separated from
+    the runner-up (see adaptive_sampling.py), and `iterations` becomes the hard cap.
+    With joint, the scenarios come from one league-wide bank instead of each team simulating its own.
+    """
+    teams = list(teams or MLB_TEAMS)
+    settings = settings or {}
+    team_settings_used = {team: team_settings(team, **settings.get(team, {})) for team in teams}
+    num_picks = {team: get_problem(team).num_picks for team in teams}
+    selections = {team: [] for team in teams}
+    sizes = batch_sizes(iterations, batch_size)
+    min_scenarios = batch_size if min_scenarios is None else min_scenarios
+    rows = []
+    pick_stats = {team: [] for team in teams}
+
+    banks = [None] * len(sizes)
+    if joint:
+        from scenario_bank import get_bank
+
+        # the persistent (season, seed) bank, so reruns and experiments see exactly the same draws
+        bank = get_bank(seed=seed, n_scenarios=iterations)
+        bounds = np.cumsum([0] + sizes)
+        banks = [bank.scenarios(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for pick in range(1, max(num_picks.values()) + 1):
+            pending = [team for team in teams if pick <= num_picks[team]]
+            votes = {team: Counter() for team in pending}
+            used = {team: 0 for team in pending}
+            next_batch = {team: 0 for team in pending}
+            pvalues = {}
+
+            while pending:
+                # fixed mode sends every batch at once, adaptive mode one batch per undecided team per round
+                jobs = []
+                for team in pending:
+                    last = len(sizes) if confidence is None else next_batch[team] + 1
+                    for batch in range(next_batch[team], last):
+                        args = (team, pick, batch, sizes[batch], tuple(selections[team]), team_settings_used[team],
+                                seed, solver, banks[batch])
+                        jobs.append((team, batch, executor.submit(run_batch, *args) if executor else run_batch(*args)))
+                    next_batch[team] = last
+
+                for team, batch, job in jobs:
+                    votes[team].update(job.result() if executor else job)
+                    used[team] += sizes[batch]
+
+                still_pending = []
+                for team in pending:
+                    stop, pvalues[team] = should_stop(votes[team], used[team], 1.0 if confidence is None else confidence,
+                                                      min_scenarios, iterations, batch_size)
+                    if not stop and next_batch[team] < len(sizes):
+                        still_pending.append(team)
+                pending = still_pending
+
+            for team in teams:
+                if pick > num_picks[team]:
+                    continue
+                if not votes[team]:
+                    raise RuntimeError(f"{team}: no feasible scenario at pick {pick}")
+
+                ranked = rank_votes(votes[team])
+                player, count = ranked[0]
+                runner_up, runner_up_count = ranked[1] if len(ranked) > 1 else ("", 0)
+                selections[team].append(player)
+
+                stats = PickStats(team, pick, player, count, runner_up, runner_up_count, used[team], iterations,
+                                  pvalues[team])
+                log_pick(stats)
+                pick_stats[team].append(stats)
+
+                problem = get_problem(team)
+                rows.append({
+                    'Team_Abbrev': team,
+                    'Selection': pick,
+                    'Pick_Number': int(problem.pick_numbers[pick - 1]),
+                    'Name': player,
+                    'Votes': count,
+                    'Runner_Up': runner_up,
+                    'Runner_Up_Votes': runner_up_count,
+                    'Scenarios': used[team],
+                    'Optimization_Value': float(problem.bonus[problem.name_to_row[player], pick - 1]),
+                })
+    finally:
+        if executor:
+            executor.shutdown()
+
+    for team in teams:
+        log_team_summary(team, pick_stats[team])
+    return league_table(rows)
+
+
+def league_table(rows):
+    """Typed results table in team / selection order"""
+    table = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    table = table.astype({
+        'Team_Abbrev': str, 'Selection': 'int64', 'Pick_Number': 'int64', 'Name': str, 'Votes': 'int64',
+        'Runner_Up': str, 'Runner_Up_Votes': 'int64', 'Scenarios': 'int64', 'Optimization_Value': 'float64',
+    })
+    return table.sort_values(['Team_Abbrev', 'Selection']).reset_index(drop=True)
+
+
+def write_league_results(table, output=LEAGUE_RESULTS_FILE):
+    """Write the results table where draft_store.py picks it up"""
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    table.to_parquet(output, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the draft optimization for the whole league")
+    parser.add_argument("--teams", nargs="*", help="team abbreviations (default: all 30)")
+    parser.add_argument("--iterations", type=int, default=100, help="scenarios per pick")
+    parser.add_argument("--batch-size", type=int, default=25, help="scenarios per task")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--solver", choices=["mip", "exact"], default="mip")
+    parser.add_argument("--confidence", type=float, default=None,
+                        help="stop a pick early once the leader is separated at this level (e.g. 0.95)")
+    parser.add_argument("--min-scenarios", type=int, default=None, help="scenarios before early stopping can kick in")
+    parser.add_argument("--joint", action="store_true", help="take every team's scenarios from one league-wide bank")
+    parser.add_argument("--quiet", action="store_true", help="don't log per-pick stats")
+    parser.add_argument("--output", default=str(LEAGUE_RESULTS_FILE))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO, format="%(message)s")
+
+    table = run_league(args.teams, args.iterations, args.batch_size, args.workers, args.seed, solver=args.solver,
+                       confidence=args.confidence, min_scenarios=args.min_scenarios, joint=args.joint)
+    write_league_results(table, args.output)
+    print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# joint league simulation: the whole draft order (the 2024 pick order in season_store.py) played out once per scenario
+# instead of every team drawing its own availability columns from the marginals (30 separate, inconsistent
+# versions of the same draft), one bank of scenarios says where every player went, and every team's
+# availability tensor is a view of that bank
+#   - each player's draft slot is drawn from his CoxPH survival curve (inverse cdf of one uniform)
+#   - players landing on the same slot are ordered by a hazard weighted draw (gumbel top-k on the partial
+#     hazard), and a player bumped off a taken slot goes at the next open one, so each pick takes at most
+#     one board player. the picks left over are players who aren't on the board (156 players, 170 picks)
+#   - everything is vectorized across scenarios
+#
+# usage (from the repo root): python league_simulation.py [--scenarios 100] [--seed 0]
+
+import argparse
+import time
+
+import numpy as np
+
+from season_store import SEASON, load_season
+from survival_tensor import load_survival
+
+# draft_at value for a player nobody took in the modeled draft order
+UNDRAFTED = np.iinfo(np.int32).max
+
+# league banks are drawn in whole blocks of this many scenarios, each from its own child of the seed, so
+# the first n scenarios of a (seed) bank are the same however many scenarios it was built with
+BLOCK_SCENARIOS = 100
+
+
+class DraftBank:
+    """Where every player went (overall pick, or UNDRAFTED) in every scenario: scenarios x players"""
+
+    def __init__(self, draft_at, names, num_picks):
+        self.draft_at = draft_at
+        self.names = np.asarray(names)
+        self.num_picks = num_picks
+        self._team_availability = {}
+        self.name_to_row = {}
+        for i, name in enumerate(self.names):
+            self.name_to_row.setdefault(name, i)
+
+    @property
+    def num_scenarios(self):
+        return self.draft_at.shape[0]
+
+    def rows(self, names):
+        """Row of each name"""
+        return np.array([self.name_to_row[name] for name in names], dtype=np.intp)
+
+    def scenarios(self, lo, hi):
+        """The bank restricted to scenarios lo:hi (a view)"""
+        return DraftBank(self.draft_at[lo:hi], self.names, self.num_picks)
+
+    def taken_at(self):
+        """scenarios x picks board row taken at each pick (-1 where it was someone off the board)"""
+        taken = np.full((self.num_scenarios, self.num_picks), -1, dtype=np.int32)
+        scenario, player = np.nonzero(self.draft_at != UNDRAFTED)
+        taken[scenario, self.draft_at[scenario, player] - 1] = player
+        return taken
+
+    def availability(self, names, pick_numbers):
+        """scenarios x players x picks: still on the board when each of those picks comes up"""
+        draft_at = self.draft_at[:, self.rows(names)]
+        return draft_at[:, :, None] >= np.asarray(pick_numbers)[None, None, :]
+
+    def team_scenarios(self, problem, pick_number):
+        """Drop-in for simulation.simulate_team (one scenario per bank scenario, see condition_on_real)"""
+        # the unconditioned view is the same at every pick, so each team only gathers it once
+        key = (problem.team, problem.num_players, tuple(problem.pick_numbers))
+        if key not in self._team_availability:
+            self._team_availability[key] = self.availability(problem.names, problem.pick_numbers)
+        return condition_on_real(self._team_availability[key].copy(), problem.real, pick_number)
+
+
+def condition_on_real(available, real, pick_number):
+    """Overwrite a team's picks up to pick_number (1-based round) with the real availability, in place
+
+    a player who was really gone at that pick is gone at every pick after it, same as simulate_availability
+    """
+    known = min(max(int(pick_number), 0), real.shape[1])
+    available[:, :, :known] = real[None, :, :known]
+    if known > 0:
+        available[:, :, known:] &= real[None, :, known - 1, None]
+    return available
+
+
+def draft_slots(survival, uniforms, start_pick=1):
+    """scenarios x players slot each player is drawn to go at (UNDRAFTED past the last pick)
+
+    survival is players x picks 1..num_picks with P(still there at pick k) in column k - 1, and a player is
+    still there at every pick whose survival is at least his uniform. with start_pick the draw is
+    conditional on the player having made it to that pick
+    """
+    num_picks = survival.shape[1]
+    threshold = uniforms
+    if start_pick > 1:
+        threshold = uniforms * survival[None, :, start_pick - 1]
+    # survival never goes up, so the number of picks above the threshold is the last pick he's still there
+    last = (survival[None, :, :] >= threshold[:, :, None]).sum(axis=2)
+    slots = np.maximum(last, start_pick).astype(np.int64)
+    slots[last >= num_picks] = UNDRAFTED
+    return slots
+
+
+def assign_picks(slots, hazard, rng, start_pick=1, num_picks=None):
+    """Turn drawn slots into one player per pick: ties by a hazard weighted draw, collisions pushed back"""
+    n_scenarios, num_players = slots.shape
+    # gumbel top-k: sorting log(hazard) + gumbel noise is a draw in proportion to the hazards
+    keys = np.log(hazard)[None, :] + rng.gumbel(size=(n_scenarios, num_players))
+    order = np.lexsort((-keys, slots), axis=-1)
+    sorted_slots = np.take_along_axis(slots, order, axis=-1)
+
+    # a_k = max(slot_k, a_{k-1} + 1), i.e. a running max of slot_k - k
+    k = np.arange(num_players)
+    assigned = np.maximum.accumulate(np.minimum(sorted_slots, UNDRAFTED) - k, axis=-1) + k
+    limit = num_picks if num_picks is not None else UNDRAFTED - 1
+    assigned = np.where((sorted_slots == UNDRAFTED) | (assigned > limit), UNDRAFTED, assigned)
+
+    draft_at = np.empty_like(assigned)
+    np.put_along_axis(draft_at, order, assigned, axis=-1)
+    return draft_at.astype(np.int32)
+
+
+def simulate_draft(survival, hazard, num_picks, n_scenarios, rng=None, start_pick=1, taken=None, batch_size=None):
+    """DraftBank of n_scenarios full drafts of num_picks picks
+
+    survival: SurvivalTensor with at least num_picks columns
+    hazard: partial hazard of every player (same order), used to break ties
+    taken: {player row: pick} already made for real before start_pick, the same in every scenario
+    """
+    rng = np.random.default_rng(rng)
+    matrix = np.asarray(survival.matrix[:, :num_picks], dtype=np.float32)
+    hazard = np.asarray(hazard, dtype=np.float64)
+    num_players = matrix.shape[0]
+
+    draft_at = np.empty((n_scenarios, num_players), dtype=np.int32)
+    still_there = np.ones(num_players, dtype=bool)
+    if taken:
+        still_there[list(taken)] = False
+    free = np.flatnonzero(still_there)
+
+    # chunk over scenarios so the players x picks comparison never gets too big
+    batch_size = batch_size or n_scenarios
+    for lo in range(0, n_scenarios, batch_size):
+        hi = min(lo + batch_size, n_scenarios)
+        uniforms = rng.random((hi - lo, len(free)), dtype=np.float32)
+        slots = draft_slots(matrix[free], uniforms, start_pick)
+        draft_at[lo:hi, free] = assign_picks(slots, hazard[free], rng, start_pick, num_picks)
+        for row, pick in (taken or {}).items():
+            draft_at[lo:hi, row] = pick
+    return DraftBank(draft_at, survival.names, num_picks)
+
+
+def load_pick_order(season=SEASON):
+    """The draft order as a DataFrame (pick, team), in pick order"""
+    return load_season(season).picks
+
+
+def league_hazard(names, season=SEASON):
+    """Partial hazard of each player from the exported CoxPH model (cox_scoring.py)"""
+    from cox_scoring import design_matrix, load_model
+
+    players = load_season(season).drafted_board().drop_duplicates('name').set_index('name')
+    model = load_model()
+    return model.partial_hazard(design_matrix(players.loc[list(names)].reset_index(), model.covariates))
+
+
+def league_bank(n_scenarios=100, seed=0, survival=None, pick_order=None):
+    """The shared bank for the 2024 draft: every team's availability comes from this one simulation
+
+    a bigger bank for the same seed extends a smaller one (see BLOCK_SCENARIOS)
+    """
+    survival = load_survival() if survival is None else survival
+    pick_order = load_pick_order() if pick_order is None else pick_order
+    hazard = league_hazard(survival.names)
+    blocks = [simulate_draft(survival, hazard, len(pick_order), BLOCK_SCENARIOS,
+                             np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(block,)))).draft_at
+              for block in range(-(-n_scenarios // BLOCK_SCENARIOS))]
+    draft_at = np.concatenate(blocks)[:n_scenarios] if blocks else np.empty((0, len(survival.names)), np.int32)
+    return DraftBank(draft_at, survival.names, len(pick_order))
+
+
+def main():
+    from draft_store import MLB_TEAMS
+    from optimization import load_player_data, load_problem
+    from simulation import simulate_team
+
+    parser = argparse.ArgumentParser(description="simulate the whole league's draft jointly")
+    parser.add_argument("--scenarios", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    survival = load_survival()
+    player_data = load_player_data()
+    problems = {team: load_problem(team, player_data) for team in MLB_TEAMS}
+
+    # today: every team simulates every one of its picks on its own
+    start = time.perf_counter()
+    rng = np.random.default_rng(args.seed)
+    for problem in problems.values():
+        for pick in range(1, problem.num_picks + 1):
+            simulate_team(problem, pick, args.scenarios, rng)
+    separate = time.perf_counter() - start
+
+    # joint: one bank, every (team, pick) is a view of it
+    start = time.perf_counter()
+    bank = league_bank(args.scenarios, args.seed, survival)
+    simulated = time.perf_counter() - start
+    for problem in problems.values():
+        for pick in range(1, problem.num_picks + 1):
+            bank.team_scenarios(problem, pick)
+    joint = time.perf_counter() - start
+
+    print(f"per-team simulation: {separate * 1000:.1f} ms")
+    print(f"joint bank: {simulated * 1000:.1f} ms to simulate, {joint * 1000:.1f} ms with every team's views")
+
+    # both keep the marginals: mean availability at each team pick vs the survival curve
+    rng = np.random.default_rng(args.seed)
+    separate_errors, joint_errors = [], []
+    for problem in problems.values():
+        separate_marginal = simulate_team(problem, 0, args.scenarios, rng).mean(axis=0)
+        joint_marginal = bank.availability(problem.names, problem.pick_numbers).mean(axis=0)
+        separate_errors.append(np.abs(separate_marginal - problem.probs).mean())
+        joint_errors.append(np.abs(joint_marginal - problem.probs).mean())
+    print(f"mean abs difference from the survival marginals: per-team {np.mean(separate_errors):.4f}, "
+          f"joint {np.mean(joint_errors):.4f}")
+
+    taken = bank.taken_at()
+    board_picks = (taken >= 0).sum(axis=1)
+    print(f"board players taken per draft: {board_picks.mean():.1f} of {bank.num_picks} picks "
+          f"(never more than one per pick by construction)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+# live draft day mode: enter the real picks as they happen and get fresh recommendations
+# every team keeps its own scenario draws (made once), its exact solver model and the optimal solution of
+# every scenario. when a pick comes in, a team's scenarios only shrink (a player is gone) so any cached
+# solution that doesn't use the drafted player is still optimal -- only the scenarios that used him are
+# re-solved, starting from the old solution where it is still feasible. that reuse is for asking about a
+# team again between its own picks: when its pick comes on the clock, that pick switches from the simulated
+# draws to the real board (the feasible set grows), so nearly every scenario is re-solved then (replaying
+# 2024 re-solves ~98 of 100 per on-the-clock answer), warm started from the old solution
+# everything that doesn't change with the picks (board, pick order, team problems, draws, presolvers) lives in
+# one Board per process, so a dashboard session's draft only holds its picks, models and solutions
+#
+# usage (from the repo root): python live_draft.py  (replays the real 2024 draft and times every answer)
+
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from draft_store import MLB_TEAMS
+from exact_solver import ExactPickModel, is_feasible
+from name_index import NameIndex
+from optimization import load_player_data, load_problem, position_caps, team_settings
+from presolve import Presolver
+from season_store import SEASON, load_season
+
+# in-process cache of the read-only Board every session's LiveDraft works from
+_BOARDS = {}
+
+
+def load_pick_order(season=SEASON):
+    """{overall pick number: team} (the As are ATH like everywhere else in the app)"""
+    return load_season(season).pick_order()
+
+
+def rank_counts(counts):
+    """Most common first, ties broken by name"""
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+class Recommendation:
+    """What one team should do at its next pick, and how the rest of its draft looks"""
+
+    def __init__(self, team, the_round, pick_number, votes, plan, scenarios, solved, seconds):
+        self.team = team
+        self.the_round = the_round
+        self.pick_number = pick_number
+        self.votes = votes
+        self.plan = plan
+        self.scenarios = scenarios
+        self.solved = solved
+        self.seconds = seconds
+
+    @property
+    def player(self):
+        return self.votes[0][0] if self.votes else None
+
+    def votes_table(self, top=10):
+        """Candidates for the next pick with their share of scenarios"""
+        return pd.DataFrame([
+            {'Player': name, 'Scenarios': count, 'Share': count / self.scenarios}
+            for name, count in self.votes[:top]
+        ])
+
+    def plan_table(self):
+        """Most common player at each of the team's remaining picks"""
+        return pd.DataFrame([
+            {'Selection': r, 'Pick': pick, 'Player': ranked[0][0] if ranked else None,
+             'Share': ranked[0][1] / self.scenarios if ranked else 0.0}
+            for r, pick, ranked in self.plan
+        ])
+
+
+class Board:
+    """The read-only side of a live draft: player board, pick order, and per team problems, survival draws
+    and presolvers. one per process is shared by every LiveDraft (each dashboard session has its own draft)"""
+
+    def __init__(self, player_data, pick_order):
+        self.player_data = player_data
+        self.pick_order = pick_order
+        self.names = player_data['name'].astype(str).tolist()
+        self.name_index = NameIndex(self.names)
+        # best FV first
+        board = player_data.drop_duplicates('name').sort_values(['fv', 'risk'], ascending=[False, True])
+        self.order = board['name'].tolist()
+        self._problems = {}
+        self._draws = {}
+        self._presolvers = {}
+
+    def problem(self, team):
+        if team not in self._problems:
+            self._problems[team] = load_problem(team, self.player_data)
+        return self._problems[team]
+
+    def draws(self, team, seed, stream, n_scenarios):
+        """Survival draws for every scenario, made once: availability is rebuilt from these as the board changes"""
+        key = (team, seed, stream, n_scenarios)
+        if key not in self._draws:
+            problem = self.problem(team)
+            rng = np.random.default_rng([seed, stream])
+            draws = rng.random((n_scenarios, problem.num_players, problem.num_picks), dtype=np.float32) \
+                < problem.probs.astype(np.float32)[None]
+            draws.setflags(write=False)
+            self._draws[key] = draws
+        return self._draws[key]
+
+    def presolver(self, team, penalty_risk, penalty_hs):
+        """Presolver for a team's scores (it doesn't depend on the picks made or the budget)"""
+        key = (team, penalty_risk, penalty_hs)
+        if key not in self._presolvers:
+            problem = self.problem(team)
+            position_codes, caps = position_caps(problem.position)
+            self._presolvers[key] = Presolver(problem.scores(penalty_risk, penalty_hs), problem.bonus,
+                                              position_codes, caps)
+        return self._presolvers[key]
+
+
+def get_board():
+    """The default Board (fangraphs board + 2024 pick order), loaded once per process"""
+    if 'default' not in _BOARDS:
+        _BOARDS['default'] = Board(load_player_data(), load_pick_order())
+    return _BOARDS['default']
+
+
+class TeamState:
+    """Shared draws, this draft's model and per-scenario solutions for one team"""
+
+    def __init__(self, problem, model, draws):
+        self.problem = problem
+        self.model = model
+        self.selections = []
+        self.draws = draws
+        self.reset()
+
+    def reset(self):
+        """Forget the cached solutions"""
+        self.available = None
+        self.forced = None
+        self.solutions = [None] * len(self.draws)
+
+
+class LiveDraft:
+    """Board state for a draft in progress, with recommendations on demand"""
+
+    def __init__(self, teams=None, n_scenarios=100, seed=0, settings=None, player_data=None, pick_order=None):
+        self.teams = list(teams or MLB_TEAMS)
+        self.n_scenarios = n_scenarios
+        self.seed = seed
+        self.settings = settings or {}
+        if player_data is None and pick_order is None:
+            self.board = get_board()
+        else:
+            self.board = Board(load_player_data() if player_data is None else player_data,
+                               load_pick_order() if pick_order is None else pick_order)
+        self.player_data = self.board.player_data
+        self.pick_order = self.board.pick_order
+        self.picks = []
+        self.taken = set()
+        self._states = {}
+
+    def board_name(self, name):
+        """The board's spelling of a drafted player's name (unchanged if he isn't on the board)"""
+        row = self.board.name_index.find(name)
+        return self.board.names[row] if row >= 0 else name
+
+    def state(self, team):
+        """TeamState for a team, loaded the first time it is needed"""
+        if team not in self._states:
+            problem = self.board.problem(team)
+            settings = team_settings(team, **self.settings.get(team, {}))
+            model = ExactPickModel(problem, *settings, presolve=self.board.presolver(team, *settings[:2]))
+            draws = self.board.draws(team, self.seed, self.teams.index(team), self.n_scenarios)
+            state = TeamState(problem, model, draws)
+            # catch up on picks made before the team was loaded
+            for _, pick_team, name in self.picks:
+                if pick_team == team:
+                    state.selections.append(name)
+            state.model.set_selected_players(state.selections, fill_unknown=True)
+            self._states[team] = state
+        return self._states[team]
+
+    @property
+    def next_pick(self):
+        """Overall number of the pick that is on the clock"""
+        return self.picks[-1][0] + 1 if self.picks else 1
+
+    @property
+    def on_the_clock(self):
+        return self.pick_order.get(self.next_pick)
+
+    def available_players(self):
+        """Board players (best FV first) who haven't been drafted yet"""
+        return [name for name in self.board.order if name not in self.taken]
+
+    def record_pick(self, name, team=None, pick_number=None):
+        """Someone just got drafted (team defaults to whoever is on the clock)"""
+        pick_number = self.next_pick if pick_number is None else int(pick_number)
+        team = team or self.pick_order.get(pick_number)
+        name = self.board_name(name)
+        if team is None:
+            raise ValueError(f"no team owns pick {pick_number}, pass the team")
+        if name in self.taken:
+            raise ValueError(f"{name} has already been drafted")
+        self.picks.append((pick_number, team, name))
+        self.taken.add(name)
+        if team in self._states:
+            state = self._states[team]
+            state.selections.append(name)
+            state.model.set_selected_players(state.selections, fill_unknown=True)
+
+    def undo(self):
+        """Take back the last pick"""
+        if not self.picks:
+            return None
+        pick_number, team, name = self.picks.pop()
+        self.taken.discard(name)
+        if team in self._states:
+            state = self._states[team]
+            state.selections.pop()
+            state.model.set_selected_players(state.selections, fill_unknown=True)
+            # availability grows back, so the old solutions can't be trusted
+            state.reset()
+        return pick_number, team, name
+
+    def availability(self, team):
+        """(scenarios x players x picks) availability for a team given the board right now"""
+        state = self.state(team)
+        problem = state.problem
+        free = ~np.isin(problem.names, list(self.taken))
+        the_round = len(state.selections) + 1
+
+        # rounds already made are forced anyway, and the pick on the clock is known exactly
+        known = len(state.selections)
+        if known < problem.num_picks and problem.pick_numbers[known] <= self.next_pick:
+            known += 1
+
+        available = np.empty(state.draws.shape, dtype=bool)
+        available[:, :, :known] = free[None, :, None]
+        future = state.draws[:, :, known:] & free[None, :, None]
+        np.logical_and.accumulate(future, axis=2, out=future)
+        available[:, :, known:] = future
+        return available, the_round
+
+    def recommend(self, team):
+        """Recommendation for a team's next pick, re-solving only the scenarios the board changes affected"""
+        start = time.perf_counter()
+        state = self.state(team)
+        model = state.model
+        available, the_round = self.availability(team)
+        effective = available | model.forced
+
+        solved = 0
+        for s in range(len(available)):
+            old = state.solutions[s]
+            if old is not None and state.available is not None and self._still_optimal(state, s, effective, old):
+                continue
+            state.solutions[s] = model.solve(available[s], incumbent=old)
+            solved += 1
+        # bit-packed per scenario, it is only compared against, and it is the biggest thing a session keeps
+        state.available = np.packbits(effective.reshape(len(effective), -1), axis=1)
+        state.forced = model.forced.copy()
+
+        problem = state.problem
+        solutions = [a for a in state.solutions if a is not None]
+        if the_round > problem.num_picks:
+            votes, plan = [], []
+        else:
+            votes = rank_counts(Counter(problem.names[a[the_round - 1]] for a in solutions))
+            plan = [
+                (r + 1, int(problem.pick_numbers[r]), rank_counts(Counter(problem.names[a[r]] for a in solutions)))
+                for r in range(the_round - 1, problem.num_picks)
+            ]
+        pick_number = int(problem.pick_numbers[the_round - 1]) if the_round <= problem.num_picks else None
+        return Recommendation(team, the_round, pick_number, votes, plan, len(solutions), solved,
+                              time.perf_counter() - start)
+
+    @staticmethod
+    def _still_optimal(state, s, effective, old):
+        """Feasible set only shrank and the old optimum is still in it"""
+        model = state.model
+        if (np.packbits(effective[s]) & ~state.available[s]).any() or (state.forced & ~model.forced).any():
+            return False
+        return is_feasible(old, state.problem.bonus, effective[s], model.budget, model.position_codes,
+                           model.caps, model.forced, model.filled_rounds)
+
+
+def main():
+    from draft_store import RESULTS_FILE, parse_results
+
+    results = parse_results(Path("Optimization_CSVs") / RESULTS_FILE).dropna(subset=['Pick'])
+    draft = LiveDraft()
+    start = time.perf_counter()
+    for team in draft.teams:
+        draft.recommend(team)
+    print(f"initial recommendations for {len(draft.teams)} teams: {time.perf_counter() - start:.2f}s")
+
+    timings = []
+    for row in results.sort_values('Pick').itertuples():
+        if int(row.Pick) not in draft.pick_order:
+            break
+        team = draft.on_the_clock
+        rec = draft.recommend(team)
+        timings.append({'pick': int(row.Pick), 'team': team, 'ms': rec.seconds * 1000, 'solved': rec.solved,
+                        'recommended': rec.player, 'actual': row.Name})
+        draft.record_pick(row.Name, row.Team_Abbrev, int(row.Pick))
+
+    timings = pd.DataFrame(timings)
+    print(f"on-the-clock answers: {len(timings)}, mean {timings['ms'].mean():.1f} ms, max {timings['ms'].max():.1f} ms")
+    print(f"scenarios re-solved per answer: {timings['solved'].mean():.1f} of {draft.n_scenarios}")
+
+
+if __name__ == "__main__":
+    main()
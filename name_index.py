@@ -0,0 +1,118 @@
+# player name index for joining model selections onto the real draft results
+# exact matches are a hash lookup, the partial fallback goes through a token prefix index first
+# instead of running str.contains over the whole results frame for every player (only a query that starts
+# mid-token still scans the names)
+
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+
+def normalize_name(name):
+    """Stripped name, which is what the exact match compares on"""
+    return str(name).strip()
+
+
+class NameIndex:
+    """Exact + partial name lookups into one results frame (built once per dataset)"""
+
+    def __init__(self, names):
+        names = [normalize_name(n) if not pd.isna(n) else "" for n in names]
+        self.names = names
+        self.lower_names = [n.lower() for n in names]
+
+        # exact match, first row wins (same as .iloc[0] on the old boolean filter)
+        self.exact = {}
+        for row, name in enumerate(names):
+            self.exact.setdefault(name, row)
+
+        # token -> rows that have that token, tokens kept sorted for prefix searches
+        token_rows = {}
+        for row, name in enumerate(self.lower_names):
+            for token in set(name.split()):
+                token_rows.setdefault(token, []).append(row)
+        self.token_rows = token_rows
+        self.tokens = sorted(token_rows)
+
+    @classmethod
+    def from_frame(cls, df, column='Name'):
+        """Build the index for a results frame"""
+        return cls(df[column].tolist())
+
+    def _prefix_rows(self, prefix):
+        """Rows with any token starting with prefix"""
+        rows = set()
+        start = bisect_left(self.tokens, prefix)
+        for token in self.tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            rows.update(self.token_rows[token])
+        return rows
+
+    def find(self, player_name):
+        """Row of the first result matching player_name, or -1"""
+        query = normalize_name(player_name)
+        row = self.exact.get(query)
+        if row is not None:
+            return row
+
+        # partial match (case insensitive substring). names where every query token starts a token come from
+        # the token index; a query that starts mid-token ("ackson", "J Smith" for "AJ Smith") finds none of
+        # those and falls back to scanning every name, so a prefix match wins over an earlier mid-token one
+        query_lower = query.lower()
+        query_tokens = query_lower.split()
+        if not query_tokens:
+            return -1
+        candidates = None
+        for token in query_tokens:
+            rows = self._prefix_rows(token)
+            candidates = rows if candidates is None else candidates & rows
+            if not candidates:
+                break
+        matches = [r for r in candidates if query_lower in self.lower_names[r]]
+        if matches:
+            return min(matches)
+        return next((r for r, name in enumerate(self.lower_names) if query_lower in name), -1)
+
+    def find_all(self, player_names):
+        """Vector of result rows for many names at once (-1 where nothing matched)"""
+        queries = pd.Series(list(player_names), dtype=object).map(normalize_name)
+        rows = queries.map(self.exact).fillna(-1).to_numpy(dtype=np.int64)
+
+        # only the misses go through the partial fallback
+        for i in np.flatnonzero(rows < 0):
+            rows[i] = self.find(queries.iloc[i])
+        return rows
+
+
+def enrich_predictions(predictions_df, actual_draft_df, name_index=None, format_bonus=str):
+    """Add the actual draft info for each predicted player with one lookup + take"""
+    enhanced = predictions_df.copy()
+    n = len(enhanced)
+
+    if actual_draft_df is None or n == 0:
+        enhanced['Actually_Drafted'] = False
+        for col in ['Draft_Round', 'Draft_Pick', 'Actual_Bonus', 'Team', 'Position']:
+            enhanced[col] = ""
+        return enhanced
+
+    if name_index is None:
+        name_index = NameIndex.from_frame(actual_draft_df)
+
+    rows = name_index.find_all(enhanced['Name'])
+    found = rows >= 0
+    matched = actual_draft_df.iloc[rows[found]].reset_index(drop=True)
+
+    def spread(values, default=""):
+        out = np.full(n, default, dtype=object)
+        out[found] = values
+        return out
+
+    enhanced['Actually_Drafted'] = found
+    enhanced['Draft_Round'] = spread(matched['Round'].to_numpy(dtype=object))
+    enhanced['Draft_Pick'] = spread(matched['Pick'].to_numpy(dtype=object))
+    enhanced['Actual_Bonus'] = spread(matched['Bonus'].map(format_bonus).to_numpy(dtype=object))
+    enhanced['Team'] = spread(matched['Team'].to_numpy(dtype=object))
+    enhanced['Position'] = spread(matched['Position'].to_numpy(dtype=object))
+    return enhanced
@@ -0,0 +1,349 @@
+# python version of do_optimization / run_the_model from Optimization.ipynb
+# the model for a (team, pick) is built once (objective, constraint matrix) and each scenario
+# only changes the variable bounds: availability fixings (ub) and forced selections (lb)
+# solver is HiGHS through scipy.optimize.milp, so no license / internet needed
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import csr_matrix
+
+from presolve import Presolver, PresolveStats
+from season_store import SEASON, load_season
+from simulation import load_team_inputs, simulate_team
+from survival_tensor import LAST_MODELED_PICK
+
+# most expensive pick in the 2024 draft, bonuses/budgets are proportions of this
+MAX_BONUS = 9250000
+
+# right handed pitchers and left handed pitchers are different positions, SS isn't capped (same as the julia model)
+POSITION_LIST = ["C", "1B", "IF", "CF", "OF", "RHP", "LHP"]
+MAX_PER_POSITION = 2
+
+# (spending between picks 1 and 136, high school penalty) straight from Optimization.ipynb
+# for current playoff and big market bubble teams (as of draft day, july 14 2024) the high school penalty is 10
+TEAM_SETTINGS = {
+    'ARI': (3090000+2900000+2150000+990000+650000+800000, 0.0),
+    'ATL': ((3.56+1.35+.735+.472)*1000000, 10),
+    'BAL': ((4+2.7+1.17+.850+.5225)*1000000, 10),
+    'BOS': ((.5+.7+2+5)*1000000, 10),
+    'CHC': ((1+.62+1.68+5.07)*1000000, 0.0),
+    'CIN': ((.625+.863+.9975+3.05+9.25)*1000000, 0.0),
+    'CLE': ((.4469+2+2.05+2.57+8.95)*1000000, 10),
+    'COL': ((.25+1.01+2+2.7+9.25)*1000000, 0.0),
+    'CHW': ((.8475+.8+1.4+3+8)*1000000, 0.0),
+    'DET': ((.5225+.7+1.8+1.75+5.8)*1000000, 0.0),
+    'HOU': ((3.13+1+.4475)*1000000, 10),
+    'KCR': ((.5975+1.1+2.3+7.5)*1000000, 0.0),
+    'LAA': ((.5725+.9486+1.75+1.60+5)*1000000, 0.0), # considering pick value for pick 81
+    'LAD': ((.5538+1.75+3.3)*1000000, 10),
+    'MIA': ((.55+.8+.9+2.8+3.4)*1000000, 0.0),
+    'MIL': ((.5+.025+1.23+2.5+2.1+3.44)*1000000, 10), # considering pick value for pick 67
+    'MIN': ((.425+.5975+2+1.45+2.4+3.93)*1000000, 10),
+    'NYM': ((.6975+.7975+2.03+4)*1000000, 10),
+    'NYY': ((.637+.836+2.3+2.75)*1000000, 10),
+    'ATH': ((1+1.04+2+3+7)*1000000, 0.0),
+    'PHI': ((.545+.6725+2.5+2.5)*1000000, 10),
+    'PIT': ((.6497+.85+2.5+2.51+6.53)*1000000, 0.0),
+    'SDP': ((.08+.525+.6+.8523+2.5+3.44)*1000000, 10),
+    'SEA': ((.594+.05+3+4.88)*1000000, 10),
+    'SFG': ((2+4.74)*1000000, 0.0),
+    'STL': ((.6693+.8+6.9)*1000000, 10),
+    'TBR': ((.397+.774+1.26+1.52+4.37)*1000000, 0.0), # using pick value for pick 66
+    'TEX': ((.515+.7+1.29+3)*1000000, 0.0),
+    'TOR': ((.4675+.5697+1.25+1.12+4.18)*1000000, 0.0),
+    'WSN': ((.625+.9803+3.8+2.33+5.15)*1000000, 0.0),
+}
+PENALTY_RISK = 0.5
+
+
+def load_player_data(file_path=None, season=SEASON):
+    """Fangraphs board (name, position, hs, fv, risk) from the season store, or from a data_fg csv"""
+    if file_path is not None:
+        return pd.read_csv(file_path)
+    return load_season(season).board[['name', 'position', 'hs', 'fv', 'risk']]
+
+
+class DraftProblem:
+    """Everything the optimization needs for one team, as aligned numpy arrays (players x picks)"""
+
+    def __init__(self, inputs, player_data):
+        # inner join on name like the julia code, keeping the order of the team files
+        board = player_data.drop_duplicates('name').set_index('name')
+        keep = np.isin(inputs.names, board.index)
+        if inputs.bonus is None:
+            raise ValueError(f"no bonus data for {inputs.team}")
+
+        self.team = inputs.team
+        self.rows = np.flatnonzero(keep)
+        self.names = inputs.names[keep]
+        self.probs = inputs.probs[keep]
+        self.real = inputs.real[keep]
+        self.bonus = inputs.bonus[keep]
+        self.pick_numbers = inputs.pick_numbers
+
+        players = board.loc[self.names]
+        self.fv = players['fv'].to_numpy(dtype=np.float64)
+        self.risk = players['risk'].to_numpy(dtype=np.float64)
+        self.hs = players['hs'].to_numpy(dtype=np.float64)
+        self.position = players['position'].astype(str).to_numpy()
+        self.name_to_row = {name: i for i, name in enumerate(self.names)}
+
+    @property
+    def num_players(self):
+        return len(self.names)
+
+    @property
+    def num_picks(self):
+        return self.bonus.shape[1]
+
+    def scores(self, penalty_risk, penalty_hs):
+        """FV - lambda_1 * Risk - lambda_2 * HighSchool for every player"""
+        return self.fv - penalty_risk * self.risk - penalty_hs * self.hs
+
+    def scenario_availability(self, scenarios):
+        """Restrict a simulate_team tensor (in team file row order) to the players we have data for"""
+        return scenarios[:, self.rows, :]
+
+
+def load_problem(team_abbrev, player_data=None, data_directory="Intermediary_CSVs", season=SEASON):
+    """DraftProblem for a team straight from the csv files
+
+    the team's pick numbers and bonuses come from the season store (its bonus surface, when the season has one),
+    season=None reads both off the bonus csv instead (input directories for drafts that aren't in the store)
+    """
+    if player_data is None:
+        player_data = load_player_data(season=season or SEASON)
+    pick_numbers, bonus = None, None
+    if season is not None:
+        season_data = load_season(season)
+        pick_numbers, bonus = season_data.team_picks(team_abbrev, LAST_MODELED_PICK), season_data.bonus
+    inputs = load_team_inputs(team_abbrev, data_directory, bonus_surface=bonus, pick_numbers=pick_numbers)
+    return DraftProblem(inputs, player_data)
+
+
+def team_settings(team_abbrev, penalty_risk=None, penalty_hs=None, spending=None):
+    """(penalty_risk, penalty_hs, spending) for a team, defaults from the notebook"""
+    default_spending, default_hs = TEAM_SETTINGS[team_abbrev]
+    return (
+        PENALTY_RISK if penalty_risk is None else penalty_risk,
+        default_hs if penalty_hs is None else penalty_hs,
+        default_spending if spending is None else spending,
+    )
+
+
+def position_caps(positions):
+    """(position code per player, cap per code) with uncapped positions getting no limit"""
+    labels, codes = np.unique(positions, return_inverse=True)
+    caps = [MAX_PER_POSITION if label in POSITION_LIST else len(positions) for label in labels]
+    return codes, caps
+
+
+class PickModel:
+    """The MIP for one (team, pick), built once and re-solved per availability scenario
+
+    with presolve (presolve.py) the full model is never built: each scenario gets a model over only the
+    (player, round) variables that survive presolve, usually a few dozen instead of players x rounds
+    """
+
+    def __init__(self, problem, penalty_risk, penalty_hs, spending, selected_players=(), presolve=True):
+        self.problem = problem
+        num_players, num_rounds = problem.num_players, problem.num_picks
+        self.num_players = num_players
+        self.num_rounds = num_rounds
+        n = num_players * num_rounds
+
+        # x[i, r] is column i * num_rounds + r
+        self.score = problem.scores(penalty_risk, penalty_hs)
+        self.c = -np.repeat(self.score, num_rounds)
+        self.budget = spending / MAX_BONUS
+        self.position_codes, self.caps = position_caps(problem.position)
+        self.presolver = Presolver(self.score, problem.bonus, self.position_codes, self.caps) if presolve else None
+        self.stats = PresolveStats()
+
+        # if we already have selected a player, we must force the selection
+        self.forced = np.zeros((num_players, num_rounds), dtype=bool)
+        self.set_selected_players(selected_players)
+        if presolve:
+            return
+
+        rows, cols, vals = [], [], []
+        lower, upper = [], []
+        row = 0
+        col_index = np.arange(n).reshape(num_players, num_rounds)
+
+        # each player is chosen in at most 1 round
+        for i in range(num_players):
+            rows.extend([row] * num_rounds)
+            cols.extend(col_index[i])
+            vals.extend([1.0] * num_rounds)
+            lower.append(0.0)
+            upper.append(1.0)
+            row += 1
+
+        # you take exactly one player per round
+        for r in range(num_rounds):
+            rows.extend([row] * num_players)
+            cols.extend(col_index[:, r])
+            vals.extend([1.0] * num_players)
+            lower.append(1.0)
+            upper.append(1.0)
+            row += 1
+
+        # budget constraint
+        rows.extend([row] * n)
+        cols.extend(range(n))
+        vals.extend(problem.bonus.reshape(-1))
+        lower.append(-np.inf)
+        upper.append(self.budget)
+        row += 1
+
+        # position limit
+        for pos in POSITION_LIST:
+            members = np.flatnonzero(problem.position == pos)
+            if len(members) == 0:
+                continue
+            member_cols = col_index[members].reshape(-1)
+            rows.extend([row] * len(member_cols))
+            cols.extend(member_cols)
+            vals.extend([1.0] * len(member_cols))
+            lower.append(0.0)
+            upper.append(MAX_PER_POSITION)
+            row += 1
+
+        A = csr_matrix((vals, (rows, cols)), shape=(row, n))
+        self.constraints = LinearConstraint(A, np.array(lower), np.array(upper))
+        self.integrality = np.ones(n)
+
+    def set_selected_players(self, selected_players):
+        """Force x[player, s] = 1 for the s-th already selected player"""
+        self.forced[:] = False
+        for s, name in enumerate(selected_players):
+            i = self.problem.name_to_row.get(name)
+            if i is not None and s < self.num_rounds:
+                self.forced[i, s] = True
+
+    def solve(self, available):
+        """Solve for one (players x picks) availability matrix, returns the player row per round (or None)"""
+        if self.presolver is not None:
+            presolved = self.presolver(available, self.forced)
+            self.stats.add(presolved.stats)
+            return self.solve_reduced(presolved.keep)
+
+        available = np.asarray(available, dtype=bool) | self.forced
+        bounds = Bounds(self.forced.reshape(-1).astype(np.float64), available.reshape(-1).astype(np.float64))
+        res = milp(self.c, integrality=self.integrality, bounds=bounds, constraints=self.constraints)
+        if res.x is None:
+            return None
+        x = res.x.reshape(self.num_players, self.num_rounds) >= 0.5
+        return x.argmax(axis=0)
+
+    def solve_reduced(self, keep):
+        """The same MIP over only the (player, round) pairs in keep"""
+        players, rounds = np.nonzero(keep)
+        if len(np.unique(rounds)) < self.num_rounds:
+            return None  # a round nobody can fill
+        n = len(players)
+        columns = np.arange(n)
+        player_rows = np.unique(players, return_inverse=True)[1]
+        codes = self.position_codes[players]
+        capped = [code for code in np.unique(codes) if self.caps[code] < self.num_players]
+        cap_index = np.full(len(self.caps), -1)
+        cap_index[capped] = np.arange(len(capped))
+        cap_rows = cap_index[codes]
+
+        # at most 1 round per player, exactly one player per round, budget, position limits
+        num_player_rows = player_rows.max() + 1
+        budget_row = num_player_rows + self.num_rounds
+        in_cap = cap_rows >= 0
+        rows = np.concatenate([player_rows, num_player_rows + rounds, np.full(n, budget_row),
+                               budget_row + 1 + cap_rows[in_cap]])
+        cols = np.concatenate([columns, columns, columns, columns[in_cap]])
+        vals = np.concatenate([np.ones(2 * n), self.problem.bonus[players, rounds], np.ones(in_cap.sum())])
+        lower = np.concatenate([np.zeros(num_player_rows), np.ones(self.num_rounds), [-np.inf], np.zeros(len(capped))])
+        upper = np.concatenate([np.ones(num_player_rows), np.ones(self.num_rounds), [self.budget],
+                                [self.caps[code] for code in capped]])
+
+        A = csr_matrix((vals, (rows, cols)), shape=(budget_row + 1 + len(capped), n))
+        bounds = Bounds(self.forced[players, rounds].astype(np.float64), np.ones(n))
+        res = milp(-self.score[players], integrality=np.ones(n), bounds=bounds,
+                   constraints=LinearConstraint(A, lower, upper))
+        if res.x is None:
+            return None
+        chosen = res.x >= 0.5
+        assignment = np.zeros(self.num_rounds, dtype=np.int64)
+        assignment[rounds[chosen]] = players[chosen]
+        return assignment
+
+    def objective(self, assignment):
+        """Objective value of a per-round assignment"""
+        return float(self.score[assignment].sum())
+
+
+def pick_model_class(solver="mip"):
+    """PickModel ("mip", HiGHS) or ExactPickModel ("exact", branch and bound in exact_solver.py)"""
+    if solver == "mip":
+        return PickModel
+    if solver == "exact":
+        from exact_solver import ExactPickModel
+        return ExactPickModel
+    raise ValueError(f"unknown solver: {solver}")
+
+
+def optimize_pick(problem, the_round, n_scenarios, penalty_risk, penalty_hs, spending,
+                  selected_players=(), rng=None, scenarios=None, solver="mip"):
+    """Solve the pick's model under n_scenarios simulated availabilities, returns the chosen player per scenario"""
+    # scenarios (if given) must already be in problem row order, see DraftProblem.scenario_availability
+    if scenarios is None:
+        scenarios = simulate_team(problem, the_round, n_scenarios, rng)
+    model = pick_model_class(solver)(problem, penalty_risk, penalty_hs, spending, selected_players)
+
+    players = []
+    for available in scenarios:
+        assignment = model.solve(available)
+        if assignment is not None:
+            players.append(problem.names[assignment[the_round - 1]])
+    return players
+
+
+def run_the_model(team_abbrev, iterations=100, seed=None, penalty_risk=None, penalty_hs=None,
+                  spending=None, problem=None, verbose=False, solver="mip"):
+    """Pick by pick: simulate, solve `iterations` scenarios, keep the most popular player (like the julia code)"""
+    if problem is None:
+        problem = load_problem(team_abbrev)
+    penalty_risk, penalty_hs, spending = team_settings(team_abbrev, penalty_risk, penalty_hs, spending)
+    rng = np.random.default_rng(seed)
+
+    selection_list = []
+    for pick in range(1, problem.num_picks + 1):
+        player_list = optimize_pick(problem, pick, iterations, penalty_risk, penalty_hs, spending,
+                                    selection_list, rng, solver=solver)
+        if not player_list:
+            raise RuntimeError(f"{team_abbrev}: no feasible scenario at pick {pick}")
+
+        # count how often each player picked
+        sorted_counts = Counter(player_list).most_common()
+        if verbose:
+            for value, count in sorted_counts:
+                print(f"{value}: {count}")
+        selection_list.append(sorted_counts[0][0])
+
+    return selection_list
+
+
+def selection_bonuses(problem, selection_list):
+    """Predicted bonus (proportion of MAX_BONUS) of each selection at the pick it was made"""
+    return [float(problem.bonus[problem.name_to_row[name], s]) for s, name in enumerate(selection_list)]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    team = sys.argv[1] if len(sys.argv) > 1 else 'BOS'
+    start = time.perf_counter()
+    selections = run_the_model(team, iterations=100, seed=0)
+    elapsed = time.perf_counter() - start
+    print(team, selections, f"({elapsed:.1f}s)")
@@ -0,0 +1,141 @@
+# lightweight timing spans + cache counters for the dashboard
+# every streamlit rerun is one "run": functions wrapped with @timed (or blocks inside `with span(...)`) add their
+# wall time to it, caches call cache_event(...) on hits/misses, and finish_run() can append the whole run as
+# one json line (set MLB_DRAFT_PERF_LOG=/path/to/perf.jsonl to turn the log on)
+# outside of a run (scripts, workers) nothing is recorded and the overhead is one attribute lookup
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import pandas as pd
+
+LOG_ENV_VAR = "MLB_DRAFT_PERF_LOG"
+
+_local = threading.local()
+
+
+class PerfRun:
+    """Spans and counters collected during one rerun"""
+
+    def __init__(self, label=None):
+        self.label = label
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.elapsed = None
+        self.calls = Counter()
+        self.seconds = Counter()
+        self.counters = Counter()
+
+    def add_span(self, name, seconds):
+        self.calls[name] += 1
+        self.seconds[name] += seconds
+
+    def table(self):
+        """One row per span name, slowest first"""
+        rows = [{'Span': name, 'Calls': self.calls[name], 'ms': self.seconds[name] * 1000} for name in self.calls]
+        df = pd.DataFrame(rows, columns=['Span', 'Calls', 'ms'])
+        return df.sort_values('ms', ascending=False).reset_index(drop=True)
+
+    def counter_table(self):
+        df = pd.DataFrame(sorted(self.counters.items()), columns=['Counter', 'Count'])
+        return df
+
+    def as_dict(self):
+        return {
+            'ts': self.started,
+            'label': self.label,
+            'total_ms': None if self.elapsed is None else self.elapsed * 1000,
+            'spans': {name: {'calls': self.calls[name], 'ms': self.seconds[name] * 1000} for name in self.calls},
+            'counters': dict(self.counters),
+        }
+
+
+def start_run(label=None):
+    """Start collecting for this thread (one streamlit session runs its script on one thread)"""
+    _local.run = PerfRun(label)
+    return _local.run
+
+
+def current_run():
+    return getattr(_local, 'run', None)
+
+
+def finish_run(log_path=None, **fields):
+    """Stop the current run, append it to the json lines log if there is one, and return it"""
+    run = current_run()
+    if run is None:
+        return None
+    run.elapsed = time.perf_counter() - run.start
+    _local.run = None
+
+    log_path = log_path or os.environ.get(LOG_ENV_VAR)
+    if log_path:
+        record = run.as_dict()
+        record.update(fields)
+        try:
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+        except OSError:
+            pass
+    return run
+
+
+@contextmanager
+def span(name):
+    """Time a block into the current run"""
+    run = current_run()
+    if run is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add_span(name, time.perf_counter() - start)
+
+
+def timed(name=None):
+    """Decorator version of span (named after the function by default)"""
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            run = current_run()
+            if run is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                run.add_span(label, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def count(name, n=1):
+    """Bump a counter in the current run"""
+    run = current_run()
+    if run is not None:
+        run.counters[name] += n
+
+
+def cache_event(cache, hit):
+    """cache.hit / cache.miss counter"""
+    count(f"{cache}.{'hit' if hit else 'miss'}")
+
+
+def read_log(log_path):
+    """The json lines log as one row per (run, span), for aggregating across sessions"""
+    rows = []
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            for name, stats in record['spans'].items():
+                rows.append({'ts': record['ts'], 'label': record.get('label'), 'span': name, **stats})
+    return pd.DataFrame(rows)
@@ -0,0 +1,165 @@
+# presolve for the per-scenario draft problem, run before a model is built
+# most (player, round) variables can never be in an optimal draft:
+#   - a player who isn't available at any round that is still open
+#   - x[j, r] when j has enough same-position players available at r with at least as good a score and no
+#     bigger bonus at r: as many as his position can still take, so one of them is always free to take his
+#     place at r and dropping x[j, r] can't change the optimal value. a player dominated at every round (same
+#     position, better score, cheaper at every open pick, available wherever he is) loses all his variables
+# dominance uses a strict order (score, then bonus, then row) so two identical players can't knock each
+# other out. the same test on the recourse picks prunes the SAA model (saa.prune_recourse)
+#
+# usage (from the repo root): python presolve.py [--scenarios 20] [--seed 0]
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+class PresolveStats:
+    """Players / variables before and after presolve, added up over any number of solves"""
+
+    def __init__(self):
+        self.solves = 0
+        self.players = 0
+        self.variables = 0
+        self.kept_players = 0
+        self.kept_variables = 0
+        self.unavailable = 0
+        self.dominated = 0
+
+    def add(self, other):
+        for name in vars(self):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def __str__(self):
+        if not self.solves:
+            return "no solves"
+        return (f"{self.solves} solves: players {self.players / self.solves:.1f} -> {self.kept_players / self.solves:.1f}"
+                f" ({self.unavailable / self.solves:.1f} unavailable, {self.dominated / self.solves:.1f} dominated),"
+                f" variables {self.variables / self.solves:.1f} -> {self.kept_variables / self.solves:.1f}")
+
+
+class Presolved:
+    """Live (player, round) variables after presolve"""
+
+    def __init__(self, keep, stats):
+        self.keep = keep
+        self.stats = stats
+
+
+def dominance(score, bonus, rows):
+    """m x m x rounds, [i, j, r] when player i dominates player j at round r
+
+    score >= and bonus <= at r, ties broken by (score, bonus, row) so no two players dominate each other
+    """
+    s_i, s_j = score[:, None, None], score[None, :, None]
+    b_i, b_j = bonus[:, None, :], bonus[None, :, :]
+    first = (s_i > s_j) | (b_i < b_j) | (rows[:, None, None] < rows[None, :, None])
+    return (s_i >= s_j) & (b_i <= b_j) & first
+
+
+class Presolver:
+    """Presolve for one model: the dominance between players only depends on scores and bonuses, so it's
+    worked out once here and each scenario only applies its availability to it"""
+
+    def __init__(self, score, bonus, position_codes, caps):
+        self.position_codes = np.asarray(position_codes)
+        self.caps = np.asarray(caps)
+        num_players, num_rounds = bonus.shape
+
+        # one sparse (player, round) x (player, round) matrix, so counting every variable's available
+        # dominators in a scenario is a single product
+        rows, cols = [], []
+        for code in np.unique(self.position_codes):
+            members = np.flatnonzero(self.position_codes == code)
+            i, j, r = np.nonzero(dominance(score[members], bonus[members], members))
+            rows.append(members[j] * num_rounds + r)
+            cols.append(members[i] * num_rounds + r)
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        n = num_players * num_rounds
+        self.dominators = csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(n, n))
+
+    def __call__(self, available, forced=None, filled_rounds=()):
+        """Presolved variables for one (players x rounds) availability matrix
+
+        forced pairs are always kept (and their rounds only keep them), filled_rounds keep nothing
+        """
+        available = np.asarray(available, dtype=bool)
+        if forced is None:
+            forced = np.zeros_like(available)
+
+        open_rounds = ~forced.any(axis=0)
+        open_rounds[list(filled_rounds)] = False
+        forced_players = forced.any(axis=1)
+        live = available & open_rounds[None, :] & ~forced_players[:, None]
+
+        stats = PresolveStats()
+        stats.solves = 1
+        stats.players = available.shape[0]
+        stats.variables = int((available | forced).sum())
+
+        candidates = live.any(axis=1)
+        stats.unavailable = int((~candidates & ~forced_players).sum())
+
+        # a position can still take min(open rounds, cap - players already forced in) more players
+        taken = np.bincount(self.position_codes[forced_players], minlength=len(self.caps))
+        needed = np.minimum(int(open_rounds.sum()), self.caps - taken)[self.position_codes]
+        dominators = (self.dominators @ live.reshape(-1).astype(np.float32)).reshape(live.shape)
+        keep = live & (dominators < needed[:, None])
+
+        stats.dominated = int((candidates & ~keep.any(axis=1)).sum())
+        keep |= forced
+        stats.kept_players = int(keep.any(axis=1).sum())
+        stats.kept_variables = int(keep.sum())
+        return Presolved(keep, stats)
+
+
+def presolve(score, bonus, available, position_codes, caps, forced=None, filled_rounds=()):
+    """One-off Presolver run (models keep their Presolver and call it per scenario)"""
+    return Presolver(score, bonus, position_codes, caps)(available, forced, filled_rounds)
+
+
+def main():
+    import argparse
+    import time
+
+    from draft_store import MLB_TEAMS
+    from exact_solver import ExactPickModel
+    from optimization import PickModel, load_player_data, load_problem, team_settings
+    from simulation import simulate_team
+
+    parser = argparse.ArgumentParser(description="presolve statistics and solve times on every team's inputs")
+    parser.add_argument("--scenarios", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    player_data = load_player_data()
+    totals = {}
+    for team_idx, team in enumerate(MLB_TEAMS):
+        problem = load_problem(team, player_data)
+        settings = team_settings(team)
+        scenarios = simulate_team(problem, 1, args.scenarios, np.random.default_rng([args.seed, team_idx]))
+        for name, model_class in [('mip', PickModel), ('exact', ExactPickModel)]:
+            for use_presolve in (False, True):
+                model = model_class(problem, *settings, presolve=use_presolve)
+                start = time.perf_counter()
+                values = [model.objective(model.solve(available)) for available in scenarios]
+                elapsed = time.perf_counter() - start
+                total = totals.setdefault((name, use_presolve), {'seconds': 0.0, 'values': [], 'stats': PresolveStats()})
+                total['seconds'] += elapsed
+                total['values'].extend(values)
+                total['stats'].add(model.stats)
+
+    print(f"presolve at pick 1: {totals[('exact', True)]['stats']}")
+    for name in ('mip', 'exact'):
+        before, after = totals[(name, False)], totals[(name, True)]
+        same = np.allclose(before['values'], after['values'], atol=1e-6)
+        print(f"{name}: {before['seconds'] * 1000 / len(before['values']):.2f} -> "
+              f"{after['seconds'] * 1000 / len(after['values']):.2f} ms/solve, same optimum: {same}")
+
+
+if __name__ == "__main__":
+    main()
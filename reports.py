@@ -0,0 +1,182 @@
+# headless report builder: every team's model vs actual comparison plus the league takeaways, built once
+# (in parallel) into static files the dashboard can serve instead of recomputing them for every visitor
+#   reports/<TEAM>.parquet   typed pick_alignment table
+#   reports/<TEAM>.html      the same table as a standalone page
+#   reports/takeaways_*.parquet + takeaways.html
+#   reports/manifest.json    source signature the reports were built from (they're stale when it changes)
+#
+# usage (from the repo root): python reports.py [--teams BOS ARI] [--workers 4]
+
+import argparse
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from draft_store import MLB_TEAMS, source_signature
+from perf import cache_event, timed
+from takeaways import Takeaways, favorite_teams
+
+REPORT_DIRECTORY = "reports"
+MANIFEST_FILE = "manifest.json"
+TAKEAWAY_TABLES = ['player_counts', 'highest_bonus_rounds', 'overlap', 'favorites']
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #ddd; padding: 4px 8px; text-align: left; }}
+th {{ background: #f4f4f4; }}
+</style></head>
+<body><h1>{title}</h1>
+{body}
+</body></html>
+"""
+
+
+def report_directory(data_directory="Optimization_CSVs"):
+    return Path(data_directory) / REPORT_DIRECTORY
+
+
+def signature_key(data_directory="Optimization_CSVs"):
+    """source_signature in a json friendly form"""
+    return [list(item) for item in source_signature(data_directory)]
+
+
+def write_page(file_path, title, body):
+    file_path.write_text(PAGE_TEMPLATE.format(title=html.escape(title), body=body), encoding="utf-8")
+
+
+def build_team_report(team_abbrev, data_directory="Optimization_CSVs"):
+    """Write one team's comparison (parquet + html), returns the number of picks in it"""
+    # the dashboard's own loaders and formatting, so the reports are exactly what it would show
+    import streamlit_app as app
+    from comparison import pick_alignment
+
+    predictions_df = app.load_team_predictions(team_abbrev, data_directory)
+    actual_draft_df = app.load_actual_draft_data(data_directory)
+    if predictions_df is None:
+        return 0
+    actual_team_df = None
+    if actual_draft_df is not None:
+        actual_team_df = actual_draft_df[actual_draft_df['Team_Abbrev'] == team_abbrev]
+
+    enhanced = app.enrich_predictions(predictions_df, actual_draft_df, app.load_name_index(data_directory),
+                                      format_bonus=app.format_currency)
+    alignment = pick_alignment(enhanced, actual_team_df)
+
+    out = report_directory(data_directory)
+    alignment.to_parquet(out / f"{team_abbrev}.parquet", index=False)
+    write_page(out / f"{team_abbrev}.html", f"{MLB_TEAMS[team_abbrev]}: optimization model vs. real draft",
+               app.alignment_display(alignment).to_html(index=False, na_rep=""))
+    return len(alignment)
+
+
+def build_takeaways_report(data_directory="Optimization_CSVs"):
+    """Write the league takeaway tables (parquet) and a summary page"""
+    from takeaways import league_takeaways
+
+    takeaways = league_takeaways(data_directory)
+    out = report_directory(data_directory)
+    for name in TAKEAWAY_TABLES:
+        getattr(takeaways, name).to_parquet(out / f"takeaways_{name}.parquet", index=False)
+
+    sections = [
+        ("Model's favorite players", takeaways.favorites[['Name', 'Teams', 'Team', 'Round', 'Pick']]),
+        ("Selection with each team's biggest bonus", takeaways.highest_bonus_rounds),
+        ("Model picks each team actually made", takeaways.overlap),
+    ]
+    body = "\n".join(f"<h2>{html.escape(title)}</h2>\n{df.to_html(index=False, na_rep='')}" for title, df in sections)
+    write_page(out / "takeaways.html", "Overall takeaways", body)
+    return len(takeaways.favorites)
+
+
+def build_reports(teams=None, data_directory="Optimization_CSVs", workers=None):
+    """Build every team's report and the takeaways in parallel, then write the manifest"""
+    teams = [team for team in (teams or MLB_TEAMS)]
+    out = report_directory(data_directory)
+    out.mkdir(parents=True, exist_ok=True)
+    signature = signature_key(data_directory)
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            jobs = {team: executor.submit(build_team_report, team, data_directory) for team in teams}
+            takeaways_job = executor.submit(build_takeaways_report, data_directory)
+            picks = {team: job.result() for team, job in jobs.items()}
+            takeaways_job.result()
+    else:
+        picks = {team: build_team_report(team, data_directory) for team in teams}
+        build_takeaways_report(data_directory)
+
+    # a team that wasn't rebuilt keeps its old entry, it's only fresh if the signature still matches
+    manifest = read_manifest(data_directory) or {'teams': {}}
+    if manifest.get('signature') != signature:
+        manifest['teams'] = {}
+    manifest['signature'] = signature
+    manifest['built'] = time.time()
+    manifest['teams'].update({team: picks[team] for team in teams})
+    (out / MANIFEST_FILE).write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    return picks, time.perf_counter() - start
+
+
+def read_manifest(data_directory="Optimization_CSVs"):
+    file_path = report_directory(data_directory) / MANIFEST_FILE
+    if not file_path.exists():
+        return None
+    return json.loads(file_path.read_text(encoding="utf-8"))
+
+
+def fresh_manifest(data_directory="Optimization_CSVs"):
+    """The manifest if the reports were built from the current sources, else None"""
+    manifest = read_manifest(data_directory)
+    if manifest is None or manifest.get('signature') != signature_key(data_directory):
+        return None
+    return manifest
+
+
+@timed()
+def load_team_report(team_abbrev, data_directory="Optimization_CSVs"):
+    """A team's prebuilt alignment table, or None if it is missing or stale"""
+    manifest = fresh_manifest(data_directory)
+    file_path = report_directory(data_directory) / f"{team_abbrev}.parquet"
+    fresh = manifest is not None and team_abbrev in manifest['teams'] and file_path.exists()
+    cache_event('reports.team', fresh)
+    if not fresh:
+        return None
+    return pd.read_parquet(file_path)
+
+
+@timed()
+def load_takeaways_report(data_directory="Optimization_CSVs"):
+    """Prebuilt Takeaways, or None if they are missing or stale"""
+    out = report_directory(data_directory)
+    files = [out / f"takeaways_{name}.parquet" for name in TAKEAWAY_TABLES]
+    fresh = fresh_manifest(data_directory) is not None and all(f.exists() for f in files)
+    cache_event('reports.takeaways', fresh)
+    if not fresh:
+        return None
+    tables = dict(zip(TAKEAWAY_TABLES, (pd.read_parquet(f) for f in files)))
+    return Takeaways(tables['player_counts'], tables['highest_bonus_rounds'], tables['overlap'], tables['favorites'],
+                     favorite_teams(tables['favorites']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="build the static dashboard reports")
+    parser.add_argument("--teams", nargs="*", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--data-directory", default="Optimization_CSVs")
+    args = parser.parse_args()
+
+    picks, elapsed = build_reports(args.teams, args.data_directory, args.workers)
+    print(f"built {len(picks)} team reports + takeaways in {elapsed:.1f}s -> {report_directory(args.data_directory)}")
+
+
+if __name__ == "__main__":
+    main()
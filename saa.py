@@ -0,0 +1,214 @@
+# sample average approximation: one two-stage stochastic program per pick instead of
+# N separate MIPs + a majority vote
+#   first stage: x[i], the player taken at the current pick (same in every scenario)
+#   recourse:    y[s, i, r], who gets taken at each later pick r in scenario s
+# objective is score(x) + average over scenarios of score(y), solved once with HiGHS
+
+from collections import Counter
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import coo_matrix
+
+from optimization import MAX_BONUS, MAX_PER_POSITION, POSITION_LIST, load_problem, team_settings
+from presolve import dominance
+from simulation import simulate_team
+
+
+def prune_recourse(problem, score, later, t, caps_left, cap_labels):
+    """Drop y[s, j, r] when j has enough dominating players (same position, available, score >= and
+    bonus <= at pick r) that one of them is always free to take j's place -- the optimum doesn't change"""
+    num_rounds = problem.num_picks
+    picks_left = num_rounds - t
+    keep = later.copy()
+    for pos in np.unique(problem.position):
+        members = np.flatnonzero(problem.position == pos)
+        if pos in cap_labels:
+            needed = min(picks_left, int(caps_left[cap_labels.index(pos)]))
+        else:
+            needed = picks_left
+        if needed <= 0:
+            keep[:, members, :] = False
+            continue
+        s = score[members]
+        for k in range(later.shape[2]):
+            b = problem.bonus[members, t + 1 + k]
+            dominates = dominance(s, b[:, None], members)[:, :, 0]
+            avail = later[:, members, k]
+            dominators = avail.astype(np.int32) @ dominates.astype(np.int32)
+            keep[:, members, k] = avail & (dominators < needed)
+    return keep
+
+
+class SAAResult:
+    """First stage choice of one SAA solve, plus its scenario-weighted value"""
+
+    def __init__(self, player, row, value, first_stage_value, recourse_values):
+        self.player = player
+        self.row = row
+        self.value = value
+        self.first_stage_value = first_stage_value
+        self.recourse_values = recourse_values
+
+    def __repr__(self):
+        return f"SAAResult(player={self.player!r}, value={self.value:.3f})"
+
+
+def solve_saa(problem, the_round, scenarios, penalty_risk, penalty_hs, spending, selected_players=(),
+              time_limit=None, prune=True):
+    """Solve the two-stage program for pick the_round (1-based) over a (scenarios x players x picks) tensor"""
+    scenarios = np.asarray(scenarios, dtype=bool)
+    num_scenarios, num_players, num_rounds = scenarios.shape
+    t = the_round - 1
+    score = problem.scores(penalty_risk, penalty_hs)
+    budget = spending / MAX_BONUS
+
+    # earlier picks are already made, they just use up budget and position slots
+    # (round, player row) so a selection we have no data for still keeps the later rounds' bonus columns
+    taken_picks = [(s, problem.name_to_row[name]) for s, name in enumerate(selected_players[:t])
+                   if name in problem.name_to_row]
+    taken = [i for _, i in taken_picks]
+    taken_mask = np.zeros(num_players, dtype=bool)
+    taken_mask[taken] = True
+    budget_left = budget - sum(problem.bonus[i, s] for s, i in taken_picks)
+    taken_value = float(score[taken].sum())
+
+    cap_labels = [pos for pos in POSITION_LIST if (problem.position == pos).any()]
+    pos_index = {pos: k for k, pos in enumerate(cap_labels)}
+    player_pos = np.array([pos_index.get(p, -1) for p in problem.position])
+    caps_left = np.full(len(cap_labels), MAX_PER_POSITION, dtype=np.float64)
+    for i in taken:
+        if player_pos[i] >= 0:
+            caps_left[player_pos[i]] -= 1
+
+    # variables: x for every player, then y only where a player is available in that scenario
+    x_ub = (scenarios[0, :, t] & ~taken_mask).astype(np.float64)
+    later = scenarios[:, :, t + 1:] & ~taken_mask[None, :, None]
+    if prune:
+        later = prune_recourse(problem, score, later, t, caps_left, cap_labels)
+    ys, yi, yr = np.nonzero(later)
+    yr = yr + t + 1
+    num_x = num_players
+    num_y = len(ys)
+    n = num_x + num_y
+    y_col = num_x + np.arange(num_y)
+
+    c = np.concatenate([-score, -score[yi] / num_scenarios])
+
+    rows, cols, vals, lower, upper = [], [], [], [], []
+    row = 0
+
+    def add_rows(row_ids, col_ids, values, lo, hi, count):
+        nonlocal row
+        rows.append(row_ids + row)
+        cols.append(col_ids)
+        vals.append(values)
+        lower.append(np.broadcast_to(lo, count))
+        upper.append(np.broadcast_to(hi, count))
+        row += count
+
+    # exactly one player at this pick
+    add_rows(np.zeros(num_x, dtype=np.int64), np.arange(num_x), np.ones(num_x), 1.0, 1.0, 1)
+
+    # exactly one player at each later pick, in every scenario
+    num_later = num_rounds - t - 1
+    if num_later > 0:
+        add_rows(ys * num_later + (yr - t - 1), y_col, np.ones(num_y), 1.0, 1.0, num_scenarios * num_later)
+
+    # a player goes at most once: x[i] + sum_r y[s, i, r] <= 1 (only for players with recourse vars)
+    pairs, pair_of_y = np.unique(ys * num_players + yi, return_inverse=True)
+    pair_i = pairs % num_players
+    add_rows(
+        np.concatenate([np.arange(len(pairs)), pair_of_y]),
+        np.concatenate([pair_i, y_col]),
+        np.ones(len(pairs) + num_y), -np.inf, 1.0, len(pairs),
+    )
+
+    # budget in every scenario
+    x_scen = np.repeat(np.arange(num_scenarios), num_x)
+    x_cols = np.tile(np.arange(num_x), num_scenarios)
+    add_rows(
+        np.concatenate([x_scen, ys]),
+        np.concatenate([x_cols, y_col]),
+        np.concatenate([np.tile(problem.bonus[:, t], num_scenarios), problem.bonus[yi, yr]]),
+        -np.inf, budget_left, num_scenarios,
+    )
+
+    # position limits in every scenario
+    if cap_labels:
+        num_caps = len(cap_labels)
+        capped_x = np.flatnonzero(player_pos >= 0)
+        capped_y = np.flatnonzero(player_pos[yi] >= 0)
+        x_rows = (np.repeat(np.arange(num_scenarios), len(capped_x)) * num_caps
+                  + np.tile(player_pos[capped_x], num_scenarios))
+        y_rows = ys[capped_y] * num_caps + player_pos[yi[capped_y]]
+        add_rows(
+            np.concatenate([x_rows, y_rows]),
+            np.concatenate([np.tile(capped_x, num_scenarios), y_col[capped_y]]),
+            np.ones(len(x_rows) + len(y_rows)),
+            -np.inf, np.tile(caps_left, num_scenarios), num_scenarios * num_caps,
+        )
+
+    A = coo_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))), shape=(row, n)).tocsr()
+    constraints = LinearConstraint(A, np.concatenate(lower), np.concatenate(upper))
+    bounds = Bounds(np.zeros(n), np.concatenate([x_ub, np.ones(num_y)]))
+    options = {} if time_limit is None else {'time_limit': time_limit}
+
+    res = milp(c, integrality=np.ones(n), bounds=bounds, constraints=constraints, options=options)
+    if res.x is None:
+        return None
+
+    first = int(np.argmax(res.x[:num_x]))
+    y_val = res.x[num_x:] >= 0.5
+    recourse_values = np.bincount(ys[y_val], weights=score[yi[y_val]], minlength=num_scenarios)
+    first_stage_value = float(score[first])
+    value = taken_value + first_stage_value + float(recourse_values.mean())
+    return SAAResult(problem.names[first], first, value, first_stage_value, recourse_values)
+
+
+def evaluate_first_stage(problem, the_round, scenarios, player, penalty_risk, penalty_hs, spending,
+                         selected_players=()):
+    """Scenario-weighted value of committing to `player` at this pick (exact solve per scenario)"""
+    from exact_solver import ExactPickModel
+
+    model = ExactPickModel(problem, penalty_risk, penalty_hs, spending,
+                           list(selected_players[:the_round - 1]) + [player])
+    values = []
+    for available in scenarios:
+        assignment = model.solve(available)
+        values.append(np.nan if assignment is None else model.objective(assignment))
+    return float(np.nanmean(values)) if not np.all(np.isnan(values)) else np.nan
+
+
+def run_the_model_saa(team_abbrev, iterations=100, seed=None, penalty_risk=None, penalty_hs=None,
+                      spending=None, problem=None, verbose=False):
+    """Pick by pick like run_the_model, but one SAA solve per pick instead of `iterations` solves + a vote"""
+    if problem is None:
+        problem = load_problem(team_abbrev)
+    penalty_risk, penalty_hs, spending = team_settings(team_abbrev, penalty_risk, penalty_hs, spending)
+    rng = np.random.default_rng(seed)
+
+    selection_list = []
+    values = []
+    for pick in range(1, problem.num_picks + 1):
+        scenarios = simulate_team(problem, pick, iterations, rng)
+        result = solve_saa(problem, pick, scenarios, penalty_risk, penalty_hs, spending, selection_list)
+        if result is None:
+            raise RuntimeError(f"{team_abbrev}: SAA infeasible at pick {pick}")
+        if verbose:
+            print(f"pick {pick}: {result.player} (value {result.value:.3f})")
+        selection_list.append(result.player)
+        values.append(result.value)
+
+    return selection_list, values
+
+
+def vote_choice(problem, the_round, scenarios, penalty_risk, penalty_hs, spending, selected_players=(),
+                solver="exact"):
+    """The current method: solve each scenario on its own and take the most popular player"""
+    from optimization import optimize_pick
+
+    players = optimize_pick(problem, the_round, len(scenarios), penalty_risk, penalty_hs, spending,
+                            selected_players, scenarios=scenarios, solver=solver)
+    ranked = sorted(Counter(players).items(), key=lambda item: (-item[1], item[0]))
+    return ranked[0][0] if ranked else None
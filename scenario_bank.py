@@ -0,0 +1,253 @@
+# persistent scenario bank: simulated availability written to disk once and reused by every run
+# one file per (season, seed) holds a joint league simulation (league_simulation.py) as bits:
+#   scenario_bank/<season>_seed<seed>.npy    uint8, picks x players x ceil(scenarios / 8), np.packbits over scenarios
+#   scenario_bank/<season>_seed<seed>.json   player names, pick numbers, the number of scenarios and sha256s of
+#                                            the survival matrix and CoxPH model the draws came from
+# picks come first so one pick's (players x scenarios) block is contiguous, and the file is memory mapped,
+# so opening it reads nothing and a (season, pick, seed) lookup only touches that pick's bytes
+# every optimizer run or experiment that reads the same (season, seed) sees exactly the same draws
+# (common random numbers), which is what makes comparing two model variants cheap and low variance.
+# asking for more scenarios than are stored rebuilds the bank, but the draws come in seeded blocks
+# (league_simulation.BLOCK_SCENARIOS), so the scenarios that were there before stay exactly the same.
+# a bank whose survival matrix or CoxPH model has changed since (a refit) is stale and rebuilt
+#
+# usage (from the repo root): python scenario_bank.py [--season 2024] [--seed 0] [--scenarios 1000] [--rebuild]
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from league_simulation import condition_on_real
+from season_store import SEASON
+from simulation import INPUT_DIRECTORY
+from survival_tensor import SURVIVAL_FILE
+
+BANK_DIRECTORY = Path(INPUT_DIRECTORY) / "scenario_bank"
+
+
+def bank_path(season, seed, directory=BANK_DIRECTORY):
+    """.npy path of a (season, seed) bank (the .json sidecar sits next to it)"""
+    return Path(directory) / f"{season}_seed{seed}.npy"
+
+
+class ScenarioBank:
+    """Bit-packed availability for every player at every pick in every scenario, optionally a window of them"""
+
+    def __init__(self, packed, names, picks, num_scenarios, season, seed, lo=0, hi=None, path=None, sources=None):
+        self.packed = packed
+        self.names = np.asarray(names)
+        self.picks = np.asarray(picks)
+        self.total_scenarios = num_scenarios
+        self.season = season
+        self.seed = seed
+        self.lo = lo
+        self.hi = num_scenarios if hi is None else hi
+        self.path = path
+        self.sources = sources or {}
+        self.pick_to_index = {int(p): k for k, p in enumerate(self.picks)}
+        self.name_to_row = {}
+        for i, name in enumerate(self.names):
+            self.name_to_row.setdefault(name, i)
+
+    def __getstate__(self):
+        # a memory mapped bank goes to worker processes as its path, they map the file themselves
+        state = self.__dict__.copy()
+        if self.path is not None:
+            state['packed'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.packed is None:
+            self.packed = np.load(self.path, mmap_mode='r')
+
+    @property
+    def num_scenarios(self):
+        return self.hi - self.lo
+
+    @property
+    def nbytes(self):
+        return self.packed.nbytes
+
+    def scenarios(self, lo, hi):
+        """Scenarios lo:hi of this bank (same bytes, nothing is copied)"""
+        return ScenarioBank(self.packed, self.names, self.picks, self.total_scenarios, self.season, self.seed,
+                            self.lo + lo, self.lo + hi, self.path, self.sources)
+
+    def rows(self, names):
+        """Row of each name"""
+        return np.array([self.name_to_row[name] for name in names], dtype=np.intp)
+
+    def pick_bits(self, pick_number):
+        """Packed players x scenario-bytes block of one pick (a view of the file)"""
+        return self.packed[self.pick_to_index[int(pick_number)]]
+
+    def pick(self, pick_number, rows=None):
+        """players x scenarios availability at one pick"""
+        bits = self.pick_bits(pick_number)
+        if rows is not None:
+            bits = bits[rows]
+        return np.unpackbits(bits, axis=-1, count=self.hi).view(bool)[:, self.lo:]
+
+    def availability(self, names, pick_numbers):
+        """scenarios x players x picks, the same layout simulate_team returns"""
+        rows = self.rows(names)
+        index = [self.pick_to_index[int(p)] for p in pick_numbers]
+        bits = self.packed[index][:, rows]
+        unpacked = np.unpackbits(bits, axis=-1, count=self.hi).view(bool)[:, :, self.lo:]
+        return np.ascontiguousarray(unpacked.transpose(2, 1, 0))
+
+    def team_scenarios(self, problem, pick_number):
+        """Drop-in for simulation.simulate_team, real availability up to pick_number"""
+        available = self.availability(problem.names, problem.pick_numbers)
+        return condition_on_real(available, problem.real, pick_number)
+
+
+def pack_draft_bank(draft_bank, picks):
+    """picks x players x scenario-bytes bits from a league_simulation.DraftBank"""
+    picks = np.asarray(picks)
+    packed = np.empty((len(picks), draft_bank.draft_at.shape[1], (draft_bank.num_scenarios + 7) // 8),
+                      dtype=np.uint8)
+    draft_at = draft_bank.draft_at.T
+    for k, pick in enumerate(picks):
+        packed[k] = np.packbits(draft_at >= pick, axis=-1)
+    return packed
+
+
+def source_hashes(survival=None):
+    """sha256 of what a bank's draws come from: the survival matrix (survival.npy unless one is given) and the
+    CoxPH model the ties are broken with"""
+    from cox_scoring import MODEL_FILE
+
+    if survival is None:
+        survival_hash = hashlib.sha256(Path(SURVIVAL_FILE).read_bytes()).hexdigest()
+    else:
+        survival_hash = hashlib.sha256(np.ascontiguousarray(survival.matrix, dtype=np.float32).tobytes()).hexdigest()
+    return {'survival': survival_hash, 'cox_model': hashlib.sha256(Path(MODEL_FILE).read_bytes()).hexdigest()}
+
+
+def write_bank(packed, names, picks, num_scenarios, season, seed, directory=BANK_DIRECTORY, sources=None):
+    """Write a packed bank and its sidecar, returns the .npy path
+
+    both go to temporary files first and are renamed into place, so a process that has the old bank memory
+    mapped keeps reading the old file. the sidecar goes last and is the commit point: it records the array's
+    shape, and open_bank refuses an array that doesn't match it
+    """
+    path = bank_path(season, seed, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    meta = {'season': season, 'seed': seed, 'scenarios': num_scenarios, 'shape': list(packed.shape),
+            'picks': [int(p) for p in picks], 'names': [str(n) for n in names], 'sources': sources or {}}
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".npy", delete=False) as f:
+        np.save(f, packed)
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, path)
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".json", delete=False, encoding="utf-8") as f:
+        f.write(json.dumps(meta))
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, path.with_suffix('.json'))
+    return path
+
+
+def open_bank(season=SEASON, seed=0, directory=BANK_DIRECTORY, mmap=True):
+    """ScenarioBank for (season, seed), memory mapped (None if it hasn't been built)"""
+    path = bank_path(season, seed, directory)
+    meta_path = path.with_suffix('.json')
+    if not path.exists() or not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    packed = np.load(path, mmap_mode='r' if mmap else None)
+    # the array of a rebuild whose sidecar isn't in place yet doesn't match the old sidecar
+    shape = tuple(meta.get('shape', (len(meta['picks']), len(meta['names']), (meta['scenarios'] + 7) // 8)))
+    if packed.shape != shape:
+        raise ValueError(f"{path} is {packed.shape}, its sidecar says {shape}")
+    return ScenarioBank(packed, meta['names'], meta['picks'], meta['scenarios'], season, seed,
+                        path=path if mmap else None, sources=meta.get('sources'))
+
+
+def build_bank(season=SEASON, seed=0, n_scenarios=1000, directory=BANK_DIRECTORY, survival=None, pick_order=None):
+    """Simulate the league (league_simulation.league_bank) and write it as a (season, seed) bank"""
+    from league_simulation import league_bank, load_pick_order
+
+    # survival.npy is the 2024 board, other seasons bring their own (and a pick order if the store has none)
+    if season != SEASON and survival is None:
+        raise ValueError(f"only {SEASON} has a survival matrix, pass one for {season}")
+    pick_order = load_pick_order(season) if pick_order is None else pick_order
+    draft_bank = league_bank(n_scenarios, seed, survival, pick_order)
+    picks = pick_order['pick'].to_numpy()
+    write_bank(pack_draft_bank(draft_bank, picks), draft_bank.names, picks, n_scenarios, season, seed, directory,
+               source_hashes(survival))
+    return open_bank(season, seed, directory)
+
+
+def get_bank(season=SEASON, seed=0, n_scenarios=1000, directory=BANK_DIRECTORY):
+    """The (season, seed) bank with at least n_scenarios, built the first time it's asked for
+
+    a bigger bank for the same seed starts with the same scenarios, so growing it doesn't change what an
+    earlier, smaller request saw. a bank built from another survival matrix or CoxPH model is rebuilt
+    """
+    bank = open_bank(season, seed, directory)
+    if bank is None or bank.total_scenarios < n_scenarios or bank.sources != source_hashes():
+        bank = build_bank(season, seed, max(n_scenarios, bank.total_scenarios if bank else 0), directory)
+    return bank.scenarios(0, n_scenarios)
+
+
+def main():
+    from optimization import load_player_data, load_problem, team_settings
+    from exact_solver import ExactPickModel
+    from simulation import simulate_team
+
+    parser = argparse.ArgumentParser(description="build / check the persistent scenario bank")
+    parser.add_argument("--season", type=int, default=SEASON)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scenarios", type=int, default=1000)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    bank = open_bank(args.season, args.seed)
+    if args.rebuild or bank is None or (args.season == SEASON and bank.sources != source_hashes()):
+        build_bank(args.season, args.seed, args.scenarios)
+        print(f"built {bank_path(args.season, args.seed)} in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    bank = open_bank(args.season, args.seed)
+    print(f"opened in {(time.perf_counter() - start) * 1000:.2f} ms (memory mapped)")
+
+    # the same availability as 0/1 text, the way the <TEAM>_real.csv files store it
+    values = bank.total_scenarios * len(bank.names) * len(bank.picks)
+    with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as f:
+        for k in range(len(bank.picks)):
+            np.savetxt(f, bank.pick(bank.picks[k]).astype(np.int8), fmt='%d', delimiter=',')
+    csv_bytes = os.path.getsize(f.name)
+    os.remove(f.name)
+    print(f"{values:,} availabilities: {bank.nbytes / 2**20:.1f} MB packed vs {csv_bytes / 2**20:.1f} MB as 0/1 csv "
+          f"({csv_bytes / bank.nbytes:.0f}x) and {values * 8 / 2**20:.1f} MB as int64 ({values * 8 / bank.nbytes:.0f}x)")
+
+    # common random numbers: two hs penalties on the same draws vs on independent ones
+    team = 'BOS'
+    problem = load_problem(team, load_player_data())
+    penalty_risk, _, spending = team_settings(team)
+    low = ExactPickModel(problem, penalty_risk, 0.0, spending)
+    high = ExactPickModel(problem, penalty_risk, 10.0, spending)
+    n = min(200, bank.total_scenarios)
+
+    def objectives(model, scenarios):
+        return np.array([model.objective(model.solve(available)) for available in scenarios])
+
+    shared = bank.scenarios(0, n).team_scenarios(problem, 1)
+    paired = objectives(low, shared) - objectives(high, shared)
+    rng = np.random.default_rng(args.seed)
+    independent = objectives(low, simulate_team(problem, 1, n, rng)) - objectives(high, simulate_team(problem, 1, n, rng))
+    print(f"{team} hs penalty 0 vs 10 over {n} scenarios: difference {paired.mean():.3f} "
+          f"+/- {paired.std(ddof=1) / np.sqrt(n):.3f} with shared draws, "
+          f"{independent.mean():.3f} +/- {independent.std(ddof=1) / np.sqrt(n):.3f} with independent draws")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+# season partitioned store of the raw draft inputs, so no stage re-parses the original csvs
+#   Original_CSVs/data_fg - <season>.csv   board: name, position, hs, fv, risk
+#   Original_CSVs/data_ba - <season>.csv   the real draft: who went at which overall pick and for how much
+#   Original_CSVs/<season>picks.csv        pick order ("1/CLE" labels plus Number / Team), only 2024 has one so far
+#   Original_CSVs/signing_bonus_df.csv     the MARS bonus of every player at every pick (Code/MARS.R), 2024's
+#                                          (another season's would be "signing_bonus_df - <season>.csv")
+# every season is its own partition of typed tables plus the integer index arrays the stages look things up with
+#   season_store/<season>/board.parquet   player_id, name, position (category), hs, fv, risk
+#   season_store/<season>/draft.parquet   pick, player_id, name, bonus, pct_max_bonus, team (when the order is known)
+#   season_store/<season>/picks.parquet   pick, team (category), empty without a pick order
+#   season_store/<season>/index.npz       pick -> team code, team -> picks (csr offsets), sorted names -> player id,
+#                                         and the bonus grid fit as a bonus_surface.BonusSurface (its knots, one row
+#                                         of hinge coefficients per player it covers, and their player ids)
+# player ids are per season: board players first (board order), then drafted players who aren't on the board.
+# teams are always the dashboard's abbreviations (the As are ATH, not OAK) with MLB_TEAMS order as their codes
+# adding a season is one append (python season_store.py --season 2025), the other partitions aren't touched.
+# a partition is rebuilt when one of its csvs is newer than it, and loaded ones are cached per process
+# the dashboard's results (Optimization_CSVs/data_ba-results.csv) aren't in here: that is a different file
+# (rounds, schools, signed flags, full team names) that draft_store.py keeps next to the model outputs it is
+# joined with, and it is read from whatever directory the store is built for (synthetic drafts have their own)
+#
+# usage (from the repo root): python season_store.py [--season 2021 2022 ...] [--rebuild]
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from draft_store import MLB_TEAMS
+from simulation import INPUT_DIRECTORY
+
+SOURCE_DIRECTORY = Path("Original_CSVs")
+STORE_DIRECTORY = Path(INPUT_DIRECTORY) / "season_store"
+
+# the season the model is run on
+SEASON = 2024
+# its MARS bonus grid, from before the store (the name has no season in it)
+BONUS_GRID_FILE = "signing_bonus_df.csv"
+# a bonus grid the hinge surface can't reproduce this closely isn't a MARS grid
+BONUS_FIT_TOLERANCE = 1e-9
+
+TEAMS = np.array(list(MLB_TEAMS))
+TEAM_CODES = {team: code for code, team in enumerate(TEAMS)}
+
+BOARD_COLUMNS = ['player_id', 'name', 'position', 'hs', 'fv', 'risk']
+DRAFT_COLUMNS = ['pick', 'player_id', 'name', 'bonus', 'pct_max_bonus', 'team']
+
+# in-process cache, (store directory, season) -> Season
+_SEASON_CACHE = {}
+
+
+def source_files(season, source_directory=SOURCE_DIRECTORY):
+    """{table: csv} for a season (the pick order only when there is one)"""
+    source_directory = Path(source_directory)
+    files = {
+        'board': source_directory / f"data_fg - {season}.csv",
+        'draft': source_directory / f"data_ba - {season}.csv",
+        'picks': source_directory / f"{season}picks.csv",
+        'bonus': source_directory / (BONUS_GRID_FILE if season == SEASON else f"signing_bonus_df - {season}.csv"),
+    }
+    return {table: f for table, f in files.items() if f.exists()}
+
+
+def available_seasons(source_directory=SOURCE_DIRECTORY, store_directory=STORE_DIRECTORY):
+    """Every season with a board csv or an already built partition"""
+    seasons = {int(f.stem.rsplit(' ', 1)[-1]) for f in Path(source_directory).glob("data_fg - *.csv")}
+    if Path(store_directory).exists():
+        seasons.update(int(d.name) for d in Path(store_directory).iterdir() if d.name.isdigit())
+    return sorted(seasons)
+
+
+def team_abbrev(team):
+    """Dashboard abbreviation of a team code from the csvs (they call the As OAK)"""
+    return 'ATH' if team == 'OAK' else team
+
+
+class Season:
+    """One season's tables with its index arrays"""
+
+    def __init__(self, season, board, draft, picks, names, pick_team, team_offsets, team_picks, name_order,
+                 bonus_ids=None, bonus_knots=None, bonus_coefficients=None):
+        self.season = season
+        self.board = board
+        self.draft = draft
+        self.picks = picks
+        self.names = names
+        self.pick_team = pick_team
+        self.team_offsets = team_offsets
+        self._team_picks = team_picks
+        self.name_order = name_order
+        self._sorted_names = names[name_order]
+        self.bonus = None
+        if bonus_ids is not None and len(bonus_ids):
+            from bonus_surface import BonusSurface
+
+            self.bonus = BonusSurface(names[bonus_ids], bonus_knots, bonus_coefficients)
+
+    @property
+    def has_pick_order(self):
+        return len(self.picks) > 0
+
+    @property
+    def num_players(self):
+        return len(self.names)
+
+    def team_of(self, pick_number):
+        """Team that owns an overall pick (None past the pick order)"""
+        pick_number = int(pick_number)
+        if not 0 <= pick_number < len(self.pick_team) or self.pick_team[pick_number] < 0:
+            return None
+        return str(TEAMS[self.pick_team[pick_number]])
+
+    def team_picks(self, team, last_pick=None):
+        """A team's overall pick numbers in order (a view), optionally only up to last_pick"""
+        if not self.has_pick_order:
+            raise ValueError(f"no pick order for {self.season} ({self.season}picks.csv)")
+        code = TEAM_CODES[team_abbrev(team)]
+        picks = self._team_picks[self.team_offsets[code]:self.team_offsets[code + 1]]
+        return picks[:np.searchsorted(picks, last_pick, side='right')] if last_pick else picks
+
+    def picks_by_team(self, last_pick=None):
+        """{team: pick numbers} for every team with a pick"""
+        counts = np.diff(self.team_offsets)
+        return {str(team): self.team_picks(team, last_pick) for team, n in zip(TEAMS, counts) if n}
+
+    def pick_order(self):
+        """{overall pick number: team}"""
+        return dict(zip(self.picks['pick'].tolist(), self.picks['team'].astype(str)))
+
+    def player_ids(self, names):
+        """Player id of every name (-1 where the season doesn't have him), one searchsorted"""
+        names = np.asarray(names, dtype=str)
+        position = np.minimum(np.searchsorted(self._sorted_names, names), len(self.names) - 1)
+        found = self._sorted_names[position] == names
+        return np.where(found, self.name_order[position], -1)
+
+    def player_id(self, name):
+        return int(self.player_ids([name])[0])
+
+    def drafted_board(self):
+        """Board players who were drafted, with their pick and bonus (the CoxPH training layout: df_4,
+        training_data), in draft order"""
+        board = self.board.drop(columns=['name']).set_index('player_id')
+        drafted = self.draft[self.draft['player_id'] >= 0]
+        drafted = drafted.join(board, on='player_id', how='inner')
+        return drafted.rename(columns={'pick': 'number'})[
+            ['name', 'number', 'bonus', 'pct_max_bonus', 'hs', 'fv', 'risk', 'position']].reset_index(drop=True)
+
+
+def read_board(file_path):
+    df = pd.read_csv(file_path)
+    df['name'] = df['name'].astype(str).str.strip()
+    return df.drop_duplicates('name').reset_index(drop=True)
+
+
+def read_draft(file_path):
+    df = pd.read_csv(file_path)
+    df['name'] = df['name'].astype(str).str.strip()
+    return df.sort_values('number', kind='stable').reset_index(drop=True)
+
+
+def read_picks(file_path):
+    """Pick order csv -> (pick, team): Number and Team when they are there, else the "1/CLE" labels"""
+    df = pd.read_csv(file_path)
+    if 'Number' in df and 'Team' in df:
+        picks, teams = df['Number'], df['Team']
+    else:
+        labels = df['Pick'].astype(str).str.split('/', n=1, expand=True)
+        picks, teams = labels[0], labels[1]
+    order = pd.DataFrame({'pick': pd.to_numeric(picks).astype('int32'), 'team': teams.astype(str).map(team_abbrev)})
+    unknown = set(order['team']) - set(TEAMS)
+    if unknown:
+        raise ValueError(f"{file_path} has unknown teams: {sorted(unknown)}")
+    return order.sort_values('pick', kind='stable').reset_index(drop=True)
+
+
+def build_season(season, source_directory=SOURCE_DIRECTORY, store_directory=STORE_DIRECTORY):
+    """Parse one season's csvs into its typed tables and index arrays and write its partition"""
+    sources = source_files(season, source_directory)
+    if 'board' not in sources and 'draft' not in sources:
+        raise FileNotFoundError(f"no data_fg / data_ba csv for {season} in {source_directory}")
+    board = read_board(sources['board']) if 'board' in sources else pd.DataFrame(columns=BOARD_COLUMNS[1:])
+    draft = read_draft(sources['draft']) if 'draft' in sources else pd.DataFrame(
+        columns=['name', 'number', 'bonus', 'pct_max_bonus'])
+    picks = read_picks(sources['picks']) if 'picks' in sources else pd.DataFrame(
+        {'pick': pd.Series(dtype='int32'), 'team': pd.Series(dtype=str)})
+
+    # board players keep their board order as ids, drafted players who aren't on it come after
+    off_board = draft.loc[~draft['name'].isin(board['name']), 'name'].drop_duplicates()
+    names = np.concatenate([board['name'].to_numpy(dtype=str), off_board.to_numpy(dtype=str)])
+    name_order = np.argsort(names, kind='stable')
+    ids = pd.Series(np.arange(len(names), dtype=np.int32), index=names)
+    ids = ids[~ids.index.duplicated()]
+
+    team_category = pd.CategoricalDtype(TEAMS.tolist())
+    picks = picks.astype({'team': team_category})
+    board = pd.DataFrame({
+        'player_id': ids.loc[board['name']].to_numpy(),
+        'name': board['name'],
+        'position': board['position'].astype(str).astype('category'),
+        'hs': board['hs'].astype('int8'),
+        'fv': board['fv'].astype('float64'),
+        'risk': board['risk'].astype('int16'),
+    })[BOARD_COLUMNS]
+    draft = pd.DataFrame({
+        'pick': draft['number'].astype('int32'),
+        'player_id': ids.loc[draft['name']].to_numpy(),
+        'name': draft['name'],
+        'bonus': draft['bonus'].astype('float64'),
+        'pct_max_bonus': draft['pct_max_bonus'].astype('float64'),
+    })
+    draft['team'] = draft['pick'].map(dict(zip(picks['pick'], picks['team']))).astype(team_category)
+    draft = draft[DRAFT_COLUMNS]
+
+    # pick -> team code, and every team's picks contiguous in pick order (csr offsets by team code)
+    codes = picks['team'].cat.codes.to_numpy()
+    last_pick = int(max(picks['pick'].max() if len(picks) else 0, draft['pick'].max() if len(draft) else 0))
+    pick_team = np.full(last_pick + 1, -1, dtype=np.int16)
+    pick_team[picks['pick'].to_numpy()] = codes
+    by_team = np.argsort(codes, kind='stable')
+    team_picks = picks['pick'].to_numpy(dtype=np.int64)[by_team]
+    team_offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(TEAMS)))]).astype(np.int64)
+
+    # the bonus grid as knots plus hinge coefficients for the season's players it covers, empty without a grid csv
+    bonus_ids = np.empty(0, dtype=np.int32)
+    bonus_knots = np.empty(0)
+    bonus_coefficients = np.empty((0, 2))
+    if 'bonus' in sources:
+        from bonus_surface import fit_surface, read_bonus_grid
+
+        grid_names, grid, grid_picks = read_bonus_grid(sources['bonus'])
+        grid_ids = ids.reindex(grid_names).to_numpy()
+        known = ~np.isnan(grid_ids)
+        surface, error = fit_surface(grid_names[known], grid[known], grid_picks)
+        if error > BONUS_FIT_TOLERANCE:
+            raise ValueError(f"{sources['bonus']} isn't piecewise linear in the pick (max error {error:.2e})")
+        bonus_ids = grid_ids[known].astype(np.int32)
+        bonus_knots, bonus_coefficients = surface.knots, surface.coefficients
+
+    directory = Path(store_directory) / str(season)
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        board.to_parquet(directory / "board.parquet", index=False)
+        draft.to_parquet(directory / "draft.parquet", index=False)
+        picks.to_parquet(directory / "picks.parquet", index=False)
+        # written last, so it also marks the partition as complete
+        np.savez(directory / "index.npz", names=names, pick_team=pick_team, team_offsets=team_offsets,
+                 team_picks=team_picks, name_order=name_order, bonus_ids=bonus_ids, bonus_knots=bonus_knots,
+                 bonus_coefficients=bonus_coefficients)
+    except (ImportError, OSError):
+        # no pyarrow or read-only folder, we just keep it in memory
+        pass
+    return Season(season, board, draft, picks, names, pick_team, team_offsets, team_picks, name_order, bonus_ids,
+                  bonus_knots, bonus_coefficients)
+
+
+def read_season(season, store_directory=STORE_DIRECTORY):
+    """A season's partition as written by build_season"""
+    directory = Path(store_directory) / str(season)
+    with np.load(directory / "index.npz") as index:
+        arrays = {name: index[name] for name in index.files}
+    tables = [pd.read_parquet(directory / f"{table}.parquet") for table in ('board', 'draft', 'picks')]
+    # a partition written before the bonus surface was added raises KeyError here, callers rebuild it
+    return Season(season, *tables, arrays['names'], arrays['pick_team'], arrays['team_offsets'],
+                  arrays['team_picks'], arrays['name_order'], arrays['bonus_ids'], arrays['bonus_knots'],
+                  arrays['bonus_coefficients'])
+
+
+def is_fresh(season, source_directory=SOURCE_DIRECTORY, store_directory=STORE_DIRECTORY):
+    """Whether the partition exists and none of the season's csvs changed after it was written"""
+    index_path = Path(store_directory) / str(season) / "index.npz"
+    if not index_path.exists():
+        return False
+    newest_source = max((f.stat().st_mtime_ns for f in source_files(season, source_directory).values()), default=0)
+    return index_path.stat().st_mtime_ns >= newest_source
+
+
+def load_season(season=SEASON, source_directory=SOURCE_DIRECTORY, store_directory=STORE_DIRECTORY):
+    """Cached Season: memory first, then its partition, then a fresh build from the csvs"""
+    key = (str(Path(store_directory).resolve()), int(season))
+    fresh = is_fresh(season, source_directory, store_directory)
+    if key in _SEASON_CACHE and fresh:
+        return _SEASON_CACHE[key]
+    season_data = None
+    if fresh:
+        try:
+            season_data = read_season(season, store_directory)
+        except KeyError:
+            pass
+    if season_data is None:
+        season_data = build_season(season, source_directory, store_directory)
+    _SEASON_CACHE[key] = season_data
+    return season_data
+
+
+def drafted_boards(seasons, source_directory=SOURCE_DIRECTORY, store_directory=STORE_DIRECTORY):
+    """Season.drafted_board of several seasons stacked (with a season column), e.g. the CoxPH training set"""
+    frames = [load_season(season, source_directory, store_directory).drafted_board().assign(season=season)
+              for season in seasons]
+    return pd.concat(frames, ignore_index=True)
+
+
+def training_seasons(season=SEASON, source_directory=SOURCE_DIRECTORY, store_directory=STORE_DIRECTORY):
+    """Every season before season (what a model for it may be fit on)"""
+    return [s for s in available_seasons(source_directory, store_directory) if s < season]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="build the season partitioned store of the raw draft inputs")
+    parser.add_argument("--season", type=int, nargs="*", default=None, help="seasons to add (default: every one)")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild partitions even if they are fresh")
+    args = parser.parse_args()
+
+    for season in args.season or available_seasons():
+        start = time.perf_counter()
+        data, action = None, "built"
+        if not args.rebuild and is_fresh(season):
+            try:
+                data, action = read_season(season), "read"
+            except KeyError:
+                pass
+        if data is None:
+            data = build_season(season)
+        print(f"{season}: {action} in {(time.perf_counter() - start) * 1000:.1f} ms, {len(data.board)} board players, "
+              f"{len(data.draft)} drafted, {len(data.picks)} picks in the order"
+              f"{'' if data.has_pick_order else ' (no pick order csv)'}"
+              f"{'' if data.bonus is None else f', bonus surface for {data.bonus.num_players} players'}")
+
+
+if __name__ == "__main__":
+    main()
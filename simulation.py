@@ -0,0 +1,139 @@
+# batched monte carlo of future player availability (python version of the julia `simulation`)
+# instead of one bernoulli per player per pick per scenario, we draw every scenario at once as a
+# (scenarios x players x picks) boolean tensor
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+INPUT_DIRECTORY = "Intermediary_CSVs"
+
+
+def input_team_code(team_abbrev):
+    """Team code used in the Intermediary_CSVs file names (the As are OAK there)"""
+    return 'OAK' if team_abbrev == 'ATH' else team_abbrev
+
+
+class TeamInputs:
+    """Names, survival probabilities, real availabilities and bonuses for one team (players x picks)"""
+
+    def __init__(self, team, names, probs, real, bonus=None, pick_numbers=None):
+        self.team = team
+        self.names = names
+        self.probs = probs
+        self.real = real
+        self.bonus = bonus
+        self.pick_numbers = pick_numbers
+
+    @property
+    def num_players(self):
+        return self.probs.shape[0]
+
+    @property
+    def num_picks(self):
+        return self.probs.shape[1]
+
+
+def read_team_matrix(file_path, dtype):
+    """Read a name + one-column-per-pick csv into (names, matrix)"""
+    # headers are just name,0,0,0,0 so we go by position, not by column name
+    df = pd.read_csv(file_path)
+    names = df.iloc[:, 0].astype(str).to_numpy()
+    return names, df.iloc[:, 1:].to_numpy(dtype=dtype), list(df.columns[1:])
+
+
+def load_team_inputs(team_abbrev, data_directory=INPUT_DIRECTORY, survival=None, bonus_surface=None,
+                     pick_numbers=None):
+    """Load <TEAM>_probs.csv, <TEAM>_real.csv (and <TEAM>_bonus.csv if it is there)
+
+    with a survival_tensor.SurvivalTensor the probabilities come from its columns for the team's picks,
+    and with a bonus_surface.BonusSurface plus the pick numbers the bonus csv isn't read at all
+    """
+    code = input_team_code(team_abbrev)
+    data_directory = Path(data_directory)
+
+    names, probs, _ = read_team_matrix(data_directory / f"{code}_probs.csv", np.float64)
+    real_names, real, _ = read_team_matrix(data_directory / f"{code}_real.csv", np.int8)
+    if not np.array_equal(names, real_names) or probs.shape != real.shape:
+        raise ValueError(f"{code}_probs.csv and {code}_real.csv do not line up")
+
+    bonus = None
+    bonus_path = data_directory / f"{code}_bonus.csv"
+    if pick_numbers is not None:
+        pick_numbers = np.asarray(pick_numbers)
+        if len(pick_numbers) != probs.shape[1]:
+            raise ValueError(f"{code} has {probs.shape[1]} picks, got {len(pick_numbers)} pick numbers")
+    if (bonus_surface is None or pick_numbers is None) and bonus_path.exists():
+        bonus_names, bonus, bonus_cols = read_team_matrix(bonus_path, np.float64)
+        if not np.array_equal(names, bonus_names) or bonus.shape != probs.shape:
+            raise ValueError(f"{code}_bonus.csv does not line up with {code}_probs.csv")
+        # bonus columns are pick_12, pick_50, ... so without pick numbers (season_store.py) this is where they live
+        if pick_numbers is None:
+            pick_numbers = np.array([int(str(c).split('_')[-1]) for c in bonus_cols])
+
+    if bonus_surface is not None:
+        if pick_numbers is None:
+            raise ValueError(f"pick numbers are needed to evaluate the bonus surface for {code}")
+        bonus = bonus_surface.grid(pick_numbers, bonus_surface.rows(names))
+
+    if survival is not None:
+        if pick_numbers is None:
+            raise ValueError(f"{code}_bonus.csv is needed to know which survival columns to use")
+        if not np.array_equal(names, survival.names):
+            raise ValueError(f"survival matrix players do not match {code}_probs.csv")
+        probs = np.asarray(survival.team_probs(pick_numbers), dtype=np.float64)
+
+    return TeamInputs(team_abbrev, names, probs, real.astype(bool), bonus, pick_numbers)
+
+
+def simulate_availability(pick_number, probs, real, n_scenarios, rng=None, batch_size=None):
+    """Availability scenarios as a (scenarios x players x picks) bool tensor
+
+    pick_number is 1-based like the julia code: picks up to and including it use the real
+    availability, later picks are bernoulli draws from the survival probabilities, and a
+    player who is gone at one pick stays gone at every pick after it.
+    """
+    rng = np.random.default_rng(rng)
+    probs = np.asarray(probs, dtype=np.float64)
+    real = np.asarray(real, dtype=bool)
+    num_players, num_picks = probs.shape
+    known = min(max(int(pick_number), 0), num_picks)
+
+    out = np.empty((n_scenarios, num_players, num_picks), dtype=bool)
+    out[:, :, :known] = real[None, :, :known]
+    if known == num_picks:
+        return out
+
+    future_probs = probs[:, known:].astype(np.float32)
+    if known > 0:
+        start = real[:, known - 1]
+    else:
+        start = np.ones(num_players, dtype=bool)
+
+    # chunk over scenarios so the float draws never get too big
+    batch_size = batch_size or n_scenarios
+    for lo in range(0, n_scenarios, batch_size):
+        hi = min(lo + batch_size, n_scenarios)
+        draws = rng.random((hi - lo, num_players, num_picks - known), dtype=np.float32) < future_probs
+        draws &= start[None, :, None]
+        # once unavailable, stays unavailable
+        np.logical_and.accumulate(draws, axis=2, out=draws)
+        out[lo:hi, :, known:] = draws
+    return out
+
+
+def simulate_team(inputs, pick_number, n_scenarios, rng=None, batch_size=None):
+    """simulate_availability for a TeamInputs"""
+    return simulate_availability(pick_number, inputs.probs, inputs.real, n_scenarios, rng, batch_size)
+
+
+if __name__ == "__main__":
+    import time
+
+    inputs = load_team_inputs('BOS')
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    scenarios = simulate_team(inputs, 1, 10000, rng)
+    elapsed = time.perf_counter() - start
+    print(f"BOS: {scenarios.shape} availability tensor in {elapsed * 1000:.1f} ms")
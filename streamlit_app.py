@@ -3,101 +3,41 @@
 import streamlit as st
 import pandas as pd
 import os
+import time
 from pathlib import Path
-import re
-
-#MLB team abbreviatoins 
-MLB_TEAMS = {
-    'ARI': 'Arizona Diamondbacks',
-    'ATL': 'Atlanta Braves',
-    'BAL': 'Baltimore Orioles',
-    'BOS': 'Boston Red Sox',
-    'CHC': 'Chicago Cubs',
-    'CHW': 'Chicago White Sox',
-    'CIN': 'Cincinnati Reds',
-    'CLE': 'Cleveland Guardians',
-    'COL': 'Colorado Rockies',
-    'DET': 'Detroit Tigers',
-    'HOU': 'Houston Astros',
-    'KCR': 'Kansas City Royals',
-    'LAA': 'Los Angeles Angels',
-    'LAD': 'Los Angeles Dodgers',
-    'MIA': 'Miami Marlins',
-    'MIL': 'Milwaukee Brewers',
-    'MIN': 'Minnesota Twins',
-    'NYM': 'New York Mets',
-    'NYY': 'New York Yankees',
-    'ATH': 'Athletics',
-    'PHI': 'Philadelphia Phillies',
-    'PIT': 'Pittsburgh Pirates',
-    'SDP': 'San Diego Padres',
-    'SFG': 'San Francisco Giants',
-    'SEA': 'Seattle Mariners',
-    'STL': 'St. Louis Cardinals',
-    'TBR': 'Tampa Bay Rays',
-    'TEX': 'Texas Rangers',
-    'TOR': 'Toronto Blue Jays',
-    'WSN': 'Washington Nationals'
-}
-
-# name mappings in ou rdata
-TEAM_NAME_MAPPING = {
-    'Arizona Diamondbacks': 'ARI',
-    'Atlanta Braves': 'ATL',
-    'Baltimore Orioles': 'BAL',
-    'Boston Red Sox': 'BOS',
-    'Chicago Cubs': 'CHC',
-    'Chicago White Sox': 'CHW',
-    'Cincinnati Reds': 'CIN',
-    'Cleveland Guardians': 'CLE',
-    'Colorado Rockies': 'COL',
-    'Detroit Tigers': 'DET',
-    'Houston Astros': 'HOU',
-    'Kansas City Royals': 'KCR',
-    'Los Angeles Angels': 'LAA',
-    'Los Angeles Dodgers': 'LAD',
-    'Miami Marlins': 'MIA',
-    'Milwaukee Brewers': 'MIL',
-    'Minnesota Twins': 'MIN',
-    'New York Mets': 'NYM',
-    'New York Yankees': 'NYY',
-    'Athletics': 'ATH',
-    'Philadelphia Phillies': 'PHI',
-    'Pittsburgh Pirates': 'PIT',
-    'San Diego Padres': 'SDP',
-    'San Francisco Giants': 'SFG',
-    'Seattle Mariners': 'SEA',
-    'St. Louis Cardinals': 'STL',
-    'Tampa Bay Rays': 'TBR',
-    'Texas Rangers': 'TEX',
-    'Toronto Blue Jays': 'TOR',
-    'Washington Nationals': 'WSN'
-}
 
+from comparison import num_pages, page, pick_alignment
+from draft_store import MLB_TEAMS, load_store, team_file_name
+from reports import load_takeaways_report, load_team_report
+from takeaways import league_takeaways
+from live_draft import LiveDraft
+from name_index import enrich_predictions
+from optimization import team_settings
+from perf import cache_event, count, finish_run, span, start_run, timed
+from what_if import DEFAULT_SCENARIOS as WHAT_IF_SCENARIOS, request as request_what_if
+
+@timed()
 def get_available_teams(data_directory="Optimization_CSVs"):
     """Get list of teams that have CSV files available"""
     available_teams = []
     for abbrev in MLB_TEAMS.keys():
         # Athletics are ATH sometimes and OAK other times...
-        if abbrev == 'ATH':
-            file_path = Path(data_directory) / f"output_OAK.csv"
-        else:
-            file_path = Path(data_directory) / f"output_{abbrev}.csv"
+        file_path = Path(data_directory) / team_file_name(abbrev)
         
         if file_path.exists():
             available_teams.append(abbrev)
     return available_teams
 
+@timed()
 def load_actual_draft_data(data_directory="Optimization_CSVs"):
-    """Load the actual draft results data"""
+    """Load the actual draft results data (parsed once, then served from the draft store)"""
     file_path = Path(data_directory) / "data_ba-results.csv"
     try:
-        df = pd.read_csv(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(file_path)
         
-        # add abbreviations to make filtering more user friendly 
-        df['Team_Abbrev'] = df['Team'].map(TEAM_NAME_MAPPING)
-        
-        return df
+        # Team_Abbrev is already added during the ingest
+        return load_store(data_directory).results
     except FileNotFoundError:
         st.error("data_ba-results.csv file not found")
         return None
@@ -105,70 +45,20 @@ def load_actual_draft_data(data_directory="Optimization_CSVs"):
         st.error(f"Error loading actual draft data: {str(e)}")
         return None
 
+@timed()
 def load_team_predictions(team_abbrev, data_directory="Optimization_CSVs"):
-    """Load optimization predictions for a specific team"""
+    """Load optimization predictions for a specific team (a slice of the cached draft store)"""
     # As are a special case again 
-    if team_abbrev == 'ATH':
-        file_path = Path(data_directory) / f"output_OAK.csv"
-    else:
-        file_path = Path(data_directory) / f"output_{team_abbrev}.csv"
+    file_name = team_file_name(team_abbrev)
+    file_path = Path(data_directory) / file_name
     
     try:
-        df = pd.read_csv(file_path)
-        
-        # necessary b/c of julia style dataframe outputs...
-        if df.shape == (1, 1):
-            # raw string data 
-            raw_data = str(df.iloc[0, 0])
-            
-            # Parse concatenated string
-            players = []
-            bonuses = []
-            
-            # number │ name number
-            pattern = r'(\d+)\s*│\s*([^│]+?)\s+([\d.]+)'
-            matches = re.findall(pattern, raw_data)
-            
-            for match in matches:
-                row_num, name, bonus = match
-                name = name.strip()
-                try:
-                    bonus_val = float(bonus)
-                    players.append(name)
-                    bonuses.append(bonus_val)
-                except ValueError:
-                    continue
-            
-            if players:
-                df = pd.DataFrame({
-                    'Name': players,
-                    'Optimization_Value': bonuses
-                })
-            else:
-                return None
-        
-        # more standard csv format 
-        elif len(df) > 0 and str(df.iloc[0, 0]).strip() in ['Any', 'String', 'Float64', 'Int64']:
-            df = df.iloc[1:].reset_index(drop=True)
-        
-        # standard colnames 
-        if df.shape[1] >= 2:
-            if 'Name' not in df.columns or ('Bonus' not in df.columns and 'Optimization_Value' not in df.columns):
-                df.columns = ['Name', 'Optimization_Value'] + list(df.columns[2:])
-        
-        if 'Name' in df.columns:
-            df = df.dropna(subset=['Name'])
+        if not file_path.exists():
+            raise FileNotFoundError(file_path)
         
-        # convert this value ot number 
-        opt_col = 'Optimization_Value' if 'Optimization_Value' in df.columns else 'Bonus'
-        if opt_col in df.columns:
-            df[opt_col] = pd.to_numeric(df[opt_col], errors='coerce')
-            if opt_col == 'Bonus':
-                df = df.rename(columns={'Bonus': 'Optimization_Value'})
-        
-        return df
+        # julia dumps are parsed once in draft_store.py, switching teams is just a lookup
+        return load_store(data_directory).team_predictions(team_abbrev)
     except FileNotFoundError:
-        file_name = f"output_OAK.csv" if team_abbrev == 'ATH' else f"output_{team_abbrev}.csv"
         st.error(f"File not found: {file_name}")
         return None
     except Exception as e:
@@ -206,24 +96,253 @@ def format_optimization_value(value):
     except:
         return str(value)
 
-def find_player_in_actual_draft(player_name, actual_draft_df):
-    """Find if a predicted player was actually drafted and return their details"""
-    if actual_draft_df is None:
+@timed()
+def load_name_index(data_directory="Optimization_CSVs"):
+    """Name index over the actual draft results (built once per dataset)"""
+    try:
+        return load_store(data_directory).name_index
+    except Exception:
         return None
+
+@timed()
+def load_team_alignment(team_abbrev, predictions_df, actual_draft_df, actual_team_df, name_index,
+                        data_directory="Optimization_CSVs"):
+    """Model vs actual table for a team, built once per process and shared by every session"""
+    def build():
+        # prebuilt by reports.py when it is fresh, otherwise computed here
+        alignment = load_team_report(team_abbrev, data_directory)
+        if alignment is None:
+            # read in data, enhanced_predictions is our data (one indexed lookup instead of a scan per row)
+            with span("enrich_predictions"):
+                enhanced_predictions = enrich_predictions(predictions_df, actual_draft_df, name_index, format_bonus=format_currency)
+            
+            # one row per actual pick, model pick next to it
+            with span("pick_alignment"):
+                alignment = pick_alignment(enhanced_predictions, actual_team_df)
+        return alignment
     
-    # exact match (ideal)
-    exact_match = actual_draft_df[actual_draft_df['Name'].str.strip() == player_name.strip()]
-    if not exact_match.empty:
-        return exact_match.iloc[0]
-    
-    # partial match (try if not exact) 
-    partial_match = actual_draft_df[actual_draft_df['Name'].str.contains(player_name.strip(), case=False, na=False)]
-    if not partial_match.empty:
-        return partial_match.iloc[0]
+    return load_store(data_directory).derived(('alignment', team_abbrev), build)
+
+@timed()
+def load_takeaways(data_directory="Optimization_CSVs"):
+    """League takeaways (prebuilt report or computed), shared by every session"""
+    def build():
+        takeaways = load_takeaways_report(data_directory)
+        return takeaways if takeaways is not None else league_takeaways(data_directory)
+    
+    return load_store(data_directory).derived('takeaways', build)
+
+def format_short_currency(amount):
+    """$1.23M / $450K style"""
+    if pd.isna(amount):
+        return ""
+    if amount >= 1_000_000:
+        return f"${amount / 1_000_000:.2f}M"
+    return f"${amount / 1_000:.0f}K"
+
+@timed()
+def alignment_display(alignment):
+    """pick_alignment rows formatted for people (same columns as the static reports)"""
+    display = pd.DataFrame({
+        'Round': alignment['Round'],
+        'Pick': alignment['Pick'],
+        'Model Pick': alignment['Model_Player'].fillna("(rounds 1-4C only)"),
+        'Model Pick Drafted': alignment['Model_Drafted'],
+        'Model Pick Went': alignment['Model_Drafted_At'] + ", " + alignment['Model_Drafted_By'],
+        'Predicted Bonus': alignment['Predicted_Bonus'].map(format_short_currency),
+        'Actual Pick': alignment['Actual_Player'],
+        'Actual Bonus': alignment['Actual_Bonus'].map(format_currency),
+        'Model Agreed': alignment['Actual_Predicted'],
+    })
+    display.loc[~alignment['Model_Drafted'], 'Model Pick Went'] = ""
+    return display
+
+@timed()
+def show_alignment(alignment, team_abbrev, team_name, page_size_options=(10, 25, 50)):
+    """Model vs actual as one paginated table, plus a detail card for the pick you ask about"""
+    # back to the first page when the team changes
+    if st.session_state.get('alignment_team') != team_abbrev:
+        st.session_state['alignment_team'] = team_abbrev
+        st.session_state['alignment_page'] = 1
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Picks per page:", options=list(page_size_options), key="alignment_page_size")
+    with col2:
+        page_number = st.number_input("Page:", min_value=1, max_value=num_pages(alignment, page_size), step=1,
+                                      key="alignment_page")
+    shown = page(alignment, page_number, page_size)
+    
+    display = alignment_display(shown)
+    event = st.dataframe(display, width='stretch', hide_index=True, on_select="rerun", selection_mode="single-row",
+                         key=f"alignment_table_{team_abbrev}")
+    
+    # details only for the pick someone clicks on, not a card per pick
+    selected_rows = [i for i in event.selection.rows if i < len(shown)] if event else []
+    if not selected_rows:
+        st.caption("Select a row to see the details for that pick.")
+        return
+    row = shown.iloc[selected_rows[0]]
     
-    return None
+    with st.expander(f"Round {row['Round']}, Pick {row['Pick']}", expanded=True):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Optimization Model Results**")
+            if pd.isna(row['Model_Player']):
+                st.info("Model applied only to rounds 1 through 4C")
+            elif row['Model_Drafted']:
+                st.success(f"**{row['Model_Player']}**")
+                st.write(f"Position: {row['Model_Position']}")
+                st.write(f"Actually Drafted: {row['Model_Drafted_At']}, {row['Model_Drafted_By']}")
+                st.write(f"Predicted Bonus: {format_short_currency(row['Predicted_Bonus'])}")
+                st.write(f"Actual Bonus: {row['Model_Actual_Bonus']}")
+            else:
+                st.info(f"❓ **{row['Model_Player']}**")
+                st.write(f"Optimization Value: {format_optimization_value(row['Optimization_Value'])}")
+                st.write(f"Not drafted by this team in Round {row['Round']}, Pick {row['Pick']}")
+        
+        with col2:
+            st.markdown("**Actual Draft Results**")
+            if row['Actual_Predicted']:
+                st.success(f"**{row['Actual_Player']}**")
+            else:
+                st.warning(f"**{row['Actual_Player']}**")
+            st.write(f"Position: {row['Actual_Position']}")
+            st.write(f"Actual Pick: Round {row['Round']}, Pick {row['Pick']}, {team_name}")
+            st.write(f"Bonus: {format_currency(row['Actual_Bonus'])}")
+            st.write(f"Signed: {'Yes' if row['Signed'] else 'No'}")
 
-def main():
+OFF_BOARD = "Off-board player (type the name)"
+
+def get_live_draft():
+    """Live draft state for this browser session (scenario draws and solutions are kept between reruns)"""
+    if 'live_draft' not in st.session_state:
+        st.session_state.live_draft = LiveDraft()
+    return st.session_state.live_draft
+
+@timed()
+def show_live_draft(team_abbrev):
+    """Enter picks as they happen and get the selected team's recommendation"""
+    # nothing is loaded or solved until someone actually starts a draft in this session
+    if 'live_draft' not in st.session_state:
+        if st.button("Start live draft"):
+            get_live_draft()
+            st.rerun()
+        return
+    draft = get_live_draft()
+    on_the_clock = draft.on_the_clock
+
+    if on_the_clock:
+        st.write(f"**Pick {draft.next_pick}** - {MLB_TEAMS.get(on_the_clock, on_the_clock)} on the clock")
+    else:
+        st.write(f"**Pick {draft.next_pick}** - past the modeled rounds")
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        # plenty of picks go to players the board doesn't have, they can be typed in
+        player = st.selectbox("Player drafted:", options=draft.available_players() + [OFF_BOARD], key="live_player")
+        if player == OFF_BOARD:
+            player = st.text_input("Off-board player's name:", key="live_off_board").strip()
+    with col2:
+        st.write("")
+        if st.button("Record pick", disabled=on_the_clock is None or not player):
+            try:
+                draft.record_pick(player)
+            except ValueError as error:
+                st.error(str(error))
+            else:
+                st.rerun()
+        if st.button("Undo last pick", disabled=not draft.picks):
+            draft.undo()
+            st.rerun()
+
+    with span("live_draft.recommend"):
+        rec = draft.recommend(team_abbrev)
+    count("live_draft.scenarios_solved", rec.solved)
+    if rec.player is None:
+        st.info(f"{MLB_TEAMS[team_abbrev]} have made all of their modeled picks.")
+    else:
+        st.subheader(f"{MLB_TEAMS[team_abbrev]}: selection {rec.the_round} (pick {rec.pick_number})")
+        st.write(f"Recommended: **{rec.player}**")
+        votes = rec.votes_table()
+        votes['Share'] = votes['Share'].map(lambda x: f"{x:.0%}")
+        st.dataframe(votes, width='stretch', hide_index=True)
+
+        st.write("Most likely plan for the remaining picks:")
+        plan = rec.plan_table()
+        plan['Share'] = plan['Share'].map(lambda x: f"{x:.0%}")
+        st.dataframe(plan, width='stretch', hide_index=True)
+        st.caption(f"{rec.solved} of {rec.scenarios} scenarios re-solved in {rec.seconds * 1000:.0f} ms")
+
+    if draft.picks:
+        st.write("Picks so far:")
+        picks = pd.DataFrame(draft.picks, columns=['Pick', 'Team', 'Player']).iloc[::-1]
+        st.dataframe(picks, width='stretch', hide_index=True)
+
+def wait_for(jobs, label):
+    """Progress bar over background what-if jobs until they are all done"""
+    bar = st.progress(0.0, text=label)
+    while not all(job.done for job in jobs):
+        bar.progress(sum(job.fraction for job in jobs) / len(jobs), text=label)
+        time.sleep(0.05)
+    bar.empty()
+
+@timed()
+def show_what_if(team_abbrev):
+    """Re-optimize the selected team's draft with a different budget / penalties"""
+    penalty_risk, penalty_hs, spending = team_settings(team_abbrev)
+    with st.form(f"what_if_{team_abbrev}"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            budget = st.number_input("Budget ($M):", min_value=0.5, max_value=40.0, value=round(spending / 1e6, 2),
+                                     step=0.25, help=f"the model's default is {format_currency(spending)}")
+        with col2:
+            risk = st.slider("Risk penalty:", min_value=0.0, max_value=2.0, value=float(penalty_risk), step=0.05)
+        with col3:
+            hs = st.slider("High school penalty:", min_value=0.0, max_value=20.0, value=float(penalty_hs), step=0.5)
+        col1, col2 = st.columns(2)
+        with col1:
+            n_scenarios = st.select_slider("Scenarios:", options=[25, 50, 100, 200], value=WHAT_IF_SCENARIOS)
+        with col2:
+            seed = st.number_input("Seed:", min_value=0, value=0, step=1)
+        submitted = st.form_submit_button("Run what-if")
+
+    if not submitted:
+        st.caption("Change the settings and press Run what-if. Answers are cached, so a repeated question comes back instantly.")
+        return
+
+    # the widget shows the default rounded to $10k, a budget nobody moved off it is the model's exact spending
+    # (so an unchanged form is the default run, not a second solve with a slightly cut budget)
+    if budget == round(spending / 1e6, 2):
+        budget = spending / 1e6
+
+    # both runs see the same simulated drafts, so the difference is only the settings
+    default_job = request_what_if(team_abbrev, penalty_risk, penalty_hs, spending, n_scenarios, seed)
+    job = request_what_if(team_abbrev, risk, hs, budget * 1e6, n_scenarios, seed)
+    for j in (default_job, job):
+        cache_event('what_if', j.cached)
+    wait_for([default_job, job], f"Optimizing {MLB_TEAMS[team_abbrev]} over {n_scenarios} scenarios...")
+
+    failed = next((j.error for j in (default_job, job) if j.error is not None), None)
+    if failed is not None:
+        st.error(f"What-if run failed: {failed}")
+        return
+
+    table = job.result.table()
+    default_players = default_job.result.players
+    table['Default_Settings'] = [default_players[k] if k < len(default_players) else None for k in range(len(table))]
+    table['Changed'] = table['Player'] != table['Default_Settings']
+    for column in ('Share', 'Runner_Up_Share'):
+        table[column] = table[column].map(lambda x: f"{x:.0%}")
+    table['Mean_Value'] = table['Mean_Value'].round(2)
+    st.dataframe(table, width='stretch', hide_index=True)
+
+    changed = int(table['Changed'].sum())
+    st.write(f"**{changed}** of {len(table)} selections change vs the model's default settings.")
+    timing = "from the cache" if job.cached else f"in {job.result.seconds:.2f} s"
+    st.caption(f"{n_scenarios} scenarios (seed {seed}) {timing}")
+
+def show_dashboard():
     st.set_page_config(
         page_title="2024 MLB Draft Analysis: Integer Optimization Model",
         page_icon="⚾",
@@ -266,6 +385,7 @@ def main():
              view overall takeaways from the results and details about the modeling process in the tabs below the drop down menu. Please don't hesitate to reach out with any questions or comments: malcolm.t.gaynor@gmail.com.""")
     # load actual draft data
     actual_draft_df = load_actual_draft_data()
+    name_index = load_name_index() if actual_draft_df is not None else None
     
     #available teams
     available_teams = get_available_teams()
@@ -294,10 +414,8 @@ def main():
         st.error(f"Could not load prediction data for {selected_team_name}")
         return
     
-    # Filter draft data for selected team
-    actual_team_df = None
-    if actual_draft_df is not None:
-        actual_team_df = actual_draft_df[actual_draft_df['Team_Abbrev'] == selected_team_abbrev].copy()
+    # the team's rows of the draft results, pre-sliced in the shared store
+    actual_team_df = load_store().team_results(selected_team_abbrev) if actual_draft_df is not None else None
     
     # Display summary
     #col1, col2 = st.columns(2)
@@ -314,129 +432,26 @@ def main():
     #st.markdown("---")
     
     # tabs for different views
-    tab1, tab2, tab3 = st.tabs(["Optimization Model vs. Real Draft Results", "Overall Takeaways", "Model details (Machine Learning/Integer Optimization)"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Optimization Model vs. Real Draft Results", "Overall Takeaways", "Model details (Machine Learning/Integer Optimization)", "Live Draft Mode", "What-If"])
 
-    with tab1:
+    with tab1, span("render.comparison_tab"):
         st.subheader(f"Comparison for {selected_team_name}")
         
-        # read in data, enhanced_predictions is our data
-        enhanced_predictions = predictions_df.copy()
-        enhanced_predictions['Actually_Drafted'] = False
-        enhanced_predictions['Draft_Round'] = ""
-        enhanced_predictions['Draft_Pick'] = ""
-        enhanced_predictions['Actual_Bonus'] = ""
-        enhanced_predictions['Team'] = ""
-        enhanced_predictions['Position'] = ""
+        alignment = load_team_alignment(selected_team_abbrev, predictions_df, actual_draft_df, actual_team_df, name_index)
         
-        if actual_draft_df is not None:
-            for idx, row in enhanced_predictions.iterrows():
-                player_name = row['Name']
-                actual_info = find_player_in_actual_draft(player_name, actual_draft_df)
-                
-                if actual_info is not None:
-                    enhanced_predictions.at[idx, 'Actually_Drafted'] = True
-                    try: 
-                        enhanced_predictions.at[idx, 'Draft_Round'] = actual_info['Round']
-                    except: 
-                        enhanced_predictions.at[idx, 'Draft_Round'] = str(actual_info['Round'])
-                    try: 
-                        enhanced_predictions.at[idx, 'Draft_Pick'] = actual_info['Pick']
-                    except: 
-                        enhanced_predictions.at[idx, 'Draft_Pick'] = str(actual_info['Pick'])
-                    enhanced_predictions.at[idx, 'Actual_Bonus'] = format_currency(actual_info['Bonus'])
-                    enhanced_predictions.at[idx, 'Team'] = actual_info['Team']
-                    enhanced_predictions.at[idx, 'Position'] = actual_info['Position']
-    
-        # real data
-        actual_team_df_sorted = None
-        if actual_team_df is not None and len(actual_team_df) > 0:
-            # Convert Pick to numeric to ensure proper sorting
-            actual_team_df_sorted = actual_team_df.copy()
-            actual_team_df_sorted['Pick'] = pd.to_numeric(actual_team_df_sorted['Pick'], errors='coerce')
-            
-            # pick number determines ordering
-            actual_team_df_sorted = actual_team_df_sorted.sort_values('Pick')
-            actual_team_df_sorted['predicted'] = actual_team_df_sorted['Name'].isin(predictions_df['Name'].values)
-    
-        #actual picks 
-        actual_picks_list = []
-        if actual_team_df_sorted is not None:
-            actual_picks_list = actual_team_df_sorted.to_dict('records')
-        
-        # prediciton index on its own 
-        prediction_idx = 0
-        
-        # display by pick 
-        for pick_idx, actual_pick in enumerate(actual_picks_list):
-            round_num = actual_pick['Round']
-            pick_num = actual_pick['Pick']
-            
-            st.markdown(f"### Round {round_num}, Pick {pick_num}")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("**Optimization Model Results**")
-                
-                # do we have a prediction here...
-                if prediction_idx < len(enhanced_predictions):
-                    pred_row = enhanced_predictions.iloc[prediction_idx]
-                    
-                    with st.container():
-                        if pred_row['Actually_Drafted']:
-                            st.success(f"**{pred_row['Name']}**")
-                            st.write(f"Position: {pred_row['Position']}")
-                            
-                            bonus = pred_row['Optimization_Value'] * 9250000
-                            if bonus >= 1_000_000:
-                                formatted_bonus = f"${bonus / 1_000_000:.2f}M"
-                            else:
-                                formatted_bonus = f"${bonus / 1_000:.0f}K"
-                            
-                            st.write(f"Actually Drafted: Round {pred_row['Draft_Round']}, Pick {pred_row['Draft_Pick']}, {pred_row['Team']}")
-                            st.write(f"Predicted Bonus: {formatted_bonus}")
-                            st.write(f"Actual Bonus: {pred_row['Actual_Bonus']}")
-                        else:
-                            st.info(f"❓ **{pred_row['Name']}**")
-                            st.write(f"Optimization Value: {format_optimization_value(pred_row['Optimization_Value'])}")
-                            st.write(f"Not drafted by this team in Round {round_num}, Pick {pick_num}")
-                    
-                    # position increases
-                    prediction_idx += 1
-                else:
-                    st.info("Model applied only to rounds 1 through 4C")
-            
-            with col2:
-                st.markdown("**Actual Draft Results**")
-                
-                player_name = actual_pick['Name']
-                predicted = actual_pick['predicted']
-                
-                with st.container():
-                    if predicted:
-                        st.success(f"**{player_name}**")
-                    else:
-                        st.warning(f"**{player_name}**")
-                    
-                    st.write(f"Position: {actual_pick['Position']}")
-                    st.write(f"Actual Pick: Round {actual_pick['Round']}, Pick {actual_pick['Pick']}, {selected_team_name}")
-                    st.write(f"Bonus: {format_currency(actual_pick['Bonus'])}")
-                    st.write(f"Signed: {'Yes' if actual_pick['Signed'] == 'Y' else 'No'}")
-            
-            st.write("---")  
+        if len(alignment) > 0:
+            show_alignment(alignment, selected_team_abbrev, selected_team_name)
     
         # if no draft data for some reason 
-        if actual_team_df_sorted is None or len(actual_team_df_sorted) == 0:
+        else:
             st.info("No actual draft data available for this team")
             
             # show predictions anyway if exist
             st.markdown("### Optimization Model Predictions")
-            for idx, row in enhanced_predictions.iterrows():
-                with st.container():
-                    st.info(f"❓ **{row['Name']}**")
-                    st.write(f"Optimization Value: {format_optimization_value(row['Optimization_Value'])}")
-                    st.write("Not drafted by this team")
-                    st.write("---")
+            predictions_table = predictions_df[['Name', 'Optimization_Value']]
+            predictions_table.insert(0, 'Selection', range(1, len(predictions_table) + 1))
+            predictions_table['Optimization_Value'] = predictions_table['Optimization_Value'].map(format_optimization_value)
+            st.dataframe(predictions_table, width='stretch', hide_index=True)
     
         # download buttons
         st.markdown("---")
@@ -553,7 +568,7 @@ def main():
 
 
                 
-    with tab2:
+    with tab2, span("render.takeaways_tab"):
 
 
         st.markdown("### Model's Strategy")
@@ -563,104 +578,72 @@ def main():
         spending the most money for its first round signing bonus, and very rarely spending more money on a
         later round than is spent in any of the rounds before it. That is generally how the draft goes, but 
         it is interesting that the model was traditional in this manner. It is possible that the model would
-        choose more diverse strategies if it was applied to more than the first 4 rounds of the draft. 
-
-        The Arizona Diamondbacks were the only team who spent the most money in any round other than the 
-        first, spending a very similar amount of money in their first three picks, but spending the most in 
-        the third round. This is likely a reflection of that fact that Arizona picked three times within a 
-        span of seven selections.""") 
+        choose more diverse strategies if it was applied to more than the first 4 rounds of the draft.""") 
         
-        st.markdown("**Teams with multiple model favorites:**")
+        # everything below is computed from the per-team model outputs
+        takeaways = load_takeaways()
         
-        team_col1, team_col2, team_col3 = st.columns(3)
+        not_first = takeaways.teams_not_spending_first()
+        if len(not_first) > 0:
+            descriptions = [f"{MLB_TEAMS[row.Team_Abbrev]} (selection {row.Selection})" for row in not_first.itertuples()]
+            if len(descriptions) == 1:
+                st.markdown(f"""The {descriptions[0]} were the only team who spent the most money in any round other than the first.""")
+            else:
+                st.markdown(f"""{len(descriptions)} teams spent the most money in a round other than the first: the {", the ".join(descriptions)}.""")
         
-        with team_col1:
-            st.container()
-            st.markdown("**Colorado Rockies**")
-            st.write("• Brody Brecht *(19 teams)*")
-            st.write("• Charlie Condon *(3 teams)*")
-            
-        with team_col2:
-            st.container()
-            st.markdown("**Boston Red Sox**") 
-            st.write("• Brandon Clarke *(6 teams)*")
-            st.write("• Braden Montgomery *(5 teams)*")
+        if takeaways.teams_with_favorites:
+            st.markdown("**Teams with multiple model favorites:**")
             
-        with team_col3:
-            st.container()
-            st.markdown("**Cincinnati Reds**")
-            st.write("• Luke Hayden *(3 teams)*")
-            st.write("• Tyson Lewis *(3 teams)*")
-            
-        
-      
+            team_counts = dict(zip(takeaways.favorites['Name'], takeaways.favorites['Teams']))
+            team_cols = st.columns(min(3, len(takeaways.teams_with_favorites)))
+            for col_idx, (team, players) in enumerate(sorted(takeaways.teams_with_favorites.items(), key=lambda item: MLB_TEAMS.get(item[0], item[0]))):
+                with team_cols[col_idx % len(team_cols)]:
+                    st.markdown(f"**{MLB_TEAMS.get(team, team)}**")
+                    for player_name in players:
+                        st.write(f"• {player_name} *({team_counts[player_name]} teams)*")
         
-        st.info("""
-        The San Diego Padres and Texas Rangers both also had picks the model would classify as very valuable, 
-        as the model recommended almost every other team take Kavares Tears and David Hagaman earlier than they were drafted in reality.
-        """)
+        # players nearly every model took, and who really drafted them
+        num_teams = len(takeaways.highest_bonus_rounds)
+        near_unanimous = takeaways.favorites[(takeaways.favorites['Teams'] >= num_teams - 1) & takeaways.favorites['Found']]
+        if len(near_unanimous) > 0:
+            drafting_teams = list(dict.fromkeys(MLB_TEAMS.get(t, t) for t in near_unanimous['Team_Abbrev']))
+            st.info(f"""
+            The {" and ".join(drafting_teams)} also had picks the model would classify as very valuable, 
+            as the model recommended almost every other team take {" and ".join(near_unanimous['Name'])} earlier than they were drafted in reality.
+            """)
 
         st.write("---")
-
-    
-    
-        # model's favorite players data
-        favorite_players = {
-            "Kavares Tears": 29,
-            "David Hagaman": 29,
-            "Brody Brecht": 19,
-            "Wyatt Sanford": 7,
-            "Carson DeMartini": 6,
-            "Brandon Clarke": 6,
-            "Braden Montgomery": 5,
-            "Dasan Hill": 4,
-            "Braden Davis": 4,
-            "Ryan Stafford": 4,
-            "Jac Caglianone": 3,
-            "Caleb Lomavita": 3,
-            "Luke Hayden": 3,
-            "Charlie Condon": 3,
-            "Tyson Lewis": 3,
-            "Cam Smith": 3,
-            "Dakota Jordan": 2
-        }
         
         st.markdown("### Model's Favorite Players")
-        st.markdown("*Players the optimization model selected most frequently across all 30 teams*")
+        st.markdown(f"*Players the optimization model selected most frequently across all {num_teams} teams*")
         
         # display favorite players
-        for player_name, team_count in favorite_players.items():
-            # Find player in real data
-            actual_info = find_player_in_actual_draft(player_name, actual_draft_df) if actual_draft_df is not None else None
-            
+        for fav in takeaways.favorites.itertuples():
             with st.container():
-                if actual_info is not None:
-                    st.success(f"**{player_name}**")
+                if fav.Found:
+                    st.success(f"**{fav.Name}**")
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        st.write(f"**Selected by model on {team_count} teams**")
-                        st.write(f"Position: {actual_info['Position']}")
-                        st.write(f"School: {actual_info.get('School', 'N/A')}")
+                        st.write(f"**Selected by model on {fav.Teams} teams**")
+                        st.write(f"Position: {fav.Position}")
+                        st.write(f"School: {fav.School if pd.notna(fav.School) else 'N/A'}")
                     
                     with col2:
-                        st.write(f"Actually Drafted: Round {actual_info['Round']}, Pick #{actual_info['Pick']}, {actual_info['Team']}")
-                        #st.write(f"Team: {actual_info['Team']}")
-                        st.write(f"Signing Bonus: {format_currency(actual_info['Bonus'])}")
-                        st.write(f"Signed: {'Yes' if actual_info['Signed'] == 'Y' else 'No'}")
+                        st.write(f"Actually Drafted: Round {fav.Round}, Pick #{fav.Pick}, {fav.Team}")
+                        st.write(f"Signing Bonus: {format_currency(fav.Bonus)}")
+                        st.write(f"Signed: {'Yes' if fav.Signed == 'Y' else 'No'}")
                 else:
-                    st.warning(f"**{player_name}**")
-                    st.write(f"**Selected by model on {team_count} teams**")
+                    st.warning(f"**{fav.Name}**")
+                    st.write(f"**Selected by model on {fav.Teams} teams**")
                     st.write("❓ Draft information not found in actual results")
-                
-        
- 
-        
-       
         
+        st.markdown("### Model picks each team actually made")
+        overlap = takeaways.overlap.rename(columns={'Team_Abbrev': 'Team', 'Model_Picks': 'Model Picks', 'Matched': 'Also Drafted by Team', 'Players': 'Players'})
+        st.dataframe(overlap, width='stretch', hide_index=True)
             
             
-    with tab3:
+    with tab3, span("render.model_details_tab"):
         st.subheader("Model Details (Machine Learning/Integer Optimization)")
         st.write("This process involved three separate models:")
         st.write("1. ML model (Multivariate Adaptive Regression Spline) to predict signing bonuses")
@@ -710,11 +693,51 @@ def main():
     
         st.write("To see more details and documentation for the models, please visit the GitHub Repository: https://github.com/malcolmgaynor/MLB_draft")
         
+    with tab4, span("render.live_draft_tab"):
+        st.write("""Enter the real picks as they happen, including players who aren't on the board. The model keeps each 
+        team's simulated scenarios and their solutions, so a team on the clock gets a fresh recommendation right away.""")
+        show_live_draft(selected_team_abbrev)
+
+    with tab5, span("render.what_if_tab"):
+        st.write("""Change the selected team's budget or penalties and re-run the model for just that team. The runs use 
+        fewer scenarios than the full model so they come back in a second or two.""")
+        show_what_if(selected_team_abbrev)
+        
     st.markdown("---")
     
     st.write("This project was created by Malcolm Gaynor, and was inspired by and is an extension of a project done at MIT with Atharva Navaratne for Prof Alex Jacquillat's 15.083: Integer Optimization class")   
     
     
     
+def session_label():
+    """Streamlit session id (so the perf log can be grouped by session)"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else None
+    except Exception:
+        return None
+
+def show_perf_panel(run):
+    """Per-rerun timing breakdown in the sidebar (add ?perf=1 to the url)"""
+    with st.sidebar:
+        st.markdown("### Performance")
+        st.caption(f"Last rerun: {run.elapsed * 1000:.0f} ms")
+        table = run.table()
+        table['ms'] = table['ms'].round(1)
+        st.dataframe(table, width='stretch', hide_index=True)
+        st.markdown("**Cache hits/misses**")
+        st.dataframe(run.counter_table(), width='stretch', hide_index=True)
+
+def main():
+    # every rerun is timed, the log only gets written when MLB_DRAFT_PERF_LOG is set
+    start_run(session_label())
+    try:
+        show_dashboard()
+    finally:
+        run = finish_run()
+        if run is not None and st.query_params.get("perf"):
+            show_perf_panel(run)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,132 @@
+# one dense survival matrix for every player at every pick (the CoxPH stage, without the per-team loops)
+# survival[i, k] = P(player i is still on the board at pick k + 1), float32, players x picks 1..295
+# it is saved as a .npy so it can be memory mapped, with the player names and pick numbers in sidecar csvs
+#
+# usage (from the repo root): python survival_tensor.py [--from-teams]
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from simulation import INPUT_DIRECTORY, input_team_code, read_team_matrix
+
+SURVIVAL_FILE = Path(INPUT_DIRECTORY) / "survival.npy"
+PLAYERS_FILE = Path(INPUT_DIRECTORY) / "survival_players.csv"
+PICKS_FILE = Path(INPUT_DIRECTORY) / "survival_picks.csv"
+
+NUM_PICKS = 295
+COVARIATES = ['position_1B', 'position_C', 'position_IF', 'position_LHP', 'position_RHP', 'position_SS', 'hs', 'fv', 'risk']
+
+# create_scenario only went through round 4C
+LAST_MODELED_PICK = 136
+
+
+class SurvivalTensor:
+    """players x picks survival matrix with name and pick lookups"""
+
+    def __init__(self, matrix, names, picks):
+        self.matrix = matrix
+        self.names = np.asarray(names)
+        self.picks = np.asarray(picks)
+        self.pick_to_column = {int(p): k for k, p in enumerate(self.picks)}
+        self.name_to_row = {}
+        for i, name in enumerate(self.names):
+            self.name_to_row.setdefault(name, i)
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def columns(self, pick_numbers):
+        """Column positions for some pick numbers"""
+        return np.array([self.pick_to_column[int(p)] for p in pick_numbers], dtype=np.intp)
+
+    def pick(self, pick_number):
+        """Survival of every player at one pick (a view, nothing is copied)"""
+        return self.matrix[:, self.pick_to_column[int(pick_number)]]
+
+    def team_probs(self, pick_numbers):
+        """players x team picks, same layout as <TEAM>_probs.csv"""
+        return self.matrix[:, self.columns(pick_numbers)]
+
+    def team_views(self, picks_by_team):
+        """{team: players x picks} for many teams with one gather over the matrix
+
+        the gathered block is the only copy, every team gets a view into it
+        """
+        teams = list(picks_by_team)
+        counts = [len(picks_by_team[team]) for team in teams]
+        block = self.matrix[:, self.columns(np.concatenate([picks_by_team[team] for team in teams]))]
+        bounds = np.cumsum(counts)[:-1]
+        return dict(zip(teams, np.split(block, bounds, axis=1)))
+
+
+def load_team_picks(season=None, last_pick=LAST_MODELED_PICK):
+    """{team: array of pick numbers} from the season store, only modeled picks"""
+    from season_store import SEASON, load_season
+
+    return load_season(season or SEASON).picks_by_team(last_pick)
+
+
+def fit_survival(training=None, season=None, num_picks=NUM_PICKS):
+    """Fit the CoxPH model like CoxPH.ipynb and evaluate it at every pick for the season's drafted board
+    players, returns (matrix, names, picks)"""
+    from cox_scoring import fit_model
+    from season_store import SEASON, load_season
+
+    players = load_season(season or SEASON).drafted_board()
+    tensor = fit_model(training).score_board(players, np.arange(1, num_picks + 1))
+    return tensor.matrix, tensor.names, tensor.picks
+
+
+def assemble_from_teams(data_directory=INPUT_DIRECTORY, picks_by_team=None, num_picks=NUM_PICKS):
+    """Rebuild the matrix from the per-team probs csvs (no lifelines needed), unknown picks are NaN"""
+    data_directory = Path(data_directory)
+    picks_by_team = picks_by_team or load_team_picks()
+    picks = np.arange(1, num_picks + 1)
+    names = None
+    matrix = None
+    for team, team_picks in picks_by_team.items():
+        team_names, probs, _ = read_team_matrix(data_directory / f"{input_team_code(team)}_probs.csv", np.float32)
+        if names is None:
+            names = team_names
+            matrix = np.full((len(names), num_picks), np.nan, dtype=np.float32)
+        elif not np.array_equal(names, team_names):
+            raise ValueError(f"{team}_probs.csv has a different player list")
+        if probs.shape[1] != len(team_picks):
+            raise ValueError(f"{team}_probs.csv has {probs.shape[1]} picks, expected {len(team_picks)}")
+        matrix[:, team_picks - 1] = probs
+    return matrix, names, picks
+
+
+def save_survival(matrix, names, picks, file_path=SURVIVAL_FILE, players_file=PLAYERS_FILE, picks_file=PICKS_FILE):
+    """Write the matrix (.npy) and its name and pick sidecars"""
+    np.save(file_path, np.ascontiguousarray(matrix, dtype=np.float32))
+    pd.DataFrame({'name': names}).to_csv(players_file, index_label='row')
+    pd.DataFrame({'pick': picks}).to_csv(picks_file, index_label='column')
+
+
+def load_survival(file_path=SURVIVAL_FILE, players_file=PLAYERS_FILE, picks_file=PICKS_FILE, mmap=True):
+    """SurvivalTensor backed by a read-only memory map of the saved matrix"""
+    matrix = np.load(file_path, mmap_mode='r' if mmap else None)
+    names = pd.read_csv(players_file)['name'].astype(str).to_numpy()
+    picks = pd.read_csv(picks_file)['pick'].to_numpy()
+    if matrix.shape != (len(names), len(picks)):
+        raise ValueError(f"{file_path} is {matrix.shape}, sidecars say {(len(names), len(picks))}")
+    return SurvivalTensor(matrix, names, picks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="build the players x picks survival matrix")
+    parser.add_argument("--from-teams", action="store_true", help="assemble from the per-team csvs instead of refitting")
+    args = parser.parse_args()
+
+    matrix, names, picks = assemble_from_teams() if args.from_teams else fit_survival()
+    save_survival(matrix, names, picks)
+    print(f"wrote {SURVIVAL_FILE} {matrix.shape}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# parameter sweep over the risk penalty, the high school penalty and the budget
+# every team is normally run with penalty_risk 0.5, a high school penalty of 0 or 10 and one hand typed
+# spending total. this runs the whole league at every point of a grid over (penalty_risk, penalty_hs,
+# budget multiplier) and keeps the selections in one small cube: team x pick x grid point -> selection, votes
+# and mean optimal value, so how sensitive each team's draft is to the settings can be read straight off it
+#   - every grid point uses the same scenarios: the persistent bank (scenario_bank.py), conditioned per pick
+#     once per team, so two points only differ by their parameters (common random numbers)
+#   - the exact solver by default: with presolve (presolve.py) and its budget aware bound a solve is about
+#     a millisecond, where HiGHS is 15-30
+#   - (team, chunk of grid points) tasks go out to a process pool
+#
+# usage (from the repo root): python sweep.py [--risk 0 0.25 0.5 0.75 1] [--hs 0 5 10]
+#     [--budget 0.8 0.9 1 1.1 1.2] [--scenarios 100] [--seed 0] [--workers N] [--teams ...]
+
+import argparse
+import itertools
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from adaptive_sampling import rank_votes
+from draft_store import MLB_TEAMS
+from league_runner import get_problem
+from optimization import pick_model_class, team_settings
+
+SWEEP_FILE = Path("Optimization_CSVs") / "sweep_cube.npz"
+
+
+def parameter_grid(risks, hs_penalties, budget_multipliers):
+    """Every (penalty_risk, penalty_hs, budget multiplier) point"""
+    return np.array(list(itertools.product(risks, hs_penalties, budget_multipliers)), dtype=np.float64)
+
+
+class SweepCube:
+    """team x pick x grid point selections (player index into names, -1 past a team's last pick)"""
+
+    def __init__(self, teams, points, names, selection, votes, value, scenarios, pick_numbers):
+        self.teams = list(teams)
+        self.points = np.asarray(points)
+        self.names = np.asarray(names)
+        self.selection = selection
+        self.votes = votes
+        self.value = value
+        self.scenarios = scenarios
+        self.pick_numbers = pick_numbers
+
+    @property
+    def shape(self):
+        return self.selection.shape
+
+    def team_plans(self, team):
+        """points x picks of player names for one team"""
+        t = self.teams.index(team)
+        selection = self.selection[t].T
+        return np.where(selection >= 0, self.names[np.maximum(selection, 0)], "")
+
+    def sensitivity(self):
+        """Per team: distinct first picks and distinct full drafts over the grid"""
+        rows = []
+        for t, team in enumerate(self.teams):
+            drafts = {tuple(plan) for plan in self.selection[t].T}
+            rows.append({'team': team, 'first_picks': len(np.unique(self.selection[t, 0])), 'drafts': len(drafts)})
+        return pd.DataFrame(rows)
+
+    def to_frame(self):
+        """Long table: one row per (team, pick, grid point)"""
+        t, k, g = np.nonzero(self.selection >= 0)
+        return pd.DataFrame({
+            'team': np.asarray(self.teams)[t], 'selection': k + 1, 'pick_number': self.pick_numbers[t, k],
+            'penalty_risk': self.points[g, 0], 'penalty_hs': self.points[g, 1], 'budget_multiplier': self.points[g, 2],
+            'name': self.names[self.selection[t, k, g]], 'votes': self.votes[t, k, g], 'value': self.value[t, k, g],
+        })
+
+    def save(self, file_path=SWEEP_FILE):
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(file_path, teams=np.asarray(self.teams), points=self.points, names=self.names,
+                            selection=self.selection, votes=self.votes, value=self.value,
+                            scenarios=np.int64(self.scenarios), pick_numbers=self.pick_numbers)
+
+    @classmethod
+    def load(cls, file_path=SWEEP_FILE):
+        with np.load(file_path) as cube:
+            return cls(cube['teams'].tolist(), cube['points'], cube['names'], cube['selection'], cube['votes'],
+                       cube['value'], int(cube['scenarios']), cube['pick_numbers'])
+
+
+def plan_team(problem, model, scenarios, progress=None):
+    """Pick by pick majority vote over shared scenarios: [(votes Counter, mean optimal value)] per pick
+
+    scenarios holds one (scenarios x players x picks) tensor per pick. stops at the first pick with no
+    feasible scenario. progress(solved, total) is called after every pick
+    """
+    total = sum(len(available) for available in scenarios)
+    solved = 0
+    picks = []
+    selected = []
+    for pick in range(1, problem.num_picks + 1):
+        model.set_selected_players(selected)
+        counts = Counter()
+        values = []
+        for available in scenarios[pick - 1]:
+            assignment = model.solve(available)
+            if assignment is not None:
+                counts[problem.names[assignment[pick - 1]]] += 1
+                values.append(model.objective(assignment))
+        solved += len(scenarios[pick - 1])
+        if progress is not None:
+            progress(solved, total)
+        if not counts:
+            break
+        picks.append((counts, float(np.mean(values))))
+        selected.append(rank_votes(counts)[0][0])
+    return picks
+
+
+def sweep_team(team_abbrev, points, bank, solver="exact"):
+    """One team at some grid points: (names per point x pick, votes, mean value) plus the number of solves"""
+    problem = get_problem(team_abbrev)
+    _, _, spending = team_settings(team_abbrev)
+    # the same conditioned scenarios for every point
+    scenarios = [bank.team_scenarios(problem, pick) for pick in range(1, problem.num_picks + 1)]
+
+    names = np.full((len(points), problem.num_picks), "", dtype=object)
+    votes = np.zeros((len(points), problem.num_picks), dtype=np.int32)
+    value = np.full((len(points), problem.num_picks), np.nan, dtype=np.float32)
+    solves = 0
+    for g, (penalty_risk, penalty_hs, multiplier) in enumerate(points):
+        model = pick_model_class(solver)(problem, penalty_risk, penalty_hs, spending * multiplier)
+        picks = plan_team(problem, model, scenarios)
+        # a point with nothing feasible at some pick leaves the rest of its picks empty
+        solves += sum(len(available) for available in scenarios[:len(picks) + 1])
+        for k, (counts, mean_value) in enumerate(picks):
+            names[g, k], votes[g, k] = rank_votes(counts)[0]
+            value[g, k] = mean_value
+    return names, votes, value, solves
+
+
+def run_sweep(points, teams=None, n_scenarios=100, seed=0, workers=None, solver="exact", points_per_task=15):
+    """SweepCube for the whole league over a grid of points (see parameter_grid), plus the number of solves"""
+    from scenario_bank import get_bank
+
+    teams = list(teams or MLB_TEAMS)
+    bank = get_bank(seed=seed, n_scenarios=n_scenarios)
+    # (team, chunk of points) tasks, some teams take 10x longer than others so whole teams balance badly
+    chunks = np.array_split(np.arange(len(points)), max(1, -(-len(points) // points_per_task)))
+    tasks = [(team, chunk) for team in teams for chunk in chunks]
+    args = [(team, points[chunk], bank, solver) for team, chunk in tasks]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(sweep_team, *zip(*args)))
+    else:
+        results = [sweep_team(*a) for a in args]
+
+    max_picks = max(get_problem(team).num_picks for team in teams)
+    all_names = sorted({name for names, _, _, _ in results for name in names.ravel() if name})
+    name_index = {name: i for i, name in enumerate(all_names)}
+    shape = (len(teams), max_picks, len(points))
+    selection = np.full(shape, -1, dtype=np.int32)
+    votes = np.zeros(shape, dtype=np.int32)
+    value = np.full(shape, np.nan, dtype=np.float32)
+    pick_numbers = np.zeros((len(teams), max_picks), dtype=np.int64)
+    for t, team in enumerate(teams):
+        problem = get_problem(team)
+        pick_numbers[t, :problem.num_picks] = problem.pick_numbers
+    solves = 0
+    for (team, chunk), (names, chunk_votes, chunk_value, chunk_solves) in zip(tasks, results):
+        t, num_picks = teams.index(team), names.shape[1]
+        codes = np.array([[name_index.get(name, -1) for name in row] for row in names], dtype=np.int32)
+        selection[t][:num_picks, chunk] = codes.T
+        votes[t][:num_picks, chunk] = chunk_votes.T
+        value[t][:num_picks, chunk] = chunk_value.T
+        solves += chunk_solves
+    return SweepCube(teams, points, all_names, selection, votes, value, n_scenarios, pick_numbers), solves
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sweep the league over risk / high school penalty / budget")
+    parser.add_argument("--risk", type=float, nargs="*", default=[0.0, 0.25, 0.5, 0.75, 1.0])
+    parser.add_argument("--hs", type=float, nargs="*", default=[0.0, 5.0, 10.0])
+    parser.add_argument("--budget", type=float, nargs="*", default=[0.8, 0.9, 1.0, 1.1, 1.2],
+                        help="multipliers on each team's spending")
+    parser.add_argument("--teams", nargs="*", help="team abbreviations (default: all 30)")
+    parser.add_argument("--scenarios", type=int, default=100, help="bank scenarios per pick")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--solver", choices=["mip", "exact"], default="exact")
+    parser.add_argument("--output", default=str(SWEEP_FILE))
+    args = parser.parse_args()
+
+    points = parameter_grid(args.risk, args.hs, args.budget)
+    start = time.perf_counter()
+    cube, solves = run_sweep(points, args.teams, args.scenarios, args.seed, args.workers, args.solver)
+    elapsed = time.perf_counter() - start
+    cube.save(args.output)
+    print(f"{len(points)} grid points x {len(cube.teams)} teams: {solves:,} solves in {elapsed:.1f}s "
+          f"({elapsed / solves * 1000:.3f} ms/solve), cube {cube.shape} -> {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.0f} KB)")
+
+    sensitivity = cube.sensitivity()
+    print(f"\ndistinct selections over the grid (of {len(points)} points):")
+    print(sensitivity.sort_values('drafts', ascending=False).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+# synthetic drafts shaped like the real inputs, at whatever scale we want to test
+# the real 2024 files are ~156 prospects x rounds 1-4C, which hides how the simulation, the solvers and the
+# dashboard joins scale. this writes a self contained tree with the same file layouts:
+#   Original_CSVs/data_fg - <season>.csv          board (name, position, hs, fv, risk)
+#   Original_CSVs/signing_bonus_df.csv           players x every pick bonus fractions (piecewise linear)
+#   Original_CSVs/<season>picks.csv              pick order (Pick, Number, Team)
+#   Intermediary_CSVs/<TEAM>_{probs,real,bonus}.csv
+#   Optimization_CSVs/data_ba-results.csv        the "real" draft
+#   Optimization_CSVs/output_<TEAM>.csv          julia style model dumps
+# the first 30 teams are the real clubs (the dashboard's store only knows those), extra ones are T31, T32, ...
+#
+# usage (from the repo root): python synthetic_draft.py --players 5000 --rounds 20 --teams 30 --out synthetic
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from draft_store import MLB_TEAMS, RESULTS_FILE, team_file_name
+from optimization import MAX_BONUS
+from simulation import input_team_code
+
+# marginals of the real fangraphs board
+POSITIONS = {'RHP': 0.341, 'SS': 0.134, 'LHP': 0.134, 'OF': 0.123, 'IF': 0.106, 'C': 0.095, 'CF': 0.05, '1B': 0.017}
+FV_VALUES = {30.0: 0.14, 35.0: 0.117, 37.5: 0.296, 40.0: 0.184, 42.5: 0.084, 45.0: 0.101, 47.5: 0.045, 50.0: 0.034}
+RISK_VALUES = {20: 0.559, 50: 0.291, 80: 0.151}
+HS_SHARE = 0.296
+UNSIGNED_SHARE = 0.015
+
+# share of real draft names that are spelled differently from the board (Jr., a missing middle initial),
+# so the name matching has to go through its partial fallback like it does on the real data
+RENAMED_SHARE = 0.03
+
+FIRST_NAMES = [
+    "Aaron", "Adrian", "Alex", "Andrew", "Austin", "Blake", "Brady", "Braden", "Brandon", "Bryce", "Caleb",
+    "Cameron", "Carson", "Chase", "Christian", "Cole", "Connor", "Dylan", "Ethan", "Evan", "Gavin", "Grant",
+    "Hunter", "Jack", "Jacob", "Jake", "James", "Jaxon", "Jonah", "Jordan", "Josh", "Kaleb", "Kyle", "Landon",
+    "Logan", "Luke", "Mason", "Matt", "Nick", "Noah", "Owen", "Ryan", "Sam", "Tanner", "Tyler", "Wyatt",
+]
+LAST_NAMES = [
+    "Adams", "Allen", "Baker", "Bell", "Brooks", "Brown", "Burns", "Carter", "Clark", "Collins", "Cook",
+    "Cooper", "Davis", "Diaz", "Evans", "Fisher", "Foster", "Garcia", "Gray", "Green", "Hall", "Harris", "Hayes",
+    "Hill", "Howard", "Hughes", "Jackson", "James", "Jenkins", "Johnson", "Kelly", "King", "Lee", "Lewis",
+    "Long", "Martin", "Miller", "Mitchell", "Moore", "Morgan", "Murphy", "Nelson", "Parker", "Perry", "Price",
+    "Reed", "Rivera", "Roberts", "Ross", "Russell", "Sanders", "Scott", "Smith", "Stewart", "Taylor", "Thomas",
+    "Turner", "Walker", "Ward", "Watson", "White", "Wilson", "Wood", "Young",
+]
+INITIALS = [chr(c) for c in range(ord('A'), ord('Z') + 1)]
+
+# the shared bonus curve: (share of the draft, bonus fraction there), linear in between. steep at the top
+# and nearly flat late like the real slot values
+CURVE_POINTS = [(0.0, 0.8), (0.03, 0.5), (0.08, 0.3), (0.15, 0.18), (0.35, 0.08), (0.7, 0.03), (1.0, 0.02)]
+
+
+def team_codes(n_teams):
+    """The real clubs first (ATH included), then T31, T32, ..."""
+    codes = list(MLB_TEAMS)[:n_teams]
+    return codes + [f"T{i}" for i in range(len(codes) + 1, n_teams + 1)]
+
+
+def team_name(team):
+    return MLB_TEAMS.get(team, f"Synthetic Team {team[1:]}")
+
+
+def player_names(n_players, rng):
+    """Unique "First X. Last" names (no digits, the julia dump parser reads digits as the value)"""
+    combos = len(FIRST_NAMES) * len(LAST_NAMES) * len(INITIALS)
+    if n_players > combos:
+        raise ValueError(f"at most {combos} unique names, asked for {n_players}")
+    codes = rng.choice(combos, size=n_players, replace=False)
+    first, rest = np.divmod(codes, len(LAST_NAMES) * len(INITIALS))
+    initial, last = np.divmod(rest, len(LAST_NAMES))
+    return np.array([f"{FIRST_NAMES[f]} {INITIALS[i]}. {LAST_NAMES[l]}" for f, i, l in zip(first, initial, last)])
+
+
+def sample(values, n, rng):
+    """n draws from a {value: probability} marginal"""
+    keys = list(values)
+    p = np.array([values[k] for k in keys])
+    return np.asarray(keys)[rng.choice(len(keys), size=n, p=p / p.sum())]
+
+
+def bonus_curve_coefficients(num_picks):
+    """(knots, intercept/slope/hinge coefficients) of the shared curve, in the bonus_surface.py basis"""
+    shares, values = map(np.array, zip(*CURVE_POINTS))
+    at = 1 + shares * (num_picks - 1)
+    points = np.unique(np.round(at)).astype(int)
+    slopes = np.diff(np.interp(points, at, values)) / np.diff(points)
+    intercept = np.interp(1, at, values) - slopes[0]
+    return points[1:-1], np.concatenate([[intercept, slopes[0]], np.diff(slopes)])
+
+
+class SyntheticDraft:
+    """One generated draft: board, pick order, bonus grid, the real draft and the model dumps"""
+
+    def __init__(self, board, picks, bonus_grid, drafted_at, expected_slot, model_picks, renamed, season):
+        self.board = board
+        self.picks = picks
+        self.bonus_grid = bonus_grid
+        self.drafted_at = drafted_at
+        self.expected_slot = expected_slot
+        self.model_picks = model_picks
+        self.renamed = renamed
+        self.season = season
+
+    @property
+    def teams(self):
+        return list(dict.fromkeys(self.picks['Team']))
+
+    @property
+    def num_players(self):
+        return len(self.board)
+
+    @property
+    def num_picks(self):
+        return len(self.picks)
+
+    def team_pick_numbers(self, team):
+        return self.picks.loc[self.picks['Team'] == team, 'Number'].to_numpy()
+
+    def bonus_pool(self, team):
+        """Slot money for a team's picks: what the player expected at each of them would sign for (dollars)"""
+        pick_numbers = self.team_pick_numbers(team)
+        expected = np.argsort(self.expected_slot, kind='stable')[pick_numbers - 1]
+        return float(self.bonus_grid[expected, pick_numbers - 1].sum() * MAX_BONUS)
+
+    def survival(self, pick_numbers):
+        """players x picks chance each player is still on the board at those picks"""
+        slot = self.expected_slot[:, None]
+        spread = 2.0 + 0.25 * np.sqrt(slot)
+        return 1.0 / (1.0 + np.exp((np.asarray(pick_numbers)[None, :] - slot) / spread))
+
+    def team_frames(self, team):
+        """(probs, real, bonus) DataFrames laid out like <TEAM>_probs/real/bonus.csv"""
+        pick_numbers = self.team_pick_numbers(team)
+        names = self.board['name'].to_numpy()
+        # a player is "really" available at a pick if nobody took him before it
+        real = (self.drafted_at[:, None] >= pick_numbers[None, :]).astype(np.int8)
+        probs = self.survival(pick_numbers)
+        bonus = self.bonus_grid[:, pick_numbers - 1]
+
+        def frame(values, columns):
+            df = pd.DataFrame(values, columns=columns)
+            df.insert(0, 'name', names)
+            return df
+
+        # the probs/real headers are just name,0,0,... like the real ones
+        zeros = [0] * len(pick_numbers)
+        return (frame(probs, zeros), frame(real, zeros), frame(bonus, [f"pick_{p}" for p in pick_numbers]))
+
+    def results(self):
+        """data_ba-results.csv: every pick with who went there"""
+        order = np.argsort(self.drafted_at, kind='stable')[:self.num_picks]
+        board = self.board.iloc[order]
+        names = np.where(self.renamed[order], [renamed_spelling(n) for n in board['name']], board['name'])
+        numbers = self.picks['Number'].to_numpy()
+        bonus = self.bonus_grid[order, numbers - 1] * MAX_BONUS
+        signed = self.board['signed'].to_numpy()[order]
+        return pd.DataFrame({
+            'Round': self.picks['Round'].astype(str).to_numpy(),
+            'Pick': numbers,
+            'Team': [team_name(t) for t in self.picks['Team']],
+            'Name': names,
+            'Position': board['position'].to_numpy(),
+            'School': board['school'].to_numpy(),
+            'Signed': np.where(signed, 'Y', 'N'),
+            'Bonus': [f"${round(b, -3):,.0f}" if s else np.nan for b, s in zip(bonus, signed)],
+        })
+
+    def model_output(self, team):
+        """The team's model selections as a julia style dump (what output_<TEAM>.csv looks like)"""
+        rows = self.model_picks[team]
+        names = self.board['name'].to_numpy()[rows]
+        values = self.bonus_grid[rows, self.team_pick_numbers(team) - 1]
+        return julia_dump(names, values)
+
+
+def write_csv(df, file_path):
+    """to_csv, through pyarrow when it is there (pandas' float formatting dominates at this size)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        df.to_csv(file_path, index=False)
+        return
+    # from_arrays so the repeated 0 headers of the probs/real files survive
+    columns = [pa.array(df.iloc[:, i], from_pandas=True) for i in range(df.shape[1])]
+    pa_csv.write_csv(pa.Table.from_arrays(columns, names=[str(c) for c in df.columns]), file_path)
+
+
+def renamed_spelling(name):
+    """How a board name might show up in the results (drop the middle initial or add a Jr.)"""
+    first, initial, last = name.split(' ')
+    return f"{first} {last}" if len(last) % 2 else f"{name} Jr."
+
+
+def julia_dump(names, values):
+    """The single cell "N×2 DataFrame" string julia writes for a Name/Bonus frame"""
+    width = max([len("Name")] + [len(n) for n in names])
+    lines = [
+        f"{len(names)}×2 DataFrame",
+        f" Row │ {'Name':<{width}}  Bonus",
+        f"     │ {'Any':<{width}}  Float64",
+        "─────┼" + "─" * (width + 11),
+    ]
+    lines += [f"{i:>4} │ {name:<{width}}  {value:.6g}" for i, (name, value) in enumerate(zip(names, values), 1)]
+    return "\n".join(lines)
+
+
+def generate_draft(n_players=2000, n_rounds=20, n_teams=30, seed=0, season=2024):
+    """SyntheticDraft with n_players prospects and n_teams x n_rounds picks"""
+    rng = np.random.default_rng(seed)
+    n_picks = n_teams * n_rounds
+    if n_players < n_picks:
+        raise ValueError(f"{n_picks} picks need at least that many players, got {n_players}")
+
+    board = pd.DataFrame({
+        'name': player_names(n_players, rng),
+        'position': sample(POSITIONS, n_players, rng),
+        'hs': (rng.random(n_players) < HS_SHARE).astype(int),
+        'fv': sample(FV_VALUES, n_players, rng),
+        'risk': sample(RISK_VALUES, n_players, rng),
+    })
+    board['school'] = np.where(board['hs'] == 1, 'HS', rng.choice(['4YR', 'JC'], size=n_players, p=[0.97, 0.03]))
+    board['signed'] = rng.random(n_players) >= UNSIGNED_SHARE
+
+    # a player's draft stock: fv, less for risk, plus scouting noise. expected slot is the rank of the stock,
+    # the "real" draft is the same with some draft day noise on top
+    stock = board['fv'].to_numpy() - 0.05 * board['risk'].to_numpy() + rng.normal(0, 2.0, n_players)
+    expected_slot = np.empty(n_players)
+    expected_slot[np.argsort(-stock, kind='stable')] = np.arange(1, n_players + 1)
+    drafted_at = np.empty(n_players)
+    drafted_at[np.argsort(-(stock + rng.normal(0, 1.0, n_players)), kind='stable')] = np.arange(1, n_players + 1)
+    drafted_at[drafted_at > n_picks] = np.inf
+
+    # same team order every round, like the real draft without the comp picks
+    teams = team_codes(n_teams)
+    order = rng.permutation(teams)
+    numbers = np.arange(1, n_picks + 1)
+    pick_teams = np.tile(order, n_rounds)
+    rounds = np.repeat(np.arange(1, n_rounds + 1), n_teams)
+    picks = pd.DataFrame({
+        'Pick': [f"{n}/{input_team_code(t)}" for n, t in zip(numbers, pick_teams)],
+        'Number': numbers,
+        'Team': pick_teams,
+        'Round': rounds,
+    })
+
+    # every player scales the shared curve a bit (better prospects sign for more), so every row is piecewise
+    # linear on the same knots, like the MARS grid. picks go out to the last drafted pick
+    knots, curve = bonus_curve_coefficients(n_picks)
+    scale = np.clip(1.0 + 0.02 * (board['fv'].to_numpy() - 40.0) + rng.normal(0, 0.05, n_players), 0.5, 1.25)
+    basis = np.concatenate([np.ones((n_picks, 1)), numbers[:, None], np.maximum(0, numbers[:, None] - knots)], axis=1)
+    bonus_grid = scale[:, None] * (basis @ curve)[None, :]
+
+    # model picks: the model likes players that should still be there at each of the team's picks
+    model_picks = {}
+    for team in teams:
+        team_numbers = numbers[pick_teams == team]
+        chosen = []
+        for number in team_numbers:
+            window = np.flatnonzero(np.abs(expected_slot - number) <= n_teams)
+            window = window[~np.isin(window, chosen)]
+            chosen.append(int(rng.choice(window)))
+        model_picks[team] = np.array(chosen)
+
+    renamed = rng.random(n_players) < RENAMED_SHARE
+    return SyntheticDraft(board, picks, bonus_grid, drafted_at, expected_slot, model_picks, renamed, season)
+
+
+def write_draft(draft, out_directory):
+    """Write the draft as a tree laid out like the repo's data folders, returns the tree's root"""
+    out = Path(out_directory)
+    original = out / "Original_CSVs"
+    intermediary = out / "Intermediary_CSVs"
+    optimization = out / "Optimization_CSVs"
+    for folder in (original, intermediary, optimization):
+        folder.mkdir(parents=True, exist_ok=True)
+
+    write_csv(draft.board[['name', 'position', 'hs', 'fv', 'risk']], original / f"data_fg - {draft.season}.csv")
+    grid = pd.DataFrame(draft.bonus_grid, columns=[f"pick_{n}" for n in range(1, draft.num_picks + 1)])
+    grid.insert(0, 'name', draft.board['name'].to_numpy())
+    write_csv(grid, original / "signing_bonus_df.csv")
+    pick_order = draft.picks[['Pick', 'Number', 'Team']].replace({'Team': {'ATH': 'OAK'}})
+    write_csv(pick_order, original / f"{draft.season}picks.csv")
+
+    for team in draft.teams:
+        code = input_team_code(team)
+        for kind, df in zip(['probs', 'real', 'bonus'], draft.team_frames(team)):
+            write_csv(df, intermediary / f"{code}_{kind}.csv")
+        pd.DataFrame({'name': [draft.model_output(team)]}).to_csv(optimization / team_file_name(team), index=False)
+
+    write_csv(draft.results(), optimization / RESULTS_FILE)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="write a synthetic draft shaped like the real inputs")
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--teams", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="synthetic")
+    args = parser.parse_args()
+
+    draft = generate_draft(args.players, args.rounds, args.teams, args.seed)
+    out = write_draft(draft, args.out)
+    print(f"{draft.num_players} players, {len(draft.teams)} teams, {draft.num_picks} picks -> {out}")
+
+
+if __name__ == "__main__":
+    main()
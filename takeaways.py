@@ -0,0 +1,182 @@
+# league wide rollups behind the "Overall Takeaways" tab, computed from the per-team model outputs
+#   - how many teams' models picked each player (most_popular.csv in the julia notebook)
+#   - the round each team's model spent the most in (highest_bonuses.csv / highest_bonus_counts.csv)
+#   - which model picks the team actually made, and where each favorite really went
+# every team gets a small summary that is cached on the content of its rows, so re-running one team only
+# recomputes that team's summary before the (cheap) league totals are added back up
+#
+# usage (from the repo root): python takeaways.py  (checks the rollups against the julia csvs)
+
+import re
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+from draft_store import MLB_TEAMS, load_store
+from name_index import NameIndex
+from perf import cache_event, timed
+
+# a player is a "favorite" when at least this many teams' models took him
+MIN_FAVORITE_TEAMS = 2
+
+_SUMMARY_CACHE = {}
+_TAKEAWAYS_CACHE = {}
+
+
+class TeamSummary:
+    """What one team's model output contributes to the league rollups"""
+
+    def __init__(self, team, players, highest_bonus_round, highest_bonus, overlap):
+        self.team = team
+        self.players = players
+        self.highest_bonus_round = highest_bonus_round
+        self.highest_bonus = highest_bonus
+        self.overlap = overlap
+
+
+class Takeaways:
+    """League rollups for the dashboard"""
+
+    def __init__(self, player_counts, highest_bonus_rounds, overlap, favorites, teams_with_favorites):
+        self.player_counts = player_counts
+        self.highest_bonus_rounds = highest_bonus_rounds
+        self.overlap = overlap
+        self.favorites = favorites
+        self.teams_with_favorites = teams_with_favorites
+
+    @property
+    def round_counts(self):
+        """How many teams spent the most in each round"""
+        return self.highest_bonus_rounds['Selection'].value_counts().sort_index()
+
+    def teams_not_spending_first(self):
+        """Teams whose biggest bonus wasn't at their first pick"""
+        return self.highest_bonus_rounds[self.highest_bonus_rounds['Selection'] != 1]
+
+
+def frame_signature(df):
+    """Content hash of a DataFrame (order matters)"""
+    if df is None or len(df) == 0:
+        return 0
+    return int(pd.util.hash_pandas_object(df, index=False).sum())
+
+
+def team_summary(team, predictions, actual_team_df):
+    """TeamSummary from one team's model rows (in selection order) and its real picks"""
+    players = list(dict.fromkeys(predictions['Name']))
+    if len(predictions):
+        values = predictions['Optimization_Value'].to_numpy()
+        top = int(values.argmax())
+        highest_round, highest_bonus = top + 1, float(values[top])
+    else:
+        highest_round, highest_bonus = None, None
+    actual_names = set(actual_team_df['Name']) if actual_team_df is not None else set()
+    overlap = [name for name in players if name in actual_names]
+    return TeamSummary(team, players, highest_round, highest_bonus, overlap)
+
+
+@timed()
+def team_summaries(store):
+    """TeamSummary per team, recomputed only for teams whose rows changed since last time"""
+    results = store.results
+    summaries = {}
+    for team in MLB_TEAMS:
+        predictions = store.team_predictions(team)
+        if predictions is None or len(predictions) == 0:
+            continue
+        actual = results[results['Team_Abbrev'] == team] if results is not None else None
+        key = (frame_signature(predictions[['Name', 'Optimization_Value']]),
+               frame_signature(actual[['Name']]) if actual is not None else 0)
+        cached = _SUMMARY_CACHE.get(team)
+        cache_event('takeaways.team_summary', cached is not None and cached[0] == key)
+        if cached is None or cached[0] != key:
+            cached = (key, team_summary(team, predictions, actual))
+            _SUMMARY_CACHE[team] = cached
+        summaries[team] = cached[1]
+    return summaries
+
+
+@timed()
+def build_takeaways(summaries, results=None, min_favorite_teams=MIN_FAVORITE_TEAMS, name_index=None):
+    """Add the per-team summaries up into league rollups (one pass over the summaries)"""
+    counts = Counter()
+    highest = []
+    overlap = []
+    for team, summary in summaries.items():
+        counts.update(summary.players)
+        highest.append({'Team_Abbrev': team, 'Selection': summary.highest_bonus_round,
+                        'Optimization_Value': summary.highest_bonus})
+        overlap.append({'Team_Abbrev': team, 'Model_Picks': len(summary.players), 'Matched': len(summary.overlap),
+                        'Players': ", ".join(summary.overlap)})
+
+    player_counts = pd.DataFrame(sorted(counts.items(), key=lambda item: (-item[1], item[0])),
+                                 columns=['Name', 'Teams'])
+    favorites = player_counts[player_counts['Teams'] >= min_favorite_teams].reset_index(drop=True)
+
+    # where the favorites really went
+    if results is not None and len(favorites):
+        if name_index is None:
+            name_index = NameIndex.from_frame(results)
+        rows = name_index.find_all(favorites['Name'])
+        matched = pd.Series(rows >= 0, index=favorites.index)
+        found = results.iloc[rows[matched.to_numpy()]]
+        for col in ['Round', 'Pick', 'Team', 'Team_Abbrev', 'Position', 'School', 'Bonus', 'Signed']:
+            favorites[col] = None
+            favorites.loc[matched, col] = found[col].to_numpy()
+        favorites['Found'] = matched
+    else:
+        favorites['Found'] = False
+
+    return Takeaways(player_counts, pd.DataFrame(highest), pd.DataFrame(overlap), favorites,
+                     favorite_teams(favorites))
+
+
+def favorite_teams(favorites):
+    """{team: [favorites]} for teams that really drafted more than one of the model's favorites"""
+    if 'Team_Abbrev' not in favorites:
+        return {}
+    teams = favorites[favorites['Found']].groupby('Team_Abbrev')['Name'].agg(list)
+    return teams[teams.map(len) > 1].to_dict()
+
+
+def league_takeaways(data_directory="Optimization_CSVs", min_favorite_teams=MIN_FAVORITE_TEAMS):
+    """Takeaways for the current store (team summaries come from the cache when nothing changed)"""
+    store = load_store(data_directory)
+    key = (str(Path(data_directory).resolve()), store.signature, min_favorite_teams)
+    cache_event('takeaways', key in _TAKEAWAYS_CACHE)
+    if key not in _TAKEAWAYS_CACHE:
+        _TAKEAWAYS_CACHE.clear()
+        _TAKEAWAYS_CACHE[key] = build_takeaways(team_summaries(store), store.results, min_favorite_teams,
+                                                store.name_index)
+    return _TAKEAWAYS_CACHE[key]
+
+
+def read_julia_pairs(file_path):
+    """[(key, count)] from a csv of julia Pair{Any, Int64}(...) strings (most_popular.csv etc.)"""
+    pairs = []
+    for value in pd.read_csv(file_path)['name'].astype(str):
+        match = re.match(r'Pair\{[^}]*\}\((?:String\d*\()?"?(.*?)"?\)?, (\d+)\)$', value)
+        if match:
+            key = match.group(1)
+            pairs.append((int(key) if key.isdigit() else key, int(match.group(2))))
+    return pairs
+
+
+def main():
+    takeaways = league_takeaways()
+    data_directory = Path("Optimization_CSVs")
+
+    julia_counts = dict(read_julia_pairs(data_directory / "most_popular.csv"))
+    ours = dict(zip(takeaways.player_counts['Name'], takeaways.player_counts['Teams']))
+    print(f"player counts match most_popular.csv: {all(ours.get(k) == v for k, v in julia_counts.items())}")
+
+    julia_rounds = dict(read_julia_pairs(data_directory / "highest_bonus_counts.csv"))
+    print(f"highest bonus rounds match highest_bonus_counts.csv: {takeaways.round_counts.to_dict() == julia_rounds}")
+
+    print(takeaways.favorites[['Name', 'Teams', 'Team_Abbrev', 'Round', 'Pick']].to_string(index=False))
+    print(f"teams with multiple favorites: {takeaways.teams_with_favorites}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# ExactPickModel (branch and bound, with and without presolve) against PickModel (HiGHS, with and without
+# presolve) on a few teams' real inputs: every optimal value has to match, including forced selections,
+# rounds filled by players we have no data for, and a budget tight enough for the priced bound to kick in
+#
+# usage (from the repo root): python -m pytest tests
+
+import copy
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from exact_solver import ExactPickModel  # noqa: E402
+from optimization import PickModel, load_player_data, load_problem, team_settings  # noqa: E402
+from simulation import simulate_team  # noqa: E402
+
+TEAMS = ['BOS', 'CIN', 'SDP', 'ATH']
+SCENARIOS = 6
+SEED = 0
+
+
+@pytest.fixture(scope="module")
+def problems():
+    player_data = load_player_data()
+    return {team: load_problem(team, player_data) for team in TEAMS}
+
+
+def optimal_values(model, scenarios):
+    values = []
+    for available in scenarios:
+        assignment = model.solve(available)
+        values.append(np.nan if assignment is None else model.objective(assignment))
+    return np.array(values)
+
+
+def all_optima(problem, settings, scenarios, selected=()):
+    """{(solver, presolve): optimal value per scenario}"""
+    return {(model_class.__name__, use_presolve): optimal_values(
+                model_class(problem, *settings, selected, presolve=use_presolve), scenarios)
+            for model_class in (PickModel, ExactPickModel) for use_presolve in (False, True)}
+
+
+def assert_same(optima):
+    reference = optima[('PickModel', False)]
+    assert not np.isnan(reference).all()
+    for key, values in optima.items():
+        np.testing.assert_allclose(values, reference, atol=1e-6, err_msg=str(key))
+
+
+def without_round(problem, r):
+    """The problem with round r dropped, what a round filled by an unknown player leaves to solve"""
+    reduced = copy.copy(problem)
+    reduced.probs = np.delete(problem.probs, r, axis=1)
+    reduced.real = np.delete(problem.real, r, axis=1)
+    reduced.bonus = np.delete(problem.bonus, r, axis=1)
+    reduced.pick_numbers = np.delete(problem.pick_numbers, r)
+    return reduced
+
+
+@pytest.mark.parametrize("budget_multiplier", [1.0, 0.8])
+@pytest.mark.parametrize("team", TEAMS)
+def test_optima_match_pick_by_pick(problems, team, budget_multiplier):
+    """Every pick, carrying the first scenario's selection forward so later picks have forced players"""
+    problem = problems[team]
+    penalty_risk, penalty_hs, spending = team_settings(team)
+    settings = (penalty_risk, penalty_hs, spending * budget_multiplier)
+    selected = []
+    for pick in range(1, problem.num_picks + 1):
+        scenarios = simulate_team(problem, pick, SCENARIOS, np.random.default_rng([SEED, pick]))
+        assert_same(all_optima(problem, settings, scenarios, selected))
+
+        assignment = ExactPickModel(problem, *settings, selected).solve(scenarios[0])
+        if assignment is None:
+            break
+        selected.append(problem.names[assignment[pick - 1]])
+
+
+@pytest.mark.parametrize("budget_multiplier", [1.0, 0.8])
+@pytest.mark.parametrize("team", TEAMS)
+def test_filled_round_matches_problem_without_it(problems, team, budget_multiplier):
+    """A first round used on an unknown player (live drafts) is the same draft as one without that round"""
+    problem = problems[team]
+    penalty_risk, penalty_hs, spending = team_settings(team)
+    settings = (penalty_risk, penalty_hs, spending * budget_multiplier)
+    scenarios = simulate_team(problem, 2, SCENARIOS, np.random.default_rng([SEED, 2]))
+    reduced = without_round(problem, 0)
+    reference = optimal_values(PickModel(reduced, *settings), scenarios[:, :, 1:])
+
+    for use_presolve in (False, True):
+        model = ExactPickModel(problem, *settings, presolve=use_presolve)
+        model.set_selected_players(["not a board player"], fill_unknown=True)
+        assert model.filled_rounds == (0,)
+        np.testing.assert_allclose(optimal_values(model, scenarios), reference, atol=1e-6)
+
+
+def test_filled_round_with_forced_pick(problems):
+    """An unknown first pick followed by a forced board player in the second round"""
+    team = 'CIN'
+    problem = problems[team]
+    settings = team_settings(team)
+    scenarios = simulate_team(problem, 3, SCENARIOS, np.random.default_rng([SEED, 3]))
+    second = problem.names[ExactPickModel(without_round(problem, 0), *settings).solve(scenarios[0][:, 1:])[0]]
+    reference = optimal_values(PickModel(without_round(problem, 0), *settings, [second]), scenarios[:, :, 1:])
+
+    model = ExactPickModel(problem, *settings)
+    model.set_selected_players(["not a board player", second], fill_unknown=True)
+    np.testing.assert_allclose(optimal_values(model, scenarios), reference, atol=1e-6)
@@ -0,0 +1,196 @@
+# what-if runs for the dashboard: one team's draft re-optimized under a different budget / penalties
+# a query is (team, penalty_risk, penalty_hs, spending, scenarios, seed). it runs on a background thread so
+# the page can draw a progress bar while it solves, and its result goes into one process wide LRU cache, so
+# asking the same thing again (or another session asking it) is a lookup. an identical query that is still
+# running is shared instead of started twice
+# scenarios come from the persistent bank (scenario_bank.py), so two what-ifs on the same seed see the same
+# drafts and differ only by their settings. with the exact solver a team at 50 scenarios takes well under a second
+#
+# usage (from the repo root): python what_if.py [--team BOS] [--budget-change 1000000] [--hs 0] [--scenarios 50]
+
+import argparse
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from adaptive_sampling import rank_votes
+from league_runner import get_problem
+from optimization import pick_model_class, team_settings
+from sweep import plan_team
+
+DEFAULT_SCENARIOS = 50
+CACHE_SIZE = 128
+
+
+class LRUCache:
+    """Thread safe least recently used cache"""
+
+    def __init__(self, maxsize=CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class WhatIfResult:
+    """One team's re-optimized draft: (selection, pick number, votes Counter, mean value) per pick"""
+
+    def __init__(self, key, picks, scenarios, seconds):
+        self.key = key
+        self.picks = picks
+        self.scenarios = scenarios
+        self.seconds = seconds
+
+    @property
+    def team(self):
+        return self.key[0]
+
+    @property
+    def players(self):
+        return [rank_votes(votes)[0][0] for _, _, votes, _ in self.picks]
+
+    def table(self):
+        """One row per pick: the majority choice, its share of scenarios and the runner-up"""
+        rows = []
+        for selection, pick_number, votes, value in self.picks:
+            ranked = rank_votes(votes)
+            runner_up = ranked[1] if len(ranked) > 1 else (None, 0)
+            rows.append({'Selection': selection, 'Pick': pick_number, 'Player': ranked[0][0],
+                         'Share': ranked[0][1] / self.scenarios, 'Runner_Up': runner_up[0],
+                         'Runner_Up_Share': runner_up[1] / self.scenarios, 'Mean_Value': value})
+        return pd.DataFrame(rows)
+
+
+def what_if_key(team, penalty_risk, penalty_hs, spending, n_scenarios=DEFAULT_SCENARIOS, seed=0):
+    """Cache key, rounded so the same settings typed twice (or dragged back on a slider) hit the cache"""
+    return (team, round(float(penalty_risk), 4), round(float(penalty_hs), 4), int(round(spending)),
+            int(n_scenarios), int(seed))
+
+
+def run_what_if(key, progress=None, solver="exact"):
+    """WhatIfResult for a key (no caching here, see request)"""
+    from scenario_bank import get_bank
+
+    start = time.perf_counter()
+    team, penalty_risk, penalty_hs, spending, n_scenarios, seed = key
+    problem = get_problem(team)
+    bank = get_bank(seed=seed, n_scenarios=n_scenarios)
+    scenarios = [bank.team_scenarios(problem, pick) for pick in range(1, problem.num_picks + 1)]
+    model = pick_model_class(solver)(problem, penalty_risk, penalty_hs, spending)
+    picks = [(k + 1, int(problem.pick_numbers[k]), votes, value)
+             for k, (votes, value) in enumerate(plan_team(problem, model, scenarios, progress))]
+    return WhatIfResult(key, picks, n_scenarios, time.perf_counter() - start)
+
+
+class WhatIfJob:
+    """A what-if query running on its own thread (or already answered from the cache)"""
+
+    def __init__(self, key, result=None):
+        self.key = key
+        self.result = result
+        self.error = None
+        self.solved = 0
+        self.total = 0
+        self.cached = result is not None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"what-if {self.key[0]}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.result = run_what_if(self.key, self._progress)
+            _RESULTS.put(self.key, self.result)
+        except Exception as e:  # shown by the page instead of dying with the thread
+            self.error = e
+        finally:
+            with _JOBS_LOCK:
+                _JOBS.pop(self.key, None)
+
+    def _progress(self, solved, total):
+        self.solved, self.total = solved, total
+
+    @property
+    def done(self):
+        return self.result is not None or self.error is not None
+
+    @property
+    def fraction(self):
+        if self.done:
+            return 1.0
+        return self.solved / self.total if self.total else 0.0
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.result
+
+
+# shared by every session in the process
+_RESULTS = LRUCache()
+_JOBS = {}
+_JOBS_LOCK = threading.Lock()
+
+
+def request(team, penalty_risk, penalty_hs, spending, n_scenarios=DEFAULT_SCENARIOS, seed=0):
+    """WhatIfJob for a query: already done on a cache hit, the running job if someone asked for it already"""
+    key = what_if_key(team, penalty_risk, penalty_hs, spending, n_scenarios, seed)
+    result = _RESULTS.get(key)
+    if result is not None:
+        return WhatIfJob(key, result)
+    with _JOBS_LOCK:
+        job = _JOBS.get(key)
+        if job is None:
+            job = _JOBS[key] = WhatIfJob(key).start()
+    return job
+
+
+def main():
+    parser = argparse.ArgumentParser(description="re-optimize one team's draft under different settings")
+    parser.add_argument("--team", default="BOS")
+    parser.add_argument("--risk", type=float, default=None)
+    parser.add_argument("--hs", type=float, default=None)
+    parser.add_argument("--budget-change", type=float, default=1000000, help="dollars added to the team's spending")
+    parser.add_argument("--scenarios", type=int, default=DEFAULT_SCENARIOS)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    default = team_settings(args.team)
+    penalty_risk, penalty_hs, spending = team_settings(args.team, args.risk, args.hs)
+    for label, settings in [("default settings", default),
+                            ("what-if", (penalty_risk, penalty_hs, spending + args.budget_change))]:
+        for attempt in ("first", "again"):
+            start = time.perf_counter()
+            job = request(args.team, *settings, args.scenarios, args.seed)
+            result = job.wait()
+            print(f"{label} ({attempt}): {(time.perf_counter() - start) * 1000:.1f} ms"
+                  f"{' (cache)' if job.cached else ''}")
+        print(result.table().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()